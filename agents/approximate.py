@@ -0,0 +1,119 @@
+"""
+approximate.py
+
+Estimator SQL for approximate mode (plans with `approx` set).
+
+- Additive metrics (sums, counts) are estimated from the stratified
+  sample of mcp/sampling.py: N_h * mean_h(x) per stratum, summed per
+  group, with the stratified-sampling variance
+
+      sum_h N_h^2 * (1 - n_h / N_h) * s_h^2 / n_h
+
+  Strata kept whole (n_h = N_h) contribute no error. Dimensions and
+  filters must be stratum keys, so every stratum falls entirely inside
+  or outside a result group.
+- Distinct counts merge the per-stratum HyperLogLog registers of
+  mcp/sketches.py (MAX per register over the selected strata) and
+  estimate from them, so no raw order is read at query time. Dimensions
+  and filters must be stratum keys, as above.
+
+Both return <dimensions>, <metric>, <metric>_error, the error being the
+half-width of a 95% interval.
+"""
+
+import math
+from typing import Any, Dict, List, Optional
+
+from agents.query_builder import QueryBuilder, SQLQuery
+from agents.time_ranges import DateRange
+from mcp.sketches import HLL_PRECISION
+
+Z_95 = 1.96
+
+
+def build_sample_estimate_query(
+    sample_table: str,
+    metric: str,
+    value_expr: str,
+    dimensions: List[str],
+    strata: List[str],
+    filters: Dict[str, Any],
+    time_range: Optional[DateRange],
+    time_column: str
+) -> SQLQuery:
+    """
+    Stratified estimate of SUM(value_expr) per group of `dimensions`.
+    """
+    per_stratum = QueryBuilder(sample_table)
+    per_stratum.select = list(strata) + [
+        "ANY_VALUE(_stratum_rows) AS _stratum_rows",
+        "COUNT(*) AS _sampled",
+        f"AVG({value_expr}) AS _mean",
+        f"COALESCE(VAR_SAMP({value_expr}), 0) AS _variance",
+    ]
+    per_stratum.group_by = ", ".join(strata)
+    per_stratum.add_filters(filters, time_range, time_column)
+    stratum_query = per_stratum.build()
+
+    estimate = QueryBuilder(f"({stratum_query.sql}) AS strata")
+    estimate.params = stratum_query.params
+    estimate.select = list(dimensions) + [
+        f"SUM(_stratum_rows * _mean) AS {metric}",
+        f"{Z_95} * SQRT(SUM("
+        "_stratum_rows * _stratum_rows * (1 - _sampled / _stratum_rows)"
+        f" * _variance / _sampled)) AS {metric}_error",
+    ]
+    if dimensions:
+        estimate.group_by = ", ".join(dimensions)
+
+    return estimate.build()
+
+
+def build_sketch_estimate_query(
+    sketch_table: str,
+    metric: str,
+    dimensions: List[str],
+    filters: Dict[str, Any],
+    time_range: Optional[DateRange],
+    time_column: str,
+    precision: int = HLL_PRECISION
+) -> SQLQuery:
+    """
+    HyperLogLog estimate of a distinct count per group of `dimensions`,
+    from the register table of mcp/sketches.py.
+    """
+    registers = 1 << precision
+    alpha = 0.7213 / (1 + 1.079 / registers)
+    relative_error = 1.04 / math.sqrt(registers)
+
+    # Registers merge with MAX across the selected strata
+    sketch = QueryBuilder(sketch_table)
+    sketch.select = list(dimensions) + ["_register", "MAX(_rank) AS _rank"]
+    sketch.add_filters(filters, time_range, time_column)
+    sketch.group_by = ", ".join(list(dimensions) + ["_register"])
+    sketch_query = sketch.build()
+
+    raw = QueryBuilder(f"({sketch_query.sql}) AS sketch")
+    raw.params = sketch_query.params
+    raw.select = list(dimensions) + [
+        f"{alpha * registers * registers} / "
+        f"(SUM(POW(2.0, -_rank)) + {registers} - COUNT(*)) AS _raw",
+        f"{registers} - COUNT(*) AS _empty",
+    ]
+    if dimensions:
+        raw.group_by = ", ".join(dimensions)
+    raw_query = raw.build()
+
+    # Small-range correction (linear counting) while registers are empty
+    estimate = QueryBuilder(f"({raw_query.sql}) AS raw")
+    estimate.params = raw_query.params
+    corrected = (
+        f"CASE WHEN _raw <= {2.5 * registers} AND _empty > 0 "
+        f"THEN {registers} * LN({registers} / _empty) ELSE _raw END"
+    )
+    estimate.select = list(dimensions) + [
+        f"CAST(ROUND({corrected}) AS BIGINT) AS {metric}",
+        f"{Z_95 * relative_error} * {corrected} AS {metric}_error",
+    ]
+
+    return estimate.build()
@@ -0,0 +1,154 @@
+"""
+contribution.py
+
+Driver analysis for "why" questions (the `contribution` analysis type).
+
+The change of a metric between two periods is decomposed across every
+categorical dimension in a single scan:
+
+1. `scan`    – GROUPING SETS ((d1, _period), (d2, _period), ...) over
+               the rows of both periods only.
+2. `pivoted` – one row per (dimension, member); current / previous
+               values pivoted out with FILTER aggregates.
+3. `ranked`  – delta, the dimension's total delta and each member's
+               rank by absolute delta.
+4. outer     – the top `top_k` members per dimension; the long tail is
+               folded into one "(other)" row, so high-cardinality
+               dimensions like `product` return k + 1 rows and
+               contributions still add up to 100%.
+"""
+
+import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from agents.query_builder import PartitionKeys, QueryBuilder, SQLQuery
+from agents.time_ranges import MONTH_NUMBERS, add_months
+
+DEFAULT_TOP_K = 10
+OTHER_MEMBER = "(other)"
+
+Period = Tuple[datetime.date, datetime.date]
+
+def comparison_periods(
+    latest: datetime.date,
+    time_range: Optional[str],
+    comparison: Optional[str]
+) -> Tuple[Period, Period]:
+    """
+    ([start, end) of the current month, [start, end) of the month it is
+    compared with).
+
+    The current month is the latest one with data, or its most recent
+    occurrence when `time_range` names a month. The comparison month is
+    the one before (default) or the same month a year earlier.
+    """
+    current = latest.replace(day=1)
+
+    month = MONTH_NUMBERS.get(time_range or "")
+    if month:
+        year = current.year if month <= current.month else current.year - 1
+        current = datetime.date(year, month, 1)
+
+    offset = 12 if comparison == "year_over_year" else 1
+    previous = add_months(current, -offset)
+
+    return (
+        (current, add_months(current, 1)),
+        (previous, add_months(previous, 1)),
+    )
+
+
+def build_contribution_query(
+    source: str,
+    metric: str,
+    metric_expr: str,
+    dimensions: List[str],
+    filters: Dict[str, Any],
+    periods: Tuple[Period, Period],
+    time_column: str,
+    top_k: int = DEFAULT_TOP_K,
+    partition_keys: Optional[PartitionKeys] = None
+) -> SQLQuery:
+    """
+    SELECT dimension, member, current, previous, delta, pct_change,
+           contribution, rank ... ORDER BY dimension, rank
+    """
+    if not dimensions:
+        raise ValueError("Contribution analysis needs at least one dimension.")
+
+    (current_start, current_end), (previous_start, previous_end) = periods
+
+    scan = QueryBuilder(source)
+    is_current = f"{time_column} >= {scan.bind(current_start)}"
+    scan.select = list(dimensions) + [
+        f"CASE WHEN {is_current} THEN 'current' ELSE 'previous' END AS _period",
+        f"GROUPING({', '.join(dimensions)}) AS _grouping_id",
+        f"{metric_expr} AS {metric}",
+    ]
+    scan.group_by = "GROUPING SETS ({})".format(
+        ", ".join(f"({dim}, _period)" for dim in dimensions)
+    )
+    scan.add_filters(filters, None, time_column)
+    scan.where.append(
+        f"(({time_column} >= {scan.bind(previous_start)} "
+        f"AND {time_column} < {scan.bind(previous_end)}) "
+        f"OR ({is_current} AND {time_column} < {scan.bind(current_end)}))"
+    )
+    if partition_keys:
+        scan.add_partition_range(partition_keys, previous_start, current_end)
+    scan_query = scan.build()
+
+    # Grouping id of the set keeping only dimension i: every other bit set
+    every = (1 << len(dimensions)) - 1
+    when = [
+        (every ^ (1 << (len(dimensions) - 1 - i)), dim)
+        for i, dim in enumerate(dimensions)
+    ]
+    dimension_case = " ".join(f"WHEN {gid} THEN '{dim}'" for gid, dim in when)
+    member_case = " ".join(
+        f"WHEN {gid} THEN CAST({dim} AS VARCHAR)" for gid, dim in when
+    )
+
+    pivoted = QueryBuilder(f"({scan_query.sql}) AS scan")
+    pivoted.params = scan_query.params
+    pivoted.select = [
+        f"CASE _grouping_id {dimension_case} END AS dimension",
+        f"CASE _grouping_id {member_case} END AS member",
+        f"COALESCE(MAX({metric}) FILTER (WHERE _period = 'current'), 0) AS current",
+        f"COALESCE(MAX({metric}) FILTER (WHERE _period = 'previous'), 0) AS previous",
+    ]
+    pivoted.group_by = "dimension, member"
+    pivoted_query = pivoted.build()
+
+    ranked = QueryBuilder(f"({pivoted_query.sql}) AS pivoted")
+    ranked.params = pivoted_query.params
+    ranked.select = [
+        "dimension",
+        "member",
+        "current",
+        "previous",
+        "current - previous AS delta",
+        "SUM(current - previous) OVER (PARTITION BY dimension) AS total_delta",
+        "ROW_NUMBER() OVER (PARTITION BY dimension "
+        "ORDER BY ABS(current - previous) DESC, member NULLS LAST) AS rank",
+    ]
+    ranked_query = ranked.build()
+
+    outer = QueryBuilder(f"({ranked_query.sql}) AS ranked")
+    outer.params = ranked_query.params
+    member = f"CASE WHEN rank <= {int(top_k)} THEN member ELSE '{OTHER_MEMBER}' END"
+    outer.select = [
+        "dimension",
+        f"{member} AS member",
+        # DOUBLE: SUM over integer metrics would widen to HUGEINT
+        "CAST(SUM(current) AS DOUBLE) AS current",
+        "CAST(SUM(previous) AS DOUBLE) AS previous",
+        "CAST(SUM(delta) AS DOUBLE) AS delta",
+        "SUM(delta) / NULLIF(SUM(previous), 0) AS pct_change",
+        "SUM(delta) / NULLIF(ANY_VALUE(total_delta), 0) AS contribution",
+        "MIN(rank) AS rank",
+    ]
+    outer.group_by = f"dimension, {member}"
+    outer.order_by = "dimension, rank"
+
+    return outer.build()
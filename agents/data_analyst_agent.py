@@ -5,93 +5,741 @@ Responsible for:
 - Schema discovery
 - SQL generation
 - Analytical execution via MCP
+
+Plans with a `time_grain` are answered as time series (see timeseries.py);
+`forecast` plans extend them with projections (see forecasting.py);
+`contribution` plans get a driver analysis (see contribution.py).
+Plans flagged `approx` are estimated with error bounds (see approximate.py).
+Time ranges become `[start, end)` predicates (see time_ranges.py).
+Breakdown plans run one sub-query per axis, in parallel on a thread pool.
 """
 
-from typing import Dict, Any
+import datetime
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any, List, Optional, Tuple
+import pyarrow as pa
+import pyarrow.compute as pc
+from mcp import metrics, registry
+from mcp.base_mcp import MCPExecutionError, MCPValidationError
 from mcp.bigquery_mcp import BigQueryMCP
 from mcp.looker_mcp import LookerMCP
 from mcp.catalog_mcp import CatalogMCP
+from mcp.sampling import SAMPLE_TABLE, TIME_COLUMN as SAMPLE_TIME_COLUMN
+from mcp.sketches import TIME_COLUMN as SKETCH_TIME_COLUMN
+from agents.query_builder import (
+    PartitionKeys,
+    SQLQuery,
+    build_aggregate_query,
+    build_grouping_sets_query,
+)
+from agents.approximate import (
+    build_sample_estimate_query,
+    build_sketch_estimate_query,
+)
+from agents.contribution import build_contribution_query, comparison_periods
+from agents.forecasting import Forecaster
+from agents.time_ranges import DateRange, resolve_time_range
+from agents.timeseries import build_timeseries_query
+
+
+EMPTY_RESULT = pa.table({})
+
+# Time grains finer than the monthly rollups
+DAY_GRAINS = {"day", "week"}
+
+# Query kinds whose results are estimates (see approximate.py)
+APPROXIMATE_KINDS = {"stratified_sample", "hyperloglog"}
+
+# Concurrent sub-queries per breakdown plan (ANALYTICS_PARALLELISM)
+DEFAULT_PARALLELISM = int(
+    os.environ.get("ANALYTICS_PARALLELISM", min(4, os.cpu_count() or 1))
+)
+
+# Breakdown axis answered by a time series instead of a dimension
+PERIOD_AXIS = "period"
 
 
 class DataAnalystAgent:
-    def __init__(self):
-        self.catalog = CatalogMCP()
-        self.looker = LookerMCP()
-        self.bigquery = BigQueryMCP()
+    """
+    MCP servers come from the process-wide registry: they are shared with
+    every other agent and only created on first use.
+
+    Independent sub-queries (the axes of a breakdown plan) run on a pool
+    of `parallelism` threads. BigQueryMCP gives every thread its own
+    cursor on the shared DuckDB database, so they execute concurrently.
+    """
+
+    def __init__(self, parallelism: Optional[int] = None):
+        self.forecaster = Forecaster()
+        self.parallelism = max(1, parallelism or DEFAULT_PARALLELISM)
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        self._latest: Optional[Tuple[str, datetime.date]] = None
+        self._columns: Optional[Tuple[str, set]] = None
+
+    @property
+    def catalog(self) -> CatalogMCP:
+        return registry.get_server("catalog")
+
+    @property
+    def looker(self) -> LookerMCP:
+        return registry.get_server("looker")
+
+    @property
+    def bigquery(self) -> BigQueryMCP:
+        return registry.get_server("bigquery")
+
+    def _resolve_source(
+        self,
+        metric_defs: List[Dict[str, Any]],
+        dimensions,
+        filters,
+        needs_day: bool = False,
+        bounded: bool = False
+    ):
+        """
+        Pick the table to aggregate from.
+
+        Returns (table, metric expressions, time column). Plans are routed
+        to the smallest current rollup covering their dimensions and
+        filters; otherwise they scan raw `sales_orders`, or its
+        partitioned copy when that is faster for the filters (`bounded`:
+        the scan is restricted to a time range).
+        """
+        rollup_exprs = [m.get("rollup_definition") for m in metric_defs]
+
+        rollups = (
+            self.bigquery.current_rollups(self.looker.rollup_spec())
+            if all(rollup_exprs) else None
+        )
+        if rollups:
+            categorical = [d for d in dimensions if d != "order_date"]
+            rollup = rollups.match(
+                categorical + list(filters),
+                needs_day=needs_day or "order_date" in dimensions
+            )
+            if rollup:
+                return rollup.name, rollup_exprs, rollup.time_column
+
+        return (
+            self.bigquery.partitioned_source(list(filters), bounded)
+            or "sales_orders",
+            [m["definition"] for m in metric_defs],
+            "order_date"
+        )
+
+    def _latest_date(self) -> datetime.date:
+        """
+        Latest order date, the anchor of relative time ranges; cached
+        per data version.
+        """
+        version = self.bigquery.data_version
+        cached = self._latest
+        if cached and cached[0] == version:
+            return cached[1]
+
+        result = self.bigquery.safe_execute({
+            "sql": "SELECT MAX(order_date) FROM sales_orders"
+        })
+        if result["status"] != "success":
+            raise MCPExecutionError(result["message"])
+
+        latest = result["data"].column(0)[0].as_py() or datetime.date.today()
+        self._latest = (version, latest)
+        return latest
+
+    def _source_columns(self) -> set:
+        """
+        Columns `sales_orders` actually has; cached per data version.
+        """
+        version = self.bigquery.data_version
+        cached = self._columns
+        if cached and cached[0] == version:
+            return cached[1]
+
+        result = self.bigquery.safe_execute({
+            "sql": "SELECT column_name FROM (DESCRIBE sales_orders)"
+        })
+        if result["status"] != "success":
+            raise MCPExecutionError(result["message"])
+
+        columns = set(result["data"].column(0).to_pylist())
+        self._columns = (version, columns)
+        return columns
+
+    def _time_range(self, time_range: Optional[str]) -> Optional[DateRange]:
+        """
+        Resolve a plan's `time_range` into `[start, end)`.
+        """
+        if not time_range:
+            return None
+        try:
+            return resolve_time_range(time_range, self._latest_date())
+        except (ValueError, OverflowError) as e:
+            raise MCPValidationError(str(e))
+
+    def _partition_keys(self, source: str) -> Optional[PartitionKeys]:
+        """
+        Partition columns to filter time ranges on, when `source` scans a
+        hive-partitioned copy (not a rollup).
+        """
+        return self.bigquery.partition_keys(source)
+
+    def _validate_plan(self, plan: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Validate metric, dimensions and dataset; return the metric spec.
+        """
+        metric = plan["metric"]
+        dimensions = plan.get("dimensions", [])
+
+        with metrics.stage("validate"):
+            # Step 1: Validate metric (filter columns must be valid dimensions)
+            self.looker.validate({
+                "metric": metric,
+                "dimensions": dimensions + list(plan.get("filters", {}))
+            })
+
+            metric_spec = self.looker.execute({
+                "metric": metric,
+                "dimensions": dimensions
+            })
+
+            # Step 2: Validate dataset (and the columns the loaded data has)
+            self.catalog.validate({
+                "action": "schema",
+                "resource": "sales_orders"
+            })
+
+            columns = self._source_columns()
+            for column in dimensions + list(plan.get("filters", {})):
+                if column not in columns:
+                    raise MCPValidationError(
+                        f"Column '{column}' is not available in sales_orders."
+                    )
+
+        return metric_spec
 
     @staticmethod
-    def _sanitize(data):
+    def _is_contribution(plan: Dict[str, Any]) -> bool:
+        return "contribution" in plan.get("analysis_types", [])
+
+    @staticmethod
+    def _is_forecast(plan: Dict[str, Any]) -> bool:
+        # Driver analysis takes precedence ("why will sales drop")
+        analysis_types = plan.get("analysis_types", [])
+        return (
+            bool(plan.get("time_grain"))
+            and "forecast" in analysis_types
+            and "contribution" not in analysis_types
+        )
+
+    def build_query(self, plan: Dict[str, Any]) -> SQLQuery:
         """
-        Replace NaN with None (JSON-safe)
+        Validate a plan and build its parameterized query.
         """
-        for row in data:
-            for k, v in row.items():
-                if v != v:  # NaN check
-                    row[k] = None
-        return data
+        return self._prepare_query(plan)[0]
 
-    def run_analysis(self, plan: Dict[str, Any]) -> Dict[str, Any]:
+    def _prepare_query(self, plan: Dict[str, Any]) -> Tuple[SQLQuery, str]:
+        """
+        Returns (query, kind); kind names the query shape (aggregate,
+        timeseries, contribution, or an approximate estimator).
+        """
         metric = plan["metric"]
         dimensions = plan.get("dimensions", [])
         filters = plan.get("filters", {})
-        time_range = plan.get("time_range")
+        time_grain = plan.get("time_grain")
 
-        # Step 1: Validate metric
-        self.looker.validate({
-            "metric": metric,
-            "dimensions": dimensions
-        })
+        # Forecasts are fitted on the full history; their time range
+        # only bounds the history returned (see run_analysis)
+        time_range = self._time_range(plan.get("time_range"))
+        if self._is_forecast(plan):
+            time_range = None
 
-        metric_def = self.looker.execute({
-            "metric": metric,
-            "dimensions": dimensions
-        })["definition"]
+        metric_spec = self._validate_plan(plan)
 
-        # Step 2: Validate dataset
-        self.catalog.validate({
-            "action": "schema",
-            "resource": "sales_orders"
-        })
+        if self._is_contribution(plan):
+            return (
+                self._build_contribution_query(plan, metric_spec),
+                "contribution"
+            )
 
-        # Step 3: Build SQL
-        select_clause = f"{metric_def} AS {metric}"
-        group_clause = ""
+        estimator = self._estimator(plan, metric_spec)
+        if estimator:
+            return (
+                self._build_approximate_query(plan, metric_spec, estimator),
+                estimator
+            )
+
+        # Step 3: Build SQL (against a rollup when one matches)
+        source, (metric_def,), time_column = self._resolve_source(
+            [metric_spec], dimensions, filters,
+            needs_day=time_grain in DAY_GRAINS,
+            bounded=time_range is not None
+        )
+
+        if time_grain:
+            return build_timeseries_query(
+                source, metric, metric_def, dimensions,
+                filters, time_range, time_column,
+                grain=time_grain,
+                comparison=plan.get("comparison"),
+                partition_keys=self._partition_keys(source)
+            ), "timeseries"
+
+        return build_aggregate_query(
+            source, metric, metric_def, dimensions,
+            filters, time_range, time_column,
+            self._partition_keys(source)
+        ), "aggregate"
+
+    # -----------------------------------------------------------------
+    # Approximate Mode
+    # -----------------------------------------------------------------
+
+    def _estimator(
+        self,
+        plan: Dict[str, Any],
+        metric_spec: Dict[str, Any]
+    ) -> Optional[str]:
+        """
+        Estimator for an `approx` plan, or None to answer exactly.
+
+        Only plain aggregates are approximated. Sample and sketch
+        estimates need every dimension and filter to be a stratum key;
+        distinct counts without current registers are answered exactly
+        (hashing raw orders per query is slower than COUNT(DISTINCT)).
+        """
+        if not plan.get("approx") or plan.get("time_grain"):
+            return None
 
-        if dimensions:
-            select_clause = ", ".join(dimensions) + f", {select_clause}"
-            group_clause = f"GROUP BY {', '.join(dimensions)}"
+        columns = set(plan.get("dimensions", [])) | set(plan.get("filters", {}))
 
-        where_conditions = []
+        if "distinct_value" in metric_spec:
+            if (
+                self.bigquery.sketch_table(plan["metric"], self.looker.sketch_spec())
+                and columns <= set(self.bigquery.sketches.dimensions)
+            ):
+                return "hyperloglog"
+            return None
 
-        for k, v in filters.items():
-            where_conditions.append(f"{k} = '{v}'")
+        if "sample_value" in metric_spec:
+            strata = self.looker.rollup_spec()["dimensions"]
+            if (
+                self.bigquery.sample_table(strata)
+                and columns <= set(self.bigquery.samples.dimensions)
+            ):
+                return "stratified_sample"
 
-        if time_range:
-            where_conditions.append(
-                f"EXTRACT(month FROM order_date) = EXTRACT(month FROM DATE '{time_range}-01')"
+        return None
+
+    def _build_approximate_query(
+        self,
+        plan: Dict[str, Any],
+        metric_spec: Dict[str, Any],
+        estimator: str
+    ) -> SQLQuery:
+        metric = plan["metric"]
+        dimensions = plan.get("dimensions", [])
+        filters = plan.get("filters", {})
+        time_range = self._time_range(plan.get("time_range"))
+
+        if estimator == "hyperloglog":
+            return build_sketch_estimate_query(
+                self.bigquery.sketch_table(metric, self.looker.sketch_spec()),
+                metric, dimensions, filters, time_range, SKETCH_TIME_COLUMN
             )
 
-        where_clause = (
-            f"WHERE {' AND '.join(where_conditions)}"
-            if where_conditions else ""
+        return build_sample_estimate_query(
+            SAMPLE_TABLE, metric, metric_spec["sample_value"],
+            dimensions, self.bigquery.samples.strata, filters,
+            time_range, SAMPLE_TIME_COLUMN
+        )
+
+    @staticmethod
+    def _error_bounds(data: pa.Table, metric: str, estimator: str) -> Dict[str, Any]:
+        """
+        Summary of the per-row error bounds (`<metric>_error`, the
+        half-width of a 95% interval).
+        """
+        estimate = pc.cast(pc.abs(data[metric]), pa.float64())
+        relative = pc.divide(
+            data[f"{metric}_error"],
+            pc.if_else(pc.equal(estimate, 0), None, estimate)
         )
+        return {
+            "approximate": True,
+            "estimator": estimator,
+            "confidence_level": 0.95,
+            "max_relative_error": pc.max(relative).as_py(),
+        }
 
-        sql = f"""
-        SELECT {select_clause}
-        FROM sales_orders
-        {where_clause}
-        {group_clause}
+    def _build_contribution_query(
+        self,
+        plan: Dict[str, Any],
+        metric_spec: Dict[str, Any]
+    ) -> SQLQuery:
         """
+        Driver analysis of the plan's metric across every categorical
+        dimension it is not already filtered on.
+        """
+        metric = plan["metric"]
+        filters = plan.get("filters", {})
+        columns = self._source_columns()
+        drivers = [
+            dim for dim in self.looker.categorical_dimensions(metric)
+            if dim not in filters and dim in columns
+        ]
+        if not drivers:
+            raise MCPValidationError(
+                "No dimension left to attribute the change to."
+            )
+
+        source, (metric_def,), time_column = self._resolve_source(
+            [metric_spec], drivers, filters, bounded=True
+        )
+        return build_contribution_query(
+            source, metric, metric_def, drivers, filters,
+            comparison_periods(
+                self._latest_date(), plan.get("time_range"),
+                plan.get("comparison")
+            ),
+            time_column,
+            partition_keys=self._partition_keys(source)
+        )
+
+    def run_analysis(self, plan: Dict[str, Any]) -> Dict[str, Any]:
+        if plan.get("breakdowns"):
+            return self._run_breakdown(plan)
+
+        try:
+            query, kind = self._prepare_query(plan)
+        except (MCPValidationError, MCPExecutionError) as e:
+            return {
+                "status": "error",
+                "error_type": type(e).__name__,
+                "message": str(e),
+                "metadata": {},
+                "data": EMPTY_RESULT
+            }
 
         # Step 4: Execute
-        result = self.bigquery.safe_execute({"sql": sql})
+        result = self.bigquery.safe_execute({
+            "sql": query.sql,
+            "params": query.params
+        })
+
+        # Results stay columnar (Arrow); NaN is already null-ed by the MCP
+        data = result.get("data", EMPTY_RESULT)
+        metadata = result.get("metadata", {})
 
-        # Normalize result
-        data = result.get("data", [])
-        data = self._sanitize(data)
+        if kind in APPROXIMATE_KINDS and result.get("status") == "success":
+            metadata = {
+                **metadata,
+                **self._error_bounds(data, plan["metric"], kind)
+            }
+
+        if self._is_forecast(plan) and result.get("status") == "success":
+            with metrics.stage("forecast"):
+                data = self.forecaster.forecast(
+                    data,
+                    plan.get("dimensions", []),
+                    plan["metric"],
+                    plan["time_grain"],
+                    cache_key=(
+                        self.bigquery.data_version, query.sql, tuple(query.params)
+                    ),
+                    window=self._time_range(plan.get("time_range"))
+                )
+
+        if result.get("status") != "success":
+            return {
+                "status": result.get("status", "error"),
+                "error_type": result.get("error_type"),
+                "message": result.get("message"),
+                "metadata": metadata,
+                "data": EMPTY_RESULT
+            }
 
         return {
             "status": "success",
-            "metadata": result.get("metadata", {}),
+            "metadata": metadata,
             "data": data
         }
+
+    def stream_analysis(
+        self,
+        plan: Dict[str, Any],
+        batch_size: int = 65_536
+    ) -> pa.RecordBatchReader:
+        """
+        Full (untruncated) result of a plan as a stream of record batches,
+        for exports.
+
+        Forecasts stream the same history-plus-projection table as
+        `run_analysis` (built in memory, one row per series and period).
+        Breakdowns return one differently shaped result per axis, which
+        a single stream cannot carry, so they are rejected.
+        """
+        if plan.get("breakdowns"):
+            raise MCPValidationError(
+                "Breakdown results cannot be exported as one stream; "
+                "export each dimension separately."
+            )
+
+        if self._is_forecast(plan):
+            result = self.run_analysis(plan)
+            if result["status"] != "success":
+                error = (
+                    MCPValidationError
+                    if result.get("error_type") == "MCPValidationError"
+                    else MCPExecutionError
+                )
+                raise error(result.get("message"))
+            data = result["data"]
+            return pa.RecordBatchReader.from_batches(
+                data.schema, data.to_batches(max_chunksize=batch_size)
+            )
+
+        query = self.build_query(plan)
+        return self.bigquery.stream(
+            {"sql": query.sql, "params": query.params},
+            batch_size
+        )
+
+    # -----------------------------------------------------------------
+    # Breakdowns (parallel sub-queries)
+    # -----------------------------------------------------------------
+
+    def _run_breakdown(self, plan: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        One sub-query per breakdown axis, run in parallel and merged into
+        a long table: dimension, member, <metric>, share (of the axis
+        total). Categorical members are ordered by value, periods by date.
+        """
+        axes = plan["breakdowns"]
+        metric = plan["metric"]
+
+        with metrics.stage("breakdown"):
+            results = self.map_parallel(
+                self.run_analysis,
+                [self._breakdown_plan(plan, axis) for axis in axes]
+            )
+
+        for result in results:
+            if result.get("status") != "success":
+                return result
+
+        metadata = {
+            **results[0].get("metadata", {}),
+            "breakdowns": list(axes),
+            "parallelism": min(self.parallelism, len(axes)),
+        }
+        errors = [
+            r["metadata"]["max_relative_error"] for r in results
+            if r.get("metadata", {}).get("approximate")
+        ]
+        if errors:
+            metadata["max_relative_error"] = max(errors)
+
+        return {
+            "status": "success",
+            "metadata": metadata,
+            "data": pa.concat_tables([
+                self._breakdown_rows(axis, metric, result["data"])
+                for axis, result in zip(axes, results)
+            ]),
+        }
+
+    @staticmethod
+    def _breakdown_plan(plan: Dict[str, Any], axis: str) -> Dict[str, Any]:
+        """
+        Plain aggregate grouped by `axis`, or a time series for the
+        period axis, with the plan's filters and time range.
+        """
+        is_period = axis == PERIOD_AXIS
+        return {
+            **plan,
+            "dimensions": [] if is_period else [axis],
+            "breakdowns": [],
+            "analysis_types": ["trend"],
+            "comparison": None,
+            "time_grain": (plan.get("time_grain") or "month") if is_period else None,
+        }
+
+    @staticmethod
+    def _breakdown_rows(axis: str, metric: str, data: pa.Table) -> pa.Table:
+        if data.num_rows == 0:
+            members, values = pa.array([], pa.string()), pa.array([], pa.float64())
+        else:
+            if axis != PERIOD_AXIS:
+                data = data.sort_by([(metric, "descending")])
+            members = pc.cast(data[axis], pa.string())
+            values = pc.cast(data[metric], pa.float64())
+
+        total = pc.sum(values).as_py()
+        return pa.table({
+            "dimension": pa.array([axis] * len(values), pa.string()),
+            "member": members,
+            metric: values,
+            "share": pc.divide(values, total) if total else pa.nulls(len(values), pa.float64()),
+        })
+
+    def map_parallel(self, fn: Callable, items: List[Any]) -> List[Any]:
+        """
+        `[fn(item) for item in items]` on the worker pool (inline when
+        parallelism is 1 or there is a single item). Stage timings of the
+        workers are folded into the caller's trace.
+        """
+        if self.parallelism == 1 or len(items) < 2:
+            return [fn(item) for item in items]
+
+        traced = metrics.current_trace() is not None
+
+        def call(item):
+            if not traced:
+                return fn(item), None
+            with metrics.trace() as timings:
+                return fn(item), timings
+
+        outcomes = list(self._worker_pool().map(call, items))
+        for _, timings in outcomes:
+            if timings:
+                metrics.add_to_trace(timings)
+        return [result for result, _ in outcomes]
+
+    def _worker_pool(self) -> ThreadPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.parallelism,
+                    thread_name_prefix="analyst"
+                )
+            return self._pool
+
+    # -----------------------------------------------------------------
+    # Batch Execution (shared scans)
+    # -----------------------------------------------------------------
+
+    def run_batch(self, plans: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Analyze many plans with as few table passes as possible.
+
+        Plans sharing the same filters and time range are answered by one
+        GROUPING SETS query computing every requested metric; each plan's
+        rows are then sliced out of the shared result. Time-series,
+        driver-analysis, approximate and breakdown plans run on their own.
+        Invalid plans get an error result instead of failing the whole
+        batch; if a shared scan still fails, its plans are re-run one at
+        a time, so only the failing ones report the error.
+        """
+        results: List[Dict[str, Any]] = [None] * len(plans)
+        groups: Dict[Tuple, List[Tuple[int, Dict[str, Any], Dict[str, Any]]]] = {}
+
+        for i, plan in enumerate(plans):
+            try:
+                if (
+                    plan.get("time_grain")
+                    or plan.get("approx")
+                    or plan.get("breakdowns")
+                    or self._is_contribution(plan)
+                ):
+                    results[i] = self.run_analysis(plan)
+                    continue
+                metric_spec = self._validate_plan(plan)
+                time_range = self._time_range(plan.get("time_range"))
+            except (MCPValidationError, MCPExecutionError) as e:
+                results[i] = {
+                    "status": "error",
+                    "error_type": type(e).__name__,
+                    "message": str(e),
+                    "metadata": {},
+                    "data": EMPTY_RESULT
+                }
+                continue
+
+            key = (tuple(sorted(plan.get("filters", {}).items())), time_range)
+            groups.setdefault(key, []).append((i, plan, metric_spec))
+
+        for (filters, time_range), members in groups.items():
+            for i, result in self._run_shared_scan(
+                members, dict(filters), time_range
+            ):
+                results[i] = result
+
+        return results
+
+    def _run_shared_scan(
+        self,
+        members,
+        filters: Dict[str, str],
+        time_range: Optional[DateRange]
+    ):
+        # Union of dimensions / metrics, first-seen order
+        all_dims: List[str] = []
+        metric_specs: Dict[str, Dict[str, Any]] = {}
+        grouping_sets: Dict[frozenset, List[str]] = {}
+
+        for _, plan, metric_spec in members:
+            dims = plan.get("dimensions", [])
+            for dim in dims:
+                if dim not in all_dims:
+                    all_dims.append(dim)
+            metric_specs.setdefault(plan["metric"], metric_spec)
+            grouping_sets.setdefault(frozenset(dims), dims)
+
+        source, metric_exprs, time_column = self._resolve_source(
+            list(metric_specs.values()), all_dims, filters,
+            bounded=time_range is not None
+        )
+
+        query = build_grouping_sets_query(
+            source,
+            dict(zip(metric_specs, metric_exprs)),
+            all_dims,
+            grouping_sets.values(),
+            filters,
+            time_range,
+            time_column,
+            self._partition_keys(source)
+        )
+
+        result = self.bigquery.safe_execute({
+            "sql": query.sql,
+            "params": query.params
+        })
+        table = result.get("data", EMPTY_RESULT)
+        metadata = result.get("metadata", {})
+
+        if result.get("status") != "success":
+            for i, plan, _ in members:
+                yield i, self.run_analysis(plan) if len(members) > 1 else {
+                    "status": result.get("status", "error"),
+                    "error_type": result.get("error_type"),
+                    "message": result.get("message"),
+                    "metadata": metadata,
+                    "data": EMPTY_RESULT
+                }
+            return
+
+        for i, plan, _ in members:
+            dims = plan.get("dimensions", [])
+            part = table
+
+            if all_dims:
+                # GROUPING() sets a bit for every column rolled up, with
+                # the first argument as the most significant bit
+                grouping_id = sum(
+                    1 << (len(all_dims) - 1 - pos)
+                    for pos, dim in enumerate(all_dims) if dim not in dims
+                )
+                part = table.filter(
+                    pc.equal(table["_grouping_id"], grouping_id)
+                )
+
+            yield i, {
+                "status": "success",
+                "metadata": metadata,
+                "data": part.select(dims + [plan["metric"]])
+            }
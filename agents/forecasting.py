@@ -0,0 +1,413 @@
+"""
+forecasting.py
+
+Lightweight forecasting for plans with the `forecast` analysis type.
+
+The bucketed history of every dimension group (e.g. each region x product
+series) is laid out as one dense NumPy matrix, series x periods, and all
+models are fitted on the whole matrix at once:
+
+- linear trend     – closed-form least squares per row
+- seasonal naive   – repeat the last season
+- Holt-Winters     – additive level / trend / season; the smoothing
+                     parameters are grid-searched for every series in the
+                     same vectorized pass (the only Python loop runs over
+                     time steps, never over series)
+
+Each series keeps the model with the lowest one-step-ahead error, every
+model scored on the same periods (the linear trend is refitted on each
+prefix, in closed form via cumulative sums). Fitted state is cached per
+data version and query, so repeated forecasts only pay for the (cheap)
+projection.
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from itertools import product
+from typing import Hashable, List, Optional, Tuple
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from agents.time_ranges import DateRange
+
+DEFAULT_HORIZON = 6
+
+# Periods per season, by time grain (1 = no seasonality)
+SEASON_LENGTHS = {"day": 7, "week": 52, "month": 12, "quarter": 4, "year": 1}
+
+# Grain -> (numpy datetime unit, step) for building the period grid
+GRID_UNITS = {
+    "day": ("D", 1),
+    "week": ("D", 7),
+    "month": ("M", 1),
+    "quarter": ("M", 3),
+    "year": ("Y", 1),
+}
+
+# Holt-Winters (alpha, beta, gamma) candidates, searched per series
+HW_GRID = np.array(list(product(
+    (0.1, 0.3, 0.5, 0.8),
+    (0.05, 0.2),
+    (0.1, 0.3),
+)))
+
+Z_95 = 1.96
+
+MODELS = ("linear_trend", "seasonal_naive", "holt_winters")
+
+
+@dataclass
+class FittedModels:
+    """
+    Per-series model state, enough to project any horizon.
+    Arrays are indexed by series (first axis).
+    """
+    periods: int
+    season: int
+    choice: np.ndarray          # index into MODELS
+    sigma: np.ndarray           # residual std of the chosen model
+    intercept: np.ndarray
+    slope: np.ndarray
+    last_season: np.ndarray     # (series, season)
+    level: np.ndarray
+    trend: np.ndarray
+    seasonals: np.ndarray       # (series, season), indexed by t % season
+    alpha: np.ndarray
+    beta: np.ndarray
+
+
+class Forecaster:
+    """
+    Fits and projects forecasts for many series at once, caching fitted
+    parameters (LRU) per data version and query.
+    """
+
+    def __init__(self, cache_size: int = 256):
+        self.cache_size = cache_size
+        self._fits: "OrderedDict[Hashable, FittedModels]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def forecast(
+        self,
+        history: pa.Table,
+        dimensions: List[str],
+        metric: str,
+        grain: str,
+        horizon: int = DEFAULT_HORIZON,
+        cache_key: Optional[Hashable] = None,
+        window: Optional[DateRange] = None
+    ) -> pa.Table:
+        """
+        History plus `horizon` forecast periods for every series.
+
+        `history` holds one row per (dimensions, period) with the metric
+        value. Returns <dimensions>, period, <metric>, lower, upper, model,
+        is_forecast; lower / upper bound a 95% interval. Models are fitted
+        on the full history; with a `window` ([start, end)), only the
+        history periods inside it are returned.
+        """
+        dims = [d for d in dimensions if d != "order_date"]
+
+        if history.num_rows == 0:
+            return history.select(dims + ["period", metric])
+
+        keys, values, grid = self._to_matrix(history, dims, metric, grain, horizon)
+        periods = values.shape[1]
+
+        fit = self._cached_fit(cache_key)
+        if fit is None or fit.periods != periods:
+            fit = fit_models(values, SEASON_LENGTHS[grain])
+            self._store_fit(cache_key, fit)
+
+        if periods < 2:
+            horizon = 0
+        point, lower, upper = project(fit, horizon)
+
+        series, steps = values.shape[0], periods + horizon
+        empty = np.full((series, periods), np.nan)
+
+        columns = {
+            dim: keys[dim].take(pa.array(np.repeat(np.arange(series), steps)))
+            for dim in dims
+        }
+        columns["period"] = pa.array(np.tile(grid[:steps], series), pa.date32())
+        columns[metric] = np.hstack([values, point]).ravel()
+        columns["lower"] = pa.array(
+            np.hstack([empty, lower]).ravel(), from_pandas=True
+        )
+        columns["upper"] = pa.array(
+            np.hstack([empty, upper]).ravel(), from_pandas=True
+        )
+        models = np.array(MODELS, dtype=object)[fit.choice]
+        columns["model"] = pa.array(
+            np.where(
+                np.arange(steps) >= periods, models[:, None], None
+            ).ravel(),
+            pa.string()
+        )
+        columns["is_forecast"] = np.tile(np.arange(steps) >= periods, series)
+
+        table = pa.table(columns)
+        if window is None:
+            return table
+
+        start, end = (np.datetime64(day, "D") for day in window)
+        keep = (np.arange(steps) >= periods) | (
+            (grid[:steps] >= start) & (grid[:steps] < end)
+        )
+        return table.filter(pa.array(np.tile(keep, series)))
+
+    # -----------------------------------------------------------------
+    # Internal Helpers
+    # -----------------------------------------------------------------
+
+    @staticmethod
+    def _to_matrix(
+        history: pa.Table,
+        dims: List[str],
+        metric: str,
+        grain: str,
+        horizon: int
+    ) -> Tuple[pa.Table, np.ndarray, np.ndarray]:
+        """
+        Dense (series x periods) matrix over a gap-free period grid.
+
+        Returns (one row of dimension values per series, matrix, grid of
+        history + horizon periods as datetime64[D]). Buckets without rows
+        count as 0, which is exact for the additive metrics served here.
+        """
+        unit, step = GRID_UNITS[grain]
+        periods = history["period"].to_numpy().astype(f"datetime64[{unit}]")
+        start, end = periods.min(), periods.max()
+        grid = np.arange(start, end + step * (horizon + 1), step)
+        column = np.searchsorted(grid, periods)
+
+        if dims:
+            codes = [
+                pc.dictionary_encode(history[d]).combine_chunks().indices
+                .to_numpy(zero_copy_only=False)
+                for d in dims
+            ]
+            _, first, row = np.unique(
+                np.stack(codes, axis=1), axis=0,
+                return_index=True, return_inverse=True
+            )
+            row = row.ravel()
+            keys = history.select(dims).take(pa.array(first))
+        else:
+            row = np.zeros(history.num_rows, dtype=np.int64)
+            keys = history.select([])
+
+        values = np.zeros((row.max() + 1, int(column.max()) + 1))
+        values[row, column] = (
+            history[metric].fill_null(0).to_numpy().astype(np.float64)
+        )
+        return keys, values, grid.astype("datetime64[D]")
+
+    def _cached_fit(self, key: Optional[Hashable]) -> Optional[FittedModels]:
+        if key is None:
+            return None
+        with self._lock:
+            fit = self._fits.get(key)
+            if fit is not None:
+                self._fits.move_to_end(key)
+            return fit
+
+    def _store_fit(self, key: Optional[Hashable], fit: FittedModels) -> None:
+        if key is None:
+            return
+        with self._lock:
+            self._fits[key] = fit
+            self._fits.move_to_end(key)
+            while len(self._fits) > self.cache_size:
+                self._fits.popitem(last=False)
+
+
+# ---------------------------------------------------------------------
+# Vectorized Models
+# ---------------------------------------------------------------------
+
+def fit_models(values: np.ndarray, season: int) -> FittedModels:
+    """
+    Fit every model on every row of `values` and keep the best per row.
+
+    Candidates are compared on their one-step-ahead RMSE over the same
+    periods: from the first period every model can predict (two points
+    for a line, one season for the seasonal models) to the last.
+    """
+    series, periods = values.shape
+    inf = np.full(series, np.inf)
+    zeros = np.zeros(series)
+
+    lag = min(season, periods - 1) if periods > 1 else 1
+    start = max(2, lag)
+
+    # Linear trend (the projection uses the fit over the full history)
+    t = np.arange(periods, dtype=np.float64)
+    t_mean = t.mean()
+    stt = ((t - t_mean) ** 2).sum()
+    y_mean = values.mean(axis=1)
+    slope = (values - y_mean[:, None]) @ (t - t_mean) / stt if stt else zeros
+    intercept = y_mean - slope * t_mean
+    residuals = values - (intercept[:, None] + slope[:, None] * t)
+    linear_sigma = np.sqrt(
+        (residuals ** 2).sum(axis=1) / max(periods - 2, 1)
+    )
+    linear_rmse = _rmse(_linear_one_step_errors(values, start), inf)
+
+    # Seasonal naive (plain naive without seasonality)
+    naive_rmse = _rmse(
+        values[:, start:] - values[:, start - lag:periods - lag], inf
+    )
+    last_season = values[:, periods - lag:]
+
+    # Holt-Winters (needs two full seasons to initialize and validate);
+    # its errors start at period `season`, which is `start` here
+    hw = None
+    if season > 1 and periods >= 2 * season:
+        hw = _fit_holt_winters(values, season)
+    hw_rmse = hw[0] if hw else inf
+
+    rmse = np.stack([linear_rmse, naive_rmse, hw_rmse])
+    choice = rmse.argmin(axis=0)
+    sigma = np.choose(choice, [linear_sigma, naive_rmse, hw_rmse])
+
+    _, level, trend, seasonals, alpha, beta = hw if hw else (
+        None, zeros, zeros, np.zeros((series, max(season, 1))), zeros, zeros
+    )
+
+    return FittedModels(
+        periods=periods,
+        season=lag,
+        choice=choice,
+        sigma=np.nan_to_num(sigma),
+        intercept=intercept,
+        slope=slope,
+        last_season=last_season,
+        level=level,
+        trend=trend,
+        seasonals=seasonals,
+        alpha=alpha,
+        beta=beta,
+    )
+
+
+def _linear_one_step_errors(values: np.ndarray, start: int) -> np.ndarray:
+    """
+    Errors (series, periods - start) of a least-squares line fitted on
+    periods [0, n) and evaluated at n, for every n from `start` (>= 2).
+    """
+    periods = values.shape[1]
+    n = np.arange(start, periods, dtype=np.float64)
+    if not len(n):
+        return values[:, :0]
+
+    t = np.arange(periods, dtype=np.float64)
+    prefix = n.astype(np.int64) - 1
+    sum_y = np.cumsum(values, axis=1)[:, prefix]
+    sum_ty = np.cumsum(values * t, axis=1)[:, prefix]
+    sum_t = n * (n - 1) / 2
+    sum_tt = (n - 1) * n * (2 * n - 1) / 6
+
+    slope = (n * sum_ty - sum_t * sum_y) / (n * sum_tt - sum_t ** 2)
+    intercept = (sum_y - slope * sum_t) / n
+    return values[:, start:] - (intercept + slope * n)
+
+
+def _rmse(errors: np.ndarray, default: np.ndarray) -> np.ndarray:
+    """
+    Row-wise RMSE of `errors`, or `default` when there are none.
+    """
+    if not errors.shape[1]:
+        return default
+    return np.sqrt((errors ** 2).mean(axis=1))
+
+
+def _fit_holt_winters(values: np.ndarray, season: int):
+    """
+    Additive Holt-Winters over every (parameter set, series) pair at once.
+
+    Returns (rmse, level, trend, seasonals, alpha, beta) for the best
+    parameter set of each series, with states at the last period.
+    """
+    series, periods = values.shape
+    grid = HW_GRID[:, :, None]                      # (G, 3, 1)
+    alpha, beta, gamma = grid[:, 0], grid[:, 1], grid[:, 2]
+
+    first = values[:, :season].mean(axis=1)
+    second = values[:, season:2 * season].mean(axis=1)
+    level = np.broadcast_to(first, (len(HW_GRID), series)).copy()
+    trend = np.broadcast_to((second - first) / season, level.shape).copy()
+    seasonals = np.broadcast_to(
+        values[:, :season] - first[:, None], (len(HW_GRID), series, season)
+    ).copy()
+
+    sse = np.zeros(level.shape)
+    for t in range(season, periods):
+        y = values[:, t]
+        s = seasonals[:, :, t % season]
+        error = y - (level + trend + s)
+        sse += error ** 2
+
+        new_level = alpha * (y - s) + (1 - alpha) * (level + trend)
+        trend = beta * (new_level - level) + (1 - beta) * trend
+        seasonals[:, :, t % season] = gamma * (y - new_level) + (1 - gamma) * s
+        level = new_level
+
+    best = sse.argmin(axis=0)
+    pick = (best, np.arange(series))
+    rmse = np.sqrt(sse[pick] / (periods - season))
+
+    return (
+        rmse,
+        level[pick],
+        trend[pick],
+        seasonals[best, np.arange(series)],
+        HW_GRID[best, 0],
+        HW_GRID[best, 1],
+    )
+
+
+def project(fit: FittedModels, horizon: int):
+    """
+    Point forecasts and 95% bounds, each (series, horizon).
+    """
+    periods = fit.periods
+    h = np.arange(1, horizon + 1)
+
+    # Linear trend: prediction interval of an OLS fit
+    t = np.arange(periods, dtype=np.float64)
+    t_future = periods - 1 + h
+    stt = ((t - t.mean()) ** 2).sum() or 1.0
+    linear = fit.intercept[:, None] + fit.slope[:, None] * t_future
+    linear_se = np.sqrt(1 + 1 / periods + (t_future - t.mean()) ** 2 / stt)
+
+    # Seasonal naive: uncertainty grows with every repeated season
+    naive = fit.last_season[:, (h - 1) % fit.season]
+    naive_se = np.sqrt((h - 1) // fit.season + 1.0)
+
+    # Holt-Winters: additive-error approximation
+    season = fit.seasonals.shape[1]
+    hw = (
+        fit.level[:, None]
+        + fit.trend[:, None] * h
+        + fit.seasonals[:, (periods + h - 1) % season]
+    )
+    steps = np.arange(horizon)[None, :]
+    weights = (fit.alpha[:, None] * (1 + steps * fit.beta[:, None])) ** 2
+    weights[:, :1] = 0.0
+    hw_se = np.sqrt(1 + np.cumsum(weights, axis=1))
+
+    choice = fit.choice[:, None]
+    point = np.choose(choice, [linear, naive, hw])
+    scale = np.choose(
+        choice,
+        [np.broadcast_to(linear_se, point.shape),
+         np.broadcast_to(naive_se, point.shape), hw_se]
+    )
+    margin = Z_95 * fit.sigma[:, None] * scale
+
+    return point, point - margin, point + margin
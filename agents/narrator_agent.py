@@ -4,6 +4,10 @@ narrator_agent.py
 Converts numerical output into business insights.
 """
 
+# Metadata keys describing an approximate result (see approximate.py)
+APPROXIMATION_KEYS = ("estimator", "confidence_level", "max_relative_error")
+
+
 class NarratorAgent:
     def narrate(self, result: dict) -> dict:
         if not result or "data" not in result:
@@ -14,9 +18,18 @@ class NarratorAgent:
             }
 
         data = result["data"]
+        metadata = result.get("metadata") or {}
 
-        return {
+        insight = {
             "summary": "Analysis completed successfully",
-            "rows": len(data),
-            "data": data[:5]  # preview
+            "rows": data.num_rows,
+            "data": data.slice(0, 5)  # preview (zero-copy)
         }
+
+        if metadata.get("approximate"):
+            insight["summary"] = "Approximate analysis completed successfully"
+            insight["approximation"] = {
+                key: metadata.get(key) for key in APPROXIMATION_KEYS
+            }
+
+        return insight
@@ -14,7 +14,8 @@ This mirrors how real autonomous planner agents work in production AI systems.
 """
 
 from typing import Dict, List, Optional
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
+from functools import lru_cache
 import re
 
 
@@ -35,9 +36,46 @@ class AnalysisPlan:
     time_range: Optional[str]
     analysis_types: List[str]
     comparison: Optional[str]
+    time_grain: Optional[str]
+    breakdowns: List[str]
     confidence: float
 
 
+# ---------------------------------------------------------------------
+# Keyword Automaton
+# ---------------------------------------------------------------------
+
+def _trie_pattern(words: List[str]) -> str:
+    """
+    Regex alternation factored as a prefix trie.
+
+    `re` tries alternatives one by one, so a flat `a|b|c|...` costs one
+    attempt per keyword at every position. Sharing prefixes turns the
+    match into a walk down a single branch of the trie.
+    """
+    trie: Dict = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def render(node: Dict) -> str:
+        is_word = "" in node
+        branches = [
+            re.escape(ch) + render(child)
+            for ch, child in sorted(node.items()) if ch
+        ]
+        if not branches:
+            return ""
+        if len(branches) == 1 and not is_word:
+            return branches[0]
+        body = "(?:" + "|".join(branches) + ")"
+        return body + "?" if is_word else body
+
+    return render(trie)
+
+
 # ---------------------------------------------------------------------
 # Planner Agent
 # ---------------------------------------------------------------------
@@ -49,6 +87,9 @@ class PlannerAgent:
     It is deliberately conservative:
     - If intent is ambiguous, confidence is lowered
     - Downstream guardrails may reject low-confidence plans
+
+    All keyword tables are compiled into a single regex that is scanned
+    once per query, and plans are memoized per (lowercased) query.
     """
 
     SUPPORTED_ANALYSIS_TYPES = {
@@ -62,17 +103,83 @@ class PlannerAgent:
     METRIC_KEYWORDS = {
         "revenue": ["revenue", "sales", "income"],
         "orders": ["orders", "transactions"],
-        "customers": ["customers", "users", "buyers"]
+        "customers": ["customers", "users", "buyers"],
+        "products": ["distinct products", "unique products", "number of products"]
+    }
+
+    # Distinct-count metric -> the dimension it counts; naming the metric
+    # ("distinct products") does not ask to group by that dimension
+    COUNTED_DIMENSIONS = {"products": "product"}
+
+    # Checked in this order; the order is reflected in `analysis_types`
+    ANALYSIS_KEYWORDS = {
+        "contribution": ["why", "reason", "cause"],
+        "trend": ["trend", "over time", "change"],
+        "comparison": ["compare", "vs", "versus"],
+        "forecast": ["forecast", "predict", "future"]
+    }
+
+    # First match wins, in this order
+    COMPARISON_KEYWORDS = {
+        "month_over_month": ["month over month", "mom"],
+        "year_over_year": ["year over year", "yoy"]
     }
 
-    REGION_PATTERN = re.compile(r"\b(north|south|east|west)\b", re.IGNORECASE)
+    # Abbreviations, matched as whole words only ("mom" is not "moment")
+    WHOLE_WORD_KEYWORDS = {"mom", "yoy"}
+
+    RELATIVE_TIME_KEYWORDS = {
+        "last_month": ["last month"],
+        "last_year": ["last year"]
+    }
+
+    # "last 6 months" -> "last_6_months" (see agents/time_ranges.py)
+    LAST_N_PATTERN = re.compile(r"\blast (\d+) (month|year)s?\b")
+
+    # Explicit bucket size for time-series plans
+    GRAIN_KEYWORDS = {
+        "day": ["daily"],
+        "week": ["weekly"],
+        "month": ["monthly"],
+        "quarter": ["quarterly"],
+        "year": ["yearly", "annual"]
+    }
+
+    # Analysis types answered with a bucketed time series
+    SERIES_ANALYSIS_TYPES = {"trend", "forecast"}
+    DEFAULT_TIME_GRAIN = "month"
+
+    DIMENSION_KEYWORDS = {
+        "region": ["region"],
+        "product": ["product", "category"]
+    }
+
+    # "breakdown" asks for one result per axis (dimensions and, with
+    # "period", the time axis) instead of a single grouped result
+    BREAKDOWN_KEYWORDS = {
+        "breakdown": ["breakdown", "break down"],
+        "period": ["time period"]
+    }
+    DEFAULT_BREAKDOWNS = ("region", "product", "period")
+
+    REGIONS = ["north", "south", "east", "west"]
+    MONTHS = [
+        "january", "february", "march", "april", "may", "june", "july",
+        "august", "september", "october", "november", "december"
+    ]
+
+    REGION_PATTERN = re.compile(
+        r"\b(" + "|".join(REGIONS) + r")\b", re.IGNORECASE
+    )
     MONTH_PATTERN = re.compile(
-        r"\b(january|february|march|april|may|june|july|august|september|october|november|december)\b",
-        re.IGNORECASE
+        r"\b(" + "|".join(MONTHS) + r")\b", re.IGNORECASE
     )
 
-    def __init__(self):
-        pass
+    PLAN_CACHE_SIZE = 4096
+
+    def __init__(self, plan_cache_size: int = PLAN_CACHE_SIZE):
+        self._matcher, self._tokens = self._compile_matcher()
+        self._plan_for = lru_cache(maxsize=plan_cache_size)(self._build_plan)
 
     # -----------------------------------------------------------------
     # Public API
@@ -84,22 +191,107 @@ class PlannerAgent:
 
         Returns a dictionary representation of AnalysisPlan.
         """
-        plan = self._build_plan(user_query)
-        return asdict(plan)
+        plan = self._plan_for(user_query.lower())
+
+        # Fresh containers: callers may mutate the dict, the cached plan
+        # must stay intact (values are all immutable strings / floats)
+        plan_dict = dict(vars(plan))
+        plan_dict["dimensions"] = list(plan.dimensions)
+        plan_dict["filters"] = dict(plan.filters)
+        plan_dict["analysis_types"] = list(plan.analysis_types)
+        plan_dict["breakdowns"] = list(plan.breakdowns)
+        return plan_dict
+
+    # -----------------------------------------------------------------
+    # Matcher Compilation
+    # -----------------------------------------------------------------
+
+    @classmethod
+    def _compile_matcher(cls):
+        """
+        Compile every keyword table into one trie-shaped alternation.
+
+        The alternation sits inside a lookahead, so a single `finditer`
+        pass reports every keyword occurrence, including overlapping ones,
+        with the same substring / word-boundary semantics as checking each
+        table separately. Returns (pattern, token -> (category, value)).
+        """
+        tokens = {}
+
+        def add(category, table):
+            for value, keywords in table.items():
+                for keyword in keywords:
+                    tokens[keyword] = (category, value)
+
+        add("metric", cls.METRIC_KEYWORDS)
+        add("analysis", cls.ANALYSIS_KEYWORDS)
+        add("comparison", cls.COMPARISON_KEYWORDS)
+        add("time", cls.RELATIVE_TIME_KEYWORDS)
+        add("grain", cls.GRAIN_KEYWORDS)
+        add("dimension", cls.DIMENSION_KEYWORDS)
+        add("breakdown", cls.BREAKDOWN_KEYWORDS)
+
+        words = {
+            keyword: tokens.pop(keyword) for keyword in cls.WHOLE_WORD_KEYWORDS
+        }
+        for region in cls.REGIONS:
+            words[region] = ("region", region.capitalize())
+        for month in cls.MONTHS:
+            words[month] = ("month", month.capitalize())
+
+        # Only one alternative can match at a position; a keyword that is a
+        # prefix of another would be shadowed there.
+        every = list(tokens) + list(words)
+        for short in every:
+            for long in every:
+                if short != long and long.startswith(short):
+                    raise ValueError(
+                        f"Keyword '{short}' is a prefix of '{long}'."
+                    )
+
+        pattern = re.compile(
+            "(?=("
+            + _trie_pattern(list(tokens))
+            + r"|\b" + _trie_pattern(list(words)) + r"\b"
+            + "))"
+        )
+
+        tokens.update(words)
+        return pattern, tokens
+
+    def _scan(self, query: str) -> Dict[str, List[str]]:
+        """
+        Single pass over the query: category -> matched values, in order
+        of first occurrence.
+        """
+        matches: Dict[str, List[str]] = {}
+        for m in self._matcher.finditer(query):
+            category, value = self._tokens[m.group(1)]
+            values = matches.setdefault(category, [])
+            if value not in values:
+                values.append(value)
+        return matches
 
     # -----------------------------------------------------------------
     # Internal Logic
     # -----------------------------------------------------------------
 
-    def _build_plan(self, query: str) -> AnalysisPlan:
-        query_lower = query.lower()
+    def _build_plan(self, query_lower: str) -> AnalysisPlan:
+        matches = self._scan(query_lower)
 
-        metric = self._extract_metric(query_lower)
-        dimensions = self._extract_dimensions(query_lower)
-        filters = self._extract_filters(query_lower)
-        time_range = self._extract_time_range(query_lower)
-        analysis_types = self._extract_analysis_types(query_lower)
-        comparison = self._extract_comparison(query_lower)
+        metric = self._extract_metric(matches)
+        dimensions = [
+            dim for dim in self._extract_dimensions(matches)
+            if dim != self.COUNTED_DIMENSIONS.get(metric)
+        ]
+        filters = self._extract_filters(matches)
+        time_range = self._extract_time_range(matches, query_lower)
+        analysis_types = self._extract_analysis_types(matches)
+        comparison = self._extract_comparison(matches)
+        time_grain = self._extract_time_grain(matches, comparison)
+        breakdowns = self._extract_breakdowns(matches, dimensions, filters)
+        if breakdowns:
+            dimensions = []
 
         confidence = self._estimate_confidence(
             metric, analysis_types, time_range
@@ -112,6 +304,8 @@ class PlannerAgent:
             time_range=time_range,
             analysis_types=analysis_types,
             comparison=comparison,
+            time_grain=time_grain,
+            breakdowns=breakdowns,
             confidence=confidence
         )
 
@@ -119,59 +313,54 @@ class PlannerAgent:
     # Extraction Helpers
     # -----------------------------------------------------------------
 
-    def _extract_metric(self, query: str) -> str:
-        for metric, keywords in self.METRIC_KEYWORDS.items():
-            if any(keyword in query for keyword in keywords):
+    def _extract_metric(self, matches: Dict[str, List[str]]) -> str:
+        found = matches.get("metric", [])
+        for metric in self.METRIC_KEYWORDS:
+            if metric in found:
                 return metric
         return "unknown_metric"
 
-    def _extract_dimensions(self, query: str) -> List[str]:
+    def _extract_dimensions(self, matches: Dict[str, List[str]]) -> List[str]:
         dimensions = []
 
-        if self.REGION_PATTERN.search(query):
+        if "region" in matches or "region" in matches.get("dimension", []):
             dimensions.append("region")
 
-        if "product" in query:
+        if "product" in matches.get("dimension", []):
             dimensions.append("product")
 
         return dimensions
 
-    def _extract_filters(self, query: str) -> Dict[str, str]:
+    def _extract_filters(self, matches: Dict[str, List[str]]) -> Dict[str, str]:
         filters = {}
 
-        region_match = self.REGION_PATTERN.search(query)
-        if region_match:
-            filters["region"] = region_match.group(1).capitalize()
+        if "region" in matches:
+            filters["region"] = matches["region"][0]
 
         return filters
 
-    def _extract_time_range(self, query: str) -> Optional[str]:
-        month_match = self.MONTH_PATTERN.search(query)
-        if month_match:
-            return month_match.group(1).capitalize()
+    def _extract_time_range(
+        self,
+        matches: Dict[str, List[str]],
+        query_lower: str
+    ) -> Optional[str]:
+        if "month" in matches:
+            return matches["month"][0]
 
-        if "last month" in query:
-            return "last_month"
+        last_n = self.LAST_N_PATTERN.search(query_lower)
+        if last_n and int(last_n.group(1)) > 0:
+            return f"last_{int(last_n.group(1))}_{last_n.group(2)}s"
 
-        if "last year" in query:
-            return "last_year"
+        relative = matches.get("time", [])
+        for time_range in self.RELATIVE_TIME_KEYWORDS:
+            if time_range in relative:
+                return time_range
 
         return None
 
-    def _extract_analysis_types(self, query: str) -> List[str]:
-        analysis_types = []
-
-        if any(word in query for word in ["why", "reason", "cause"]):
-            analysis_types.append("contribution")
-
-        if any(word in query for word in ["trend", "over time", "change"]):
-            analysis_types.append("trend")
-
-        if any(word in query for word in ["compare", "vs", "versus"]):
-            analysis_types.append("comparison")
-
-        if any(word in query for word in ["forecast", "predict", "future"]):
-            analysis_types.append("forecast")
+    def _extract_analysis_types(self, matches: Dict[str, List[str]]) -> List[str]:
+        found = matches.get("analysis", [])
+        analysis_types = [at for at in self.ANALYSIS_KEYWORDS if at in found]
 
         # Fallback
         if not analysis_types:
@@ -183,12 +372,59 @@ class PlannerAgent:
             if at in self.SUPPORTED_ANALYSIS_TYPES
         ]
 
-    def _extract_comparison(self, query: str) -> Optional[str]:
-        if "month over month" in query or "mom" in query:
-            return "month_over_month"
+    def _extract_breakdowns(
+        self,
+        matches: Dict[str, List[str]],
+        dimensions: List[str],
+        filters: Dict[str, str]
+    ) -> List[str]:
+        """
+        Axes of a breakdown question: the mentioned dimensions (minus
+        filtered ones) plus "period" for the time axis; every default
+        axis when none is named. Fewer than two axes is a plain grouped
+        query, so no breakdown.
+        """
+        found = matches.get("breakdown", [])
+        if "breakdown" not in found:
+            return []
+
+        axes = [d for d in dimensions if d not in filters]
+        if "period" in found:
+            axes.append("period")
+        if not dimensions and "period" not in found:
+            axes = list(self.DEFAULT_BREAKDOWNS)
+
+        return axes if len(axes) > 1 else []
 
-        if "year over year" in query or "yoy" in query:
-            return "year_over_year"
+    def _extract_comparison(self, matches: Dict[str, List[str]]) -> Optional[str]:
+        found = matches.get("comparison", [])
+        for comparison in self.COMPARISON_KEYWORDS:
+            if comparison in found:
+                return comparison
+
+        return None
+
+    def _extract_time_grain(
+        self,
+        matches: Dict[str, List[str]],
+        comparison: Optional[str]
+    ) -> Optional[str]:
+        """
+        Bucket size when the question asks for a time series (an explicit
+        trend or forecast, a MoM / YoY comparison or a grain keyword),
+        else None.
+
+        The fallback `trend` analysis type does not count: plain
+        aggregates stay plain aggregates.
+        """
+        found = matches.get("grain", [])
+        for grain in self.GRAIN_KEYWORDS:
+            if grain in found:
+                return grain
+
+        explicit = self.SERIES_ANALYSIS_TYPES & set(matches.get("analysis", []))
+        if comparison or explicit:
+            return self.DEFAULT_TIME_GRAIN
 
         return None
 
@@ -0,0 +1,171 @@
+"""
+query_builder.py
+
+Structured SQL construction for DataAnalystAgent.
+
+Queries are emitted as fixed templates with `$n` placeholders: the SQL
+text depends only on the query *shape* (metric, dimensions, filter keys,
+whether a time filter applies), while filter values travel as bound
+parameters. Every distinct region or month therefore reuses the same
+template, which BigQueryMCP prepares once per shape.
+
+Identifiers (metrics, dimensions, filter keys, tables) are never taken
+from user input directly; they are validated by LookerMCP / CatalogMCP
+before reaching the builder.
+"""
+
+import datetime
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from agents.time_ranges import DateRange
+
+# (year, month) partition columns of a hive-partitioned source
+PartitionKeys = Tuple[str, str]
+
+
+class SQLQuery(NamedTuple):
+    sql: str
+    params: List[Any]
+
+
+class QueryBuilder:
+    """
+    Minimal SELECT builder that numbers bound parameters.
+    """
+
+    def __init__(self, source: str):
+        self.source = source
+        self.select: List[str] = []
+        self.where: List[str] = []
+        self.group_by: Optional[str] = None
+        self.order_by: Optional[str] = None
+        self.params: List[Any] = []
+
+    def bind(self, value: Any) -> str:
+        """
+        Register a parameter value and return its placeholder.
+        """
+        self.params.append(value)
+        return f"${len(self.params)}"
+
+    def add_filters(
+        self,
+        filters: Dict[str, Any],
+        time_range: Optional[DateRange],
+        time_column: str,
+        partition_keys: Optional[PartitionKeys] = None
+    ) -> "QueryBuilder":
+        """
+        Equality filters plus `start <= time_column < end` for a resolved
+        time range (see time_ranges.py). With `partition_keys`, the range
+        is repeated on the (year, month) partition columns, which DuckDB
+        uses to skip whole directories.
+        """
+        # Sorted keys: equal filter sets always yield the same template
+        for column in sorted(filters):
+            self.where.append(f"{column} = {self.bind(filters[column])}")
+
+        if time_range:
+            start, end = time_range
+            self.where.append(f"{time_column} >= {self.bind(start)}")
+            self.where.append(f"{time_column} < {self.bind(end)}")
+            if partition_keys:
+                self.add_partition_range(partition_keys, start, end)
+        return self
+
+    def add_partition_range(
+        self,
+        partition_keys: PartitionKeys,
+        start: datetime.date,
+        end: datetime.date
+    ) -> "QueryBuilder":
+        """
+        `(year, month)` between the months of `start` and of the last day
+        before `end` (row comparisons are what DuckDB prunes on).
+        """
+        year, month = partition_keys
+        last = end - datetime.timedelta(days=1)
+        self.where.append(
+            f"({year}, {month}) >= "
+            f"({self.bind(start.year)}, {self.bind(start.month)})"
+        )
+        self.where.append(
+            f"({year}, {month}) <= "
+            f"({self.bind(last.year)}, {self.bind(last.month)})"
+        )
+        return self
+
+    def build(self) -> SQLQuery:
+        sql = f"SELECT {', '.join(self.select)} FROM {self.source}"
+
+        if self.where:
+            sql += f" WHERE {' AND '.join(self.where)}"
+
+        if self.group_by:
+            sql += f" GROUP BY {self.group_by}"
+
+        if self.order_by:
+            sql += f" ORDER BY {self.order_by}"
+
+        return SQLQuery(sql, self.params)
+
+
+def build_aggregate_query(
+    source: str,
+    metric: str,
+    metric_expr: str,
+    dimensions: List[str],
+    filters: Dict[str, Any],
+    time_range: Optional[DateRange],
+    time_column: str,
+    partition_keys: Optional[PartitionKeys] = None
+) -> SQLQuery:
+    """
+    SELECT <dimensions>, <metric> ... GROUP BY <dimensions>
+    """
+    builder = QueryBuilder(source)
+    builder.select = list(dimensions) + [f"{metric_expr} AS {metric}"]
+
+    if dimensions:
+        builder.group_by = ", ".join(dimensions)
+
+    return builder.add_filters(
+        filters, time_range, time_column, partition_keys
+    ).build()
+
+
+def build_grouping_sets_query(
+    source: str,
+    metrics: Dict[str, str],
+    dimensions: List[str],
+    grouping_sets: Iterable[List[str]],
+    filters: Dict[str, Any],
+    time_range: Optional[DateRange],
+    time_column: str,
+    partition_keys: Optional[PartitionKeys] = None
+) -> SQLQuery:
+    """
+    One scan computing every metric over several GROUPING SETS.
+
+    `_grouping_id` (GROUPING() over `dimensions`) identifies which set
+    each output row belongs to.
+    """
+    builder = QueryBuilder(source)
+    measures = [f"{expr} AS {name}" for name, expr in metrics.items()]
+
+    if dimensions:
+        builder.select = (
+            list(dimensions)
+            + [f"GROUPING({', '.join(dimensions)}) AS _grouping_id"]
+            + measures
+        )
+        sets = ", ".join(
+            "(" + ", ".join(dims) + ")" for dims in grouping_sets
+        )
+        builder.group_by = f"GROUPING SETS ({sets})"
+    else:
+        builder.select = measures
+
+    return builder.add_filters(
+        filters, time_range, time_column, partition_keys
+    ).build()
@@ -0,0 +1,98 @@
+"""
+time_ranges.py
+
+Resolves the planner's `time_range` values into concrete `[start, end)`
+date ranges, applied as range predicates on the time column:
+
+    order_date >= $1 AND order_date < $2
+
+Unlike EXTRACT(month FROM ...) = ..., a range predicate is answered from
+min/max statistics, so DuckDB skips row groups (and Parquet files) that
+lie outside it, and a month means one month, not that month in every
+year.
+
+Relative ranges are anchored on `today`, the latest date with data
+(see DataAnalystAgent), and cover whole calendar months or years:
+
+- "March"          – the most recent March up to the anchor month
+- "last_month"     – the calendar month before the anchor month
+- "last_N_months"  – the N calendar months before the anchor month
+- "last_year"      – the calendar year before the anchor year
+- "last_N_years"   – the N calendar years before the anchor year
+- "2024-03"/"2024" – that month / year
+"""
+
+import datetime
+import re
+from typing import Optional, Tuple
+
+DateRange = Tuple[datetime.date, datetime.date]
+
+# Literal, not calendar.month_name: the planner emits English names
+# whatever the process locale
+MONTH_NUMBERS = {
+    "January": 1, "February": 2, "March": 3, "April": 4,
+    "May": 5, "June": 6, "July": 7, "August": 8,
+    "September": 9, "October": 10, "November": 11, "December": 12,
+}
+
+# Longest relative range ("last_N_years" / "last_N_months"); N is
+# free-form user text, and larger values overflow datetime.date
+MAX_RELATIVE_YEARS = 100
+
+RELATIVE_PATTERN = re.compile(r"^last_(?:(\d+)_)?(month|year)s?$")
+ABSOLUTE_PATTERN = re.compile(r"^(\d{4})(?:-(\d{1,2}))?$")
+
+
+def add_months(day: datetime.date, months: int) -> datetime.date:
+    """
+    First day of the month `months` months after the month of `day`.
+    """
+    index = day.year * 12 + day.month - 1 + months
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def resolve_time_range(
+    time_range: Optional[str],
+    today: datetime.date
+) -> Optional[DateRange]:
+    """
+    `[start, end)` of `time_range` relative to `today`, or None when no
+    range applies. Raises ValueError for values it does not understand.
+    """
+    if not time_range:
+        return None
+
+    this_month = today.replace(day=1)
+
+    month = MONTH_NUMBERS.get(time_range.capitalize())
+    if month:
+        year = today.year if month <= today.month else today.year - 1
+        start = datetime.date(year, month, 1)
+        return start, add_months(start, 1)
+
+    relative = RELATIVE_PATTERN.match(time_range)
+    if relative:
+        count = int(relative.group(1) or 1)
+        limit = MAX_RELATIVE_YEARS * (12 if relative.group(2) == "month" else 1)
+        if not 1 <= count <= limit:
+            raise ValueError(
+                f"Unsupported time range '{time_range}': "
+                f"at most {MAX_RELATIVE_YEARS} years back."
+            )
+        if relative.group(2) == "month":
+            return add_months(this_month, -count), this_month
+        this_year = datetime.date(today.year, 1, 1)
+        return add_months(this_year, -12 * count), this_year
+
+    absolute = ABSOLUTE_PATTERN.match(time_range)
+    if absolute:
+        year = int(absolute.group(1))
+        if absolute.group(2) is None:
+            return datetime.date(year, 1, 1), datetime.date(year + 1, 1, 1)
+        month = int(absolute.group(2))
+        if 1 <= month <= 12:
+            start = datetime.date(year, month, 1)
+            return start, add_months(start, 1)
+
+    raise ValueError(f"Unsupported time range '{time_range}'.")
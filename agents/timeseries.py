@@ -0,0 +1,163 @@
+"""
+timeseries.py
+
+Time-series SQL for trend and period-over-period plans.
+
+One query per plan:
+1. `series`   – the metric aggregated into date_trunc buckets
+                (per categorical dimension).
+2. `windowed` – window functions add the previous comparable period
+                (MoM / YoY) and a rolling average.
+3. outer      – the plan's time filter, the change columns, ordering.
+
+Previous periods come from RANGE frames with INTERVAL offsets rather
+than LAG: a missing bucket (a month without orders) yields NULL instead
+of silently comparing against an older period. With a time range, the
+scan is bounded to the range widened by the comparison offset and the
+rolling window (a sargable range on the time column), and the requested
+periods are trimmed only after the windows, so the first of them still
+sees its predecessor.
+"""
+
+import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from agents.query_builder import PartitionKeys, QueryBuilder, SQLQuery
+from agents.time_ranges import DateRange, add_months
+
+DEFAULT_GRAIN = "month"
+
+# Grain -> (bucket length, unit) used to size rolling windows
+GRAIN_STEPS = {
+    "day": (1, "DAY"),
+    "week": (7, "DAY"),
+    "month": (1, "MONTH"),
+    "quarter": (3, "MONTH"),
+    "year": (12, "MONTH"),
+}
+
+# Offsets are calendar intervals, so they must be a whole number of
+# buckets (e.g. YoY over weekly buckets finds no previous period).
+# Without an explicit comparison, each bucket is compared with the one
+# before it.
+COMPARISON_OFFSETS = {
+    "month_over_month": (1, "MONTH"),
+    "year_over_year": (12, "MONTH"),
+}
+
+ROLLING_PERIODS = 3
+
+
+def _shift(day: datetime.date, amount: int, unit: str) -> datetime.date:
+    if unit == "MONTH":
+        return add_months(day, amount)
+    return day + datetime.timedelta(days=amount)
+
+
+def _bucket_start(day: datetime.date, grain: str) -> datetime.date:
+    """
+    Python counterpart of date_trunc(grain, day).
+    """
+    if grain == "day":
+        return day
+    if grain == "week":
+        return day - datetime.timedelta(days=day.weekday())
+    if grain == "month":
+        return day.replace(day=1)
+    if grain == "quarter":
+        return datetime.date(day.year, (day.month - 1) // 3 * 3 + 1, 1)
+    return datetime.date(day.year, 1, 1)
+
+
+def scan_range(
+    time_range: DateRange,
+    grain: str,
+    offset: Tuple[int, str],
+    rolling_periods: int
+) -> DateRange:
+    """
+    Rows needed to compute the buckets of `time_range`: whole buckets,
+    reaching back far enough for the comparison period and the rolling
+    window of the first one.
+    """
+    start, end = time_range
+    step, unit = GRAIN_STEPS[grain]
+
+    first = _bucket_start(start, grain)
+    lower = _shift(
+        _shift(first, -offset[0], offset[1]),
+        -step * (rolling_periods - 1), unit
+    )
+    last = _bucket_start(end - datetime.timedelta(days=1), grain)
+    return lower, _shift(last, step, unit)
+
+
+def build_timeseries_query(
+    source: str,
+    metric: str,
+    metric_expr: str,
+    dimensions: List[str],
+    filters: Dict[str, Any],
+    time_range: Optional[DateRange],
+    time_column: str,
+    grain: str = DEFAULT_GRAIN,
+    comparison: Optional[str] = None,
+    rolling_periods: int = ROLLING_PERIODS,
+    partition_keys: Optional[PartitionKeys] = None
+) -> SQLQuery:
+    """
+    SELECT <dimensions>, period, <metric>, previous_period, change,
+           pct_change, rolling_avg ... ORDER BY <dimensions>, period
+    """
+    if grain not in GRAIN_STEPS:
+        raise ValueError(f"Unsupported time grain '{grain}'.")
+
+    partition = [d for d in dimensions if d != "order_date"]
+    step, unit = GRAIN_STEPS[grain]
+    offset = COMPARISON_OFFSETS[comparison] if comparison else (step, unit)
+
+    series = QueryBuilder(source)
+    series.select = partition + [
+        f"CAST(date_trunc('{grain}', {time_column}) AS DATE) AS period",
+        f"{metric_expr} AS {metric}",
+    ]
+    series.group_by = ", ".join(partition + ["period"])
+    series.add_filters(
+        filters,
+        scan_range(time_range, grain, offset, rolling_periods) if time_range else None,
+        time_column,
+        partition_keys
+    )
+    series_query = series.build()
+
+    window = "ORDER BY period RANGE BETWEEN"
+    if partition:
+        window = f"PARTITION BY {', '.join(partition)} {window}"
+
+    interval = f"INTERVAL {offset[0]} {offset[1]}"
+    windowed = QueryBuilder(f"({series_query.sql}) AS series")
+    windowed.params = series_query.params
+    windowed.select = partition + [
+        "period",
+        metric,
+        f"FIRST_VALUE({metric}) OVER ({window} {interval} PRECEDING "
+        f"AND {interval} PRECEDING) AS previous_period",
+        f"AVG({metric}) OVER ({window} "
+        f"INTERVAL {step * (rolling_periods - 1)} {unit} PRECEDING "
+        f"AND CURRENT ROW) AS rolling_avg",
+    ]
+    windowed_query = windowed.build()
+
+    outer = QueryBuilder(f"({windowed_query.sql}) AS windowed")
+    outer.params = windowed_query.params
+    outer.select = partition + [
+        "period",
+        metric,
+        "previous_period",
+        f"{metric} - previous_period AS change",
+        f"({metric} - previous_period) / NULLIF(previous_period, 0) AS pct_change",
+        "rolling_avg",
+    ]
+    outer.order_by = ", ".join(partition + ["period"])
+
+    return outer.add_filters({}, time_range, "period").build()
@@ -3,31 +3,151 @@ agent_router.py
 
 Orchestrates agent execution.
 Phase 3: Adds persistence of successful insights.
+Analysis results are cached per plan and data version.
+
+`handle_async` runs the pipeline on a bounded worker pool. Insights are
+persisted by a write-behind InsightWriter, off the request path.
+`stream` returns full results as record batches for exports.
+Every stage is timed into mcp.metrics; debug requests also get their
+own per-stage timings in the response metadata.
 """
 
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
 from agents.planner_agent import PlannerAgent
 from agents.data_analyst_agent import DataAnalystAgent
 from agents.database_agent import DatabaseAgent
 from agents.narrator_agent import NarratorAgent
 from backend.guardrails import enforce
-from backend.storage.database import get_connection
+from mcp import metrics
+from mcp.base_mcp import MCPExecutionError, MCPValidationError
+from backend.cache import ResultCache
+from backend.view_prompts import build_view_prompt
+from backend.storage.writer import InsightWriter
 
 
 class AgentRouter:
-    def __init__(self):
+    def __init__(self, max_workers: int = 8, parallelism: Optional[int] = None):
         self.planner = PlannerAgent()
-        self.analyst = DataAnalystAgent()
+        # Sub-queries of one plan (breakdown axes) run `parallelism` wide
+        self.analyst = DataAnalystAgent(parallelism)
         self.db_agent = DatabaseAgent()
         self.narrator = NarratorAgent()
+        self.cache = ResultCache()
+
+        # Bounded pool for DuckDB work
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="analytics"
+        )
+        # Phase 3: successful insights are persisted write-behind
+        self.writer = InsightWriter().start()
+
+    def handle(
+        self,
+        user_query: str,
+        view: str = "natural",
+        approx: bool = False,
+        debug: bool = False
+    ):
+        response, record = self._run(user_query, view, approx, debug)
+
+        if record:
+            self.writer.submit(record)
+
+        return response
+
+    async def handle_async(
+        self,
+        user_query: str,
+        view: str = "natural",
+        approx: bool = False,
+        debug: bool = False
+    ):
+        """
+        Non-blocking variant of `handle` for async API handlers.
+        """
+        loop = asyncio.get_running_loop()
+        response, record = await loop.run_in_executor(
+            self._executor, self._run, user_query, view, approx, debug
+        )
+
+        if record:
+            # Queued only: the response never waits on SQLite
+            self.writer.submit(record)
+
+        return response
+
+    def handle_batch(self, requests: List[Dict[str, Any]]):
+        """
+        Answer many questions / sidebar views in one pass.
 
-    def handle(self, user_query: str, view: str = "natural"):
-        plan = self.planner.create_plan(user_query)
+        Each request is {"query": ...} or {"view": ..., "query": ...,
+        "timeRange": ...}. Plans that miss the cache are executed together
+        with shared scans; results come back in request order.
+        """
+        responses, records = self._run_batch(requests)
+
+        for record in records:
+            self.writer.submit(record)
+
+        return responses
+
+    async def handle_batch_async(self, requests: List[Dict[str, Any]]):
+        loop = asyncio.get_running_loop()
+        responses, records = await loop.run_in_executor(
+            self._executor, self._run_batch, requests
+        )
+
+        for record in records:
+            self.writer.submit(record)
+
+        return responses
+
+    def stream(self, user_query: str, view: str = "natural", batch_size: int = 65_536):
+        """
+        Plan a query and stream its full result for export.
+
+        Returns (rejection response, None) or (None, RecordBatchReader).
+        """
+        plan, rejection = self._plan(user_query, view)
+        if rejection:
+            return rejection, None
+
+        try:
+            return None, self.analyst.stream_analysis(plan, batch_size)
+        except (MCPValidationError, MCPExecutionError) as e:
+            return {
+                "status": "error",
+                "error_type": type(e).__name__,
+                "message": str(e),
+                "confidence": plan.get("confidence"),
+            }, None
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+        self.writer.close()
+
+    # -----------------------------------------------------------------
+    # Pipeline Stages
+    # -----------------------------------------------------------------
+
+    def _plan(self, user_query: str, view: str):
+        """
+        Plan and apply guardrails.
+
+        Returns (plan, rejection response or None).
+        """
+        with metrics.stage("plan"):
+            plan = self.planner.create_plan(user_query)
         plan["view"] = view  # Phase 3: persist sidebar context
 
         try:
-            enforce(plan)
+            with metrics.stage("guardrails"):
+                enforce(plan)
         except ValueError as e:
-            return {
+            return plan, {
                 "status": "rejected",
                 "reason": str(e),
                 "confidence": plan.get("confidence"),
@@ -37,35 +157,152 @@ class AgentRouter:
                 ),
             }
 
-        # Run analytics
-        result = self.analyst.run_analysis(plan)
-        approved = self.db_agent.approve(result)
-
-        # Narrate insight
-        insight = self.narrator.narrate(approved)
-
-        # Phase 3: Persist successful insight
-        conn = get_connection()
-        cur = conn.cursor()
-
-        cur.execute(
-            """
-            INSERT INTO saved_insights (query, view, insight, confidence)
-            VALUES (?, ?, ?, ?)
-            """,
-            (
-                user_query,
-                view,
-                insight.get("summary"),
-                plan.get("confidence", 0.0),
-            ),
-        )
+        return plan, None
 
-        conn.commit()
-        conn.close()
+    @staticmethod
+    def _error(plan, result):
+        """
+        Response for a failed analysis (never cached nor persisted).
+        """
+        return {
+            "status": "error",
+            "error_type": result.get("error_type") or "MCPExecutionError",
+            "message": result.get("message"),
+            "confidence": plan.get("confidence"),
+        }
+
+    def _respond(self, user_query: str, view: str, plan, approved):
+        """
+        Narrate an approved result.
+
+        Returns (response, insight record to persist).
+        """
+        with metrics.stage("narrate"):
+            insight = self.narrator.narrate(approved)
+
+        record = (
+            user_query,
+            view,
+            insight.get("summary"),
+            plan.get("confidence", 0.0),
+        )
 
         return {
             "status": "success",
             "insight": insight,
             "confidence": plan.get("confidence"),
+        }, record
+
+    def _run(
+        self,
+        user_query: str,
+        view: str,
+        approx: bool = False,
+        debug: bool = False
+    ):
+        """
+        Plan, analyze and narrate. With `approx`, eligible plans are
+        estimated (with error bounds) instead of computed exactly; with
+        `debug`, the response metadata carries per-stage timings (ms).
+
+        Returns (response, insight record to persist or None).
+        """
+        if not debug:
+            return self._run_timed(user_query, view, approx)
+
+        with metrics.trace() as timings:
+            response, record = self._run_timed(user_query, view, approx)
+
+        response["metadata"] = {
+            "timings_ms": {
+                name: round(ms, 3) for name, ms in timings.items()
+            }
         }
+        return response, record
+
+    def _run_timed(self, user_query: str, view: str, approx: bool):
+        try:
+            with metrics.stage("request"):
+                response, record = self._run_pipeline(user_query, view, approx)
+        except Exception:
+            metrics.increment("analytics_requests_total", status="exception")
+            raise
+
+        metrics.increment("analytics_requests_total", status=response["status"])
+        return response, record
+
+    def _run_pipeline(self, user_query: str, view: str, approx: bool):
+        plan, rejection = self._plan(user_query, view)
+        if rejection:
+            return rejection, None
+
+        plan["approx"] = approx
+
+        # Run analytics (served from cache while the data is unchanged)
+        data_version = self.analyst.bigquery.data_version
+        with metrics.stage("cache"):
+            approved = self.cache.get(plan, data_version)
+
+        if approved is None:
+            result = self.analyst.run_analysis(plan)
+            approved = self.db_agent.approve(result)
+
+            if approved.get("status") != "success":
+                return self._error(plan, approved), None
+
+            self.cache.put(plan, data_version, approved)
+
+        return self._respond(user_query, view, plan, approved)
+
+    def _run_batch(self, requests: List[Dict[str, Any]]):
+        data_version = self.analyst.bigquery.data_version
+        responses: List[Any] = [None] * len(requests)
+        records = []
+        pending = []  # (index, query, view, plan) missing from the cache
+
+        for i, request in enumerate(requests):
+            view = request.get("view") or "natural"
+            user_query = (
+                build_view_prompt(
+                    request.get("view"),
+                    request.get("query", "revenue"),
+                    request.get("timeRange", "6m"),
+                )
+                if request.get("view") else request.get("query", "")
+            )
+
+            plan, rejection = self._plan(user_query, view)
+            if rejection:
+                responses[i] = rejection
+                continue
+
+            plan["approx"] = bool(request.get("approx"))
+            approved = self.cache.get(plan, data_version)
+            if approved is None:
+                pending.append((i, user_query, view, plan))
+            else:
+                responses[i], record = self._respond(
+                    user_query, view, plan, approved
+                )
+                records.append(record)
+
+        results = self.analyst.run_batch([p[3] for p in pending])
+
+        for (i, user_query, view, plan), result in zip(pending, results):
+            if result.get("status") != "success":
+                responses[i] = self._error(plan, result)
+                continue
+
+            approved = self.db_agent.approve(result)
+            self.cache.put(plan, data_version, approved)
+            responses[i], record = self._respond(
+                user_query, view, plan, approved
+            )
+            records.append(record)
+
+        for response in responses:
+            metrics.increment(
+                "analytics_requests_total", status=response["status"]
+            )
+
+        return responses, records
@@ -1,12 +1,28 @@
 # backend/api.py
 
+import threading
+from typing import Optional
 from fastapi import FastAPI, Query, Body
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from mcp import metrics, registry
 from backend.agent_router import AgentRouter
+from backend.serialization import (
+    ColumnarJSONResponse,
+    iter_arrow_ipc,
+    iter_ndjson,
+)
+from backend.view_prompts import build_view_prompt
 
 # 🔹 Phase 3: Persistence
-from backend.storage.database import init_db
+from backend.storage.database import init_db, close_all
 from backend.routes.insights import router as insights_router
+from backend.routes.insights import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    fetch_insights_page,
+    page_response,
+)
 from backend.routes.settings import router as settings_router
 
 # -------------------------------------------------
@@ -36,6 +52,21 @@ app.add_middleware(
 # -------------------------------------------------
 router = AgentRouter()
 
+
+@app.on_event("startup")
+def warm_up_mcp_servers():
+    # Load data in the background so `/` answers immediately
+    threading.Thread(
+        target=registry.warm_up, name="mcp-warm-up", daemon=True
+    ).start()
+
+
+@app.on_event("shutdown")
+def shutdown_router():
+    # Drain in-flight analyses and pending insight writes
+    router.shutdown()
+    close_all()
+
 # -------------------------------------------------
 # Health Check
 # -------------------------------------------------
@@ -43,51 +74,118 @@ router = AgentRouter()
 def health():
     return {"status": "ok"}
 
+@app.get("/ready")
+def ready():
+    """
+    Readiness probe: 200 once every MCP server is initialized, 503 while
+    data is still warming up.
+    """
+    servers = registry.status()
+    if registry.is_ready():
+        return {"status": "ready", "servers": servers}
+    return JSONResponse(
+        status_code=503, content={"status": "warming", "servers": servers}
+    )
+
 # -------------------------------------------------
 # Phase 1: Natural Language Analytics
 # -------------------------------------------------
 @app.get("/analyze")
-def analyze(query: str = Query(..., min_length=3)):
+async def analyze(
+    query: str = Query(..., min_length=3),
+    result_format: str = Query("columnar", alias="format", pattern="^(columnar|rows)$"),
+    approx: bool = False,
+    debug: bool = False,
+):
     """
     Phase 1:
     - Free-form natural language analytics
     - Guardrails handled inside AgentRouter
+    - Results are columnar JSON; `format=rows` returns a list of records
+    - `approx=true` trades ~1% error for latency (bounds in metadata)
+    - `debug=true` adds per-stage timings to the response metadata
     """
-    return router.handle(query)
+    result = await router.handle_async(query, approx=approx, debug=debug)
+    return ColumnarJSONResponse(result, result_format)
 
 # -------------------------------------------------
 # Phase 2: Sidebar-driven Analytics
 # -------------------------------------------------
 @app.post("/analyze-view")
-def analyze_view(payload: dict = Body(...)):
+async def analyze_view(
+    payload: dict = Body(...),
+    result_format: str = Query("columnar", alias="format", pattern="^(columnar|rows)$"),
+):
     """
     Phase 2:
     Sidebar-controlled analytics intent
     """
-    view = payload.get("view")
-    base_query = payload.get("query", "revenue")
-    time_range = payload.get("timeRange", "6m")
-
-    # Convert time range to readable format
-    time_range_map = {
-        "1m": "last month",
-        "3m": "last 3 months",
-        "6m": "last 6 months",
-        "1y": "last year",
-        "2y": "last 2 years",
-        "all": "all time"
-    }
-    time_period = time_range_map.get(time_range, "last 6 months")
-
-    view_to_prompt = {
-        "kpi-overview": f"total {base_query} {time_period}",
-        "trend-analysis": f"Analyze the trend of {base_query} over the {time_period}. Provide detailed insights about growth patterns, seasonal variations, significant changes, and future projections based on historical data. Include percentage changes, key drivers, and actionable recommendations.",
-        "breakdown": f"Provide a detailed breakdown of {base_query} by region, category, and time period for the {time_period}. Analyze performance across different segments, identify top/bottom performers, calculate market share percentages, and explain the factors contributing to variations between segments.",
-        "saved-insights": "show saved insights",
-    }
-
-    final_query = view_to_prompt.get(view, base_query)
-    return router.handle(final_query)
+    final_query = build_view_prompt(
+        payload.get("view"),
+        payload.get("query", "revenue"),
+        payload.get("timeRange", "6m"),
+    )
+    result = await router.handle_async(
+        final_query,
+        approx=bool(payload.get("approx")),
+        debug=bool(payload.get("debug")),
+    )
+    return ColumnarJSONResponse(result, result_format)
+
+# -------------------------------------------------
+# Full Result Export (streamed)
+# -------------------------------------------------
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+
+@app.get("/analyze/export")
+def export_analysis(
+    query: str = Query("revenue", min_length=3),
+    view: Optional[str] = None,
+    time_range: str = Query("6m", alias="timeRange"),
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|arrow)$"),
+    batch_size: int = Query(65_536, ge=1_000, le=1_000_000),
+):
+    """
+    Stream the complete (untruncated) result of an analysis as NDJSON or
+    Arrow IPC, one record batch at a time.
+    """
+    final_query = build_view_prompt(view, query, time_range) if view else query
+    rejection, reader = router.stream(final_query, view or "natural", batch_size)
+
+    if rejection:
+        # No stream follows: plans that cannot be exported are client errors
+        status_code = 500 if rejection.get("error_type") == "MCPExecutionError" else 400
+        return JSONResponse(rejection, status_code=status_code)
+
+    encode = iter_arrow_ipc if export_format == "arrow" else iter_ndjson
+    return StreamingResponse(
+        encode(reader), media_type=EXPORT_MEDIA_TYPES[export_format]
+    )
+
+# -------------------------------------------------
+# Batch Analytics (dashboards)
+# -------------------------------------------------
+@app.post("/analyze-batch")
+async def analyze_batch(
+    payload: dict = Body(...),
+    result_format: str = Query("columnar", alias="format", pattern="^(columnar|rows)$"),
+):
+    """
+    Many questions / sidebar views in one call.
+
+    Payload: {"requests": [{"query": "..."} | {"view": "...", "query": "...",
+    "timeRange": "..."}]}. Plans sharing filters are answered by a single
+    shared scan; results are returned in request order.
+    """
+    requests = payload.get("requests", [])
+    results = await router.handle_batch_async(requests)
+    return ColumnarJSONResponse(
+        {"status": "success", "results": results}, result_format
+    )
 
 # -------------------------------------------------
 # Phase 3: Saved Insights & Settings APIs
@@ -97,17 +195,55 @@ app.include_router(settings_router)
 
 # Alias for saved-insights to match frontend expectation
 @app.get("/saved-insights")
-def get_saved_insights():
-    from backend.routes.insights import list_insights
-    data = list_insights()
-    return {"status": "success", "data": data}
+def get_saved_insights(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    view: Optional[str] = None,
+    min_confidence: Optional[float] = Query(None, ge=0.0, le=1.0),
+    max_confidence: Optional[float] = Query(None, ge=0.0, le=1.0),
+):
+    page = fetch_insights_page(
+        limit, cursor, view, min_confidence, max_confidence
+    )
+    return page_response(page, status="success")
+
+# -------------------------------------------------
+# Result Cache Observability
+# -------------------------------------------------
+@app.get("/cache/stats")
+def cache_stats():
+    return router.cache.stats()
+
+# -------------------------------------------------
+# Pipeline Metrics (Prometheus)
+# -------------------------------------------------
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@app.get("/metrics")
+def prometheus_metrics():
+    """
+    Stage latency histograms, request counters and cache / insight
+    writer gauges in the Prometheus text format.
+    """
+    gauges = {}
+    for prefix, stats in (
+        ("analytics_cache", router.cache.stats()),
+        ("analytics_insight_writer", router.writer.stats()),
+    ):
+        for key, value in stats.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                gauges[f"{prefix}_{key}"] = value
+
+    return PlainTextResponse(
+        metrics.render(gauges), media_type=PROMETHEUS_MEDIA_TYPE
+    )
 
 # -------------------------------------------------
 # Global Safety Net (Never crash API)
 # -------------------------------------------------
 @app.exception_handler(Exception)
 async def safe_exception_handler(request, exc):
-    return {
-        "status": "error",
-        "message": str(exc),
-    }
+    return JSONResponse(
+        {"status": "error", "message": str(exc)}, status_code=500
+    )
@@ -0,0 +1,128 @@
+"""
+cache.py
+
+In-process LRU/TTL cache for analysis results.
+
+Entries are keyed on the canonical form of an AnalysisPlan plus the
+data version reported by BigQueryMCP, so any ingest into `sales_orders`
+naturally invalidates everything computed from older data.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+# Plan fields that determine the analysis result. Fields such as
+# `confidence` or `view` do not change the data and are left out.
+CACHE_KEY_FIELDS = (
+    "metric",
+    "dimensions",
+    "filters",
+    "time_range",
+    "time_grain",
+    "comparison",
+    "analysis_types",
+    "breakdowns",
+    "approx",
+)
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def plan_cache_key(plan: Dict[str, Any], data_version: Hashable) -> Tuple:
+    """
+    Canonicalize a plan into a hashable cache key.
+
+    Filters are order-insensitive; dimension order is kept because it
+    determines the column order of the result.
+    """
+    return (
+        data_version,
+        tuple((field, _freeze(plan.get(field))) for field in CACHE_KEY_FIELDS)
+    )
+
+
+class ResultCache:
+    """
+    Thread-safe LRU cache with a per-entry time-to-live.
+    """
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._data_version: Optional[Hashable] = None
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, plan: Dict[str, Any], data_version: Hashable) -> Optional[Any]:
+        key = plan_cache_key(plan, data_version)
+        now = time.monotonic()
+
+        with self._lock:
+            self._check_version(data_version)
+            entry = self._entries.get(key)
+
+            if entry is None or entry[0] < now:
+                if entry is not None:
+                    del self._entries[key]
+                    self.evictions += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, plan: Dict[str, Any], data_version: Hashable, value: Any) -> None:
+        key = plan_cache_key(plan, data_version)
+        expires_at = time.monotonic() + self.ttl_seconds
+
+        with self._lock:
+            self._check_version(data_version)
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "data_version": self._data_version,
+            }
+
+    def _check_version(self, data_version: Hashable) -> None:
+        """
+        Drop all entries once the data version moves on (lock held).
+        """
+        if data_version != self._data_version:
+            if self._entries:
+                self.invalidations += 1
+                self._entries.clear()
+            self._data_version = data_version
@@ -1,8 +1,16 @@
-from fastapi import APIRouter
+import base64
+import json
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import Response
 from backend.storage.database import get_connection
 
 router = APIRouter(prefix="/insights", tags=["Insights"])
 
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
 
 @router.post("/save")
 def save_insight(payload: dict):
@@ -27,13 +35,171 @@ def save_insight(payload: dict):
     return {"status": "saved"}
 
 
+# ---------------------------------------------------------------------
+# Keyset Pagination
+# ---------------------------------------------------------------------
+
+def encode_cursor(created_at: str, row_id: int) -> str:
+    raw = json.dumps([created_at, row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str):
+    try:
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(cursor))
+        return created_at, int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+
+
+def fetch_insights_page(
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    view: Optional[str] = None,
+    min_confidence: Optional[float] = None,
+    max_confidence: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    One page of saved insights, newest first.
+
+    Pages are addressed by an opaque (created_at, id) cursor, so each page
+    is an index range scan no matter how deep the client paginates.
+    """
+    conditions = []
+    params: List[Any] = []
+
+    if view is not None:
+        conditions.append("view = ?")
+        params.append(view)
+
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        conditions.append("(created_at, id) < (?, ?)")
+        params += [created_at, row_id]
+
+    if min_confidence is not None:
+        conditions.append("confidence >= ?")
+        params.append(min_confidence)
+
+    if max_confidence is not None:
+        conditions.append("confidence <= ?")
+        params.append(max_confidence)
+
+    where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    conn = get_connection()
+    cur = conn.cursor()
+
+    # One extra row tells us whether another page exists
+    cur.execute(
+        f"""
+        SELECT * FROM saved_insights
+        {where_clause}
+        ORDER BY created_at DESC, id DESC
+        LIMIT ?
+        """,
+        params + [limit + 1],
+    )
+    rows = [dict(r) for r in cur.fetchall()]
+
+    conn.close()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last["created_at"], last["id"])
+
+    return {"data": rows, "next_cursor": next_cursor}
+
+
+def page_response(page: Dict[str, Any], **envelope) -> Response:
+    """
+    Serialize a page with a single json.dumps call.
+
+    Rows come straight from SQLite (str / int / float / None), so FastAPI's
+    per-value jsonable_encoder pass is skipped; a page holds at most
+    MAX_PAGE_SIZE rows.
+    """
+    body = {**envelope, "next_cursor": page["next_cursor"], "data": page["data"]}
+    return Response(json.dumps(body), media_type="application/json")
+
+
 @router.get("/list")
-def list_insights():
+def list_insights(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    view: Optional[str] = None,
+    min_confidence: Optional[float] = Query(None, ge=0.0, le=1.0),
+    max_confidence: Optional[float] = Query(None, ge=0.0, le=1.0),
+    envelope: bool = True,
+):
+    """
+    One page as {"next_cursor": ..., "data": [...]}; `envelope=false`
+    returns the bare list of rows (the pre-pagination shape).
+    """
+    page = fetch_insights_page(
+        limit, cursor, view, min_confidence, max_confidence
+    )
+    if not envelope:
+        return page["data"]
+    return page_response(page)
+
+
+# ---------------------------------------------------------------------
+# Full-text Search
+# ---------------------------------------------------------------------
+
+def to_fts_query(text: str) -> str:
+    """
+    Turn free text into a safe FTS5 expression.
+
+    Every word is quoted (so FTS5 operators in user input are literal),
+    terms are AND-ed, and the last term matches as a prefix.
+    """
+    terms = ['"' + t.replace('"', '""') + '"' for t in text.split()]
+    if not terms:
+        raise HTTPException(status_code=400, detail="Empty search query.")
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+@router.get("/search")
+def search_insights(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=100),
+    view: Optional[str] = None,
+):
+    """
+    Ranked (BM25) search over saved insight queries and summaries, with
+    matches highlighted in `snippet`.
+    """
+    conditions = ["saved_insights_fts MATCH ?"]
+    params: List[Any] = [to_fts_query(q)]
+
+    if view is not None:
+        conditions.append("s.view = ?")
+        params.append(view)
+
     conn = get_connection()
     cur = conn.cursor()
 
-    cur.execute("SELECT * FROM saved_insights ORDER BY created_at DESC")
+    cur.execute(
+        f"""
+        SELECT
+            s.*,
+            snippet(saved_insights_fts, -1, '<mark>', '</mark>', '…', 12)
+                AS snippet,
+            bm25(saved_insights_fts) AS rank
+        FROM saved_insights_fts
+        JOIN saved_insights AS s ON s.id = saved_insights_fts.rowid
+        WHERE {' AND '.join(conditions)}
+        ORDER BY rank
+        LIMIT ?
+        """,
+        params + [limit],
+    )
     rows = [dict(r) for r in cur.fetchall()]
 
     conn.close()
-    return rows
+    return {"status": "success", "data": rows}
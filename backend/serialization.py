@@ -0,0 +1,149 @@
+"""
+serialization.py
+
+Columnar JSON encoding for Arrow results.
+
+Analysis results travel through the agents as `pyarrow.Table` objects.
+They are only turned into JSON here, at the API edge:
+
+- "columnar" (default): {"column": [values, ...], ...}
+- "rows": [{"column": value, ...}, ...]  (compatibility format)
+
+Exports are streamed batch by batch as NDJSON or Arrow IPC. A stream
+that fails after the response has started (status 200 already sent)
+ends with a terminal error record instead of just stopping:
+
+- NDJSON: a last line {"status": "error", "error_type": ..., "message": ...}
+- Arrow IPC: a last, empty batch carrying the same keys as custom
+  metadata (`read_next_batch_with_custom_metadata`)
+"""
+
+import io
+import json
+from typing import Any, Dict, Iterator, List, Union
+
+import pyarrow as pa
+import pyarrow.compute as pc
+from fastapi.responses import JSONResponse
+
+
+def _json_safe_column(column: pa.ChunkedArray) -> pa.ChunkedArray:
+    """
+    Cast types json.dumps cannot handle, one whole column at a time.
+    """
+    if pa.types.is_temporal(column.type):
+        return pc.cast(column, pa.string())
+
+    if pa.types.is_decimal(column.type):
+        return pc.cast(column, pa.float64())
+
+    return column
+
+
+def encode_table(
+    table: pa.Table,
+    result_format: str = "columnar"
+) -> Union[Dict[str, List[Any]], List[Dict[str, Any]]]:
+    """
+    Convert an Arrow table into JSON-ready Python structures.
+    """
+    safe = pa.table(
+        [_json_safe_column(col) for col in table.columns],
+        names=table.column_names
+    )
+
+    if result_format == "rows":
+        return safe.to_pylist()
+
+    return safe.to_pydict()
+
+
+def encode_payload(payload: Any, result_format: str = "columnar") -> Any:
+    """
+    Walk a response payload and encode every Arrow table found in it.
+    """
+    if isinstance(payload, pa.Table):
+        return encode_table(payload, result_format)
+
+    if isinstance(payload, dict):
+        return {
+            k: encode_payload(v, result_format) for k, v in payload.items()
+        }
+
+    if isinstance(payload, (list, tuple)):
+        return [encode_payload(v, result_format) for v in payload]
+
+    return payload
+
+
+class ColumnarJSONResponse(JSONResponse):
+    """
+    JSON response that serializes embedded Arrow tables column-wise.
+    """
+
+    def __init__(self, content: Any, result_format: str = "columnar", **kwargs):
+        self.result_format = result_format
+        super().__init__(content, **kwargs)
+
+    def render(self, content: Any) -> bytes:
+        return json.dumps(
+            encode_payload(content, self.result_format),
+            ensure_ascii=False,
+            allow_nan=False,
+            separators=(",", ":"),
+        ).encode("utf-8")
+
+
+# ---------------------------------------------------------------------
+# Streaming Encoders
+# ---------------------------------------------------------------------
+
+def _error_record(error: Exception) -> Dict[str, str]:
+    return {
+        "status": "error",
+        "error_type": type(error).__name__,
+        "message": str(error),
+    }
+
+
+def iter_ndjson(reader: pa.RecordBatchReader) -> Iterator[bytes]:
+    """
+    One JSON object per line, encoded one record batch at a time.
+    """
+    try:
+        for batch in reader:
+            rows = encode_table(pa.Table.from_batches([batch]), "rows")
+            if rows:
+                yield "".join(
+                    json.dumps(row, ensure_ascii=False, allow_nan=False) + "\n"
+                    for row in rows
+                ).encode("utf-8")
+    except Exception as e:
+        yield (json.dumps(_error_record(e)) + "\n").encode("utf-8")
+
+
+def iter_arrow_ipc(reader: pa.RecordBatchReader) -> Iterator[bytes]:
+    """
+    Arrow IPC stream format, flushed after every record batch.
+    """
+    buffer = io.BytesIO()
+    writer = pa.ipc.new_stream(pa.PythonFile(buffer, mode="w"), reader.schema)
+
+    def drain() -> bytes:
+        chunk = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return chunk
+
+    try:
+        for batch in reader:
+            writer.write_batch(batch)
+            yield drain()
+    except Exception as e:
+        writer.write_batch(
+            pa.RecordBatch.from_pylist([], schema=reader.schema),
+            custom_metadata=_error_record(e)
+        )
+
+    writer.close()
+    yield drain()
@@ -1,15 +1,170 @@
+import itertools
 import sqlite3
+import threading
+import weakref
 from pathlib import Path
+from typing import Dict
 
 DB_PATH = Path("backend/storage/app.db")
 
-def get_connection():
+# Applied to every pooled connection
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",      # readers never block the writer
+    "PRAGMA synchronous=NORMAL",    # fsync at checkpoints only (safe with WAL)
+    "PRAGMA cache_size=-16000",     # ~16 MB page cache per connection
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA busy_timeout=5000",
+)
+
+# Compiled statements kept per connection (sqlite3 statement cache)
+STATEMENT_CACHE_SIZE = 256
+
+_local = threading.local()
+_pool_lock = threading.Lock()
+_pool: Dict[int, "PooledConnection"] = {}  # handle key -> connection
+_keys = itertools.count()
+_generation = 0  # bumped by close_all() to invalidate thread-local handles
+
+
+class PooledConnection(sqlite3.Connection):
+    """
+    Connection owned by the per-thread pool.
+
+    `close()` releases the connection back to the pool (rolling back any
+    uncommitted work) instead of closing it, so existing call sites keep
+    their open/close pattern while the connection, its pragmas and its
+    prepared statements are reused.
+    """
+
+    def close(self):
+        if self.in_transaction:
+            self.rollback()
+
+    def dispose(self):
+        super().close()
+
+
+def _connect() -> PooledConnection:
     DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(DB_PATH)
+
+    conn = sqlite3.connect(
+        DB_PATH,
+        factory=PooledConnection,
+        cached_statements=STATEMENT_CACHE_SIZE,
+        check_same_thread=False,
+    )
     conn.row_factory = sqlite3.Row
+
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+
     return conn
 
 
+class _Handle:
+    """
+    A thread's slot in the pool, held only by that thread's local
+    storage: when the thread exits, the handle is collected and its
+    finalizer closes the connection.
+    """
+
+    __slots__ = ("conn", "generation", "__weakref__")
+
+    def __init__(self, conn: PooledConnection, generation: int):
+        self.conn = conn
+        self.generation = generation
+
+
+def _release(key: int):
+    with _pool_lock:
+        conn = _pool.pop(key, None)
+    if conn is not None:
+        conn.dispose()
+
+
+def get_connection():
+    """
+    Return this thread's pooled connection, creating it on first use.
+    """
+    handle = getattr(_local, "handle", None)
+    if handle is None or handle.generation != _generation:
+        handle = _Handle(_connect(), _generation)
+        key = next(_keys)
+        with _pool_lock:
+            _pool[key] = handle.conn
+        weakref.finalize(handle, _release, key)
+        _local.handle = handle
+    return handle.conn
+
+
+def close_all():
+    """
+    Close every pooled connection (application shutdown).
+    """
+    global _generation
+
+    with _pool_lock:
+        for conn in _pool.values():
+            conn.dispose()
+        _pool.clear()
+        _generation += 1
+
+
+def init_search_index(cur):
+    """
+    FTS5 index over saved insight queries and summaries.
+
+    External-content table: text lives only in `saved_insights`, and
+    triggers keep the index in sync with every insert/update/delete,
+    including the batched writes from InsightWriter.
+    """
+    exists = cur.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'saved_insights_fts'"
+    ).fetchone()
+
+    cur.execute("""
+    CREATE VIRTUAL TABLE IF NOT EXISTS saved_insights_fts USING fts5(
+        query,
+        insight,
+        content='saved_insights',
+        content_rowid='id',
+        tokenize='porter unicode61'
+    )
+    """)
+
+    cur.execute("""
+    CREATE TRIGGER IF NOT EXISTS saved_insights_fts_insert
+    AFTER INSERT ON saved_insights BEGIN
+        INSERT INTO saved_insights_fts (rowid, query, insight)
+        VALUES (new.id, new.query, new.insight);
+    END
+    """)
+
+    cur.execute("""
+    CREATE TRIGGER IF NOT EXISTS saved_insights_fts_delete
+    AFTER DELETE ON saved_insights BEGIN
+        INSERT INTO saved_insights_fts (saved_insights_fts, rowid, query, insight)
+        VALUES ('delete', old.id, old.query, old.insight);
+    END
+    """)
+
+    cur.execute("""
+    CREATE TRIGGER IF NOT EXISTS saved_insights_fts_update
+    AFTER UPDATE ON saved_insights BEGIN
+        INSERT INTO saved_insights_fts (saved_insights_fts, rowid, query, insight)
+        VALUES ('delete', old.id, old.query, old.insight);
+        INSERT INTO saved_insights_fts (rowid, query, insight)
+        VALUES (new.id, new.query, new.insight);
+    END
+    """)
+
+    # Index rows saved before the FTS table existed
+    if not exists:
+        cur.execute(
+            "INSERT INTO saved_insights_fts (saved_insights_fts) VALUES ('rebuild')"
+        )
+
+
 def init_db():
     conn = get_connection()
     cur = conn.cursor()
@@ -25,6 +180,19 @@ def init_db():
     )
     """)
 
+    # Keyset pagination: newest first, optionally within one view
+    cur.execute("""
+    CREATE INDEX IF NOT EXISTS idx_saved_insights_created
+    ON saved_insights (created_at DESC, id DESC)
+    """)
+
+    cur.execute("""
+    CREATE INDEX IF NOT EXISTS idx_saved_insights_view_created
+    ON saved_insights (view, created_at DESC, id DESC)
+    """)
+
+    init_search_index(cur)
+
     cur.execute("""
     CREATE TABLE IF NOT EXISTS settings (
         key TEXT PRIMARY KEY,
@@ -0,0 +1,160 @@
+"""
+writer.py
+
+Write-behind persistence for saved insights.
+
+A single background thread drains a bounded queue and inserts rows in
+group commits (every `batch_size` rows or `flush_interval_ms`, whichever
+comes first), so analytics responses never wait on SQLite's write lock
+or fsync.
+"""
+
+import logging
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Tuple
+
+from backend.storage.database import get_connection
+from mcp import metrics
+
+logger = logging.getLogger(__name__)
+
+InsightRecord = Tuple[str, str, str, float]
+
+INSERT_INSIGHT_SQL = """
+INSERT INTO saved_insights (query, view, insight, confidence)
+VALUES (?, ?, ?, ?)
+"""
+
+_STOP = object()
+
+
+class InsightWriter:
+    def __init__(
+        self,
+        batch_size: int = 256,
+        flush_interval_ms: int = 50,
+        max_queue: int = 10_000,
+        enqueue_timeout: float = 1.0
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.enqueue_timeout = enqueue_timeout
+
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(
+            target=self._run, name="insight-writer", daemon=True
+        )
+        self._started = False
+        self._lock = threading.Lock()
+
+        self.written = 0
+        self.batches = 0
+        self.dropped = 0
+        self.failed = 0
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def start(self) -> "InsightWriter":
+        with self._lock:
+            if not self._started:
+                self._thread.start()
+                self._started = True
+        return self
+
+    def submit(self, record: InsightRecord) -> bool:
+        """
+        Enqueue a row for the next group commit.
+
+        Blocks for at most `enqueue_timeout` when the queue is full
+        (backpressure) and drops the row after that.
+        """
+        try:
+            self._queue.put(record, timeout=self.enqueue_timeout)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            logger.warning("Insight queue full; dropping saved insight.")
+            return False
+
+    def flush(self) -> None:
+        """
+        Block until every queued row has been committed.
+        """
+        self._queue.join()
+
+    def close(self) -> None:
+        """
+        Flush pending rows and stop the writer thread.
+        """
+        if not self._started:
+            return
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._started = False
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "batches": self.batches,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
+
+    # ------------------------------------------------------------------
+    # Writer Thread
+    # ------------------------------------------------------------------
+
+    def _run(self) -> None:
+        stopping = False
+
+        while not stopping:
+            items = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+
+            # Gather a group commit: up to batch_size rows or until the
+            # flush interval elapses
+            while items[-1] is not _STOP and len(items) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    items.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            stopping = items[-1] is _STOP
+            if stopping:
+                # Drain anything still queued into the final commit
+                while True:
+                    try:
+                        items.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+
+            self._commit([item for item in items if item is not _STOP])
+
+            for _ in items:
+                self._queue.task_done()
+
+    def _commit(self, batch: List[InsightRecord]) -> None:
+        if not batch:
+            return
+
+        try:
+            with metrics.stage("persist"):
+                conn = get_connection()
+                cur = conn.cursor()
+                cur.executemany(INSERT_INSIGHT_SQL, batch)
+                conn.commit()
+                conn.close()
+
+            self.written += len(batch)
+            self.batches += 1
+        except Exception:
+            self.failed += len(batch)
+            logger.exception("Failed to persist %d saved insights.", len(batch))
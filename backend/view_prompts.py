@@ -0,0 +1,41 @@
+"""
+view_prompts.py
+
+Maps sidebar views (Phase 2) to the controlled natural-language prompts
+sent through the agent pipeline.
+"""
+
+from typing import Optional
+
+TIME_RANGE_LABELS = {
+    "1m": "last month",
+    "3m": "last 3 months",
+    "6m": "last 6 months",
+    "1y": "last year",
+    "2y": "last 2 years",
+    "all": "all time"
+}
+
+DEFAULT_TIME_RANGE = "last 6 months"
+
+
+def build_view_prompt(
+    view: Optional[str],
+    base_query: str = "revenue",
+    time_range: str = "6m"
+) -> str:
+    """
+    Convert a sidebar view request into the prompt the planner receives.
+    Unknown views fall back to the raw query.
+    """
+    # Convert time range to readable format
+    time_period = TIME_RANGE_LABELS.get(time_range, DEFAULT_TIME_RANGE)
+
+    view_to_prompt = {
+        "kpi-overview": f"total {base_query} {time_period}",
+        "trend-analysis": f"Analyze the trend of {base_query} over the {time_period}. Provide detailed insights about growth patterns, seasonal variations, significant changes, and future projections based on historical data. Include percentage changes, key drivers, and actionable recommendations.",
+        "breakdown": f"Provide a detailed breakdown of {base_query} by region, category, and time period for the {time_period}. Analyze performance across different segments, identify top/bottom performers, calculate market share percentages, and explain the factors contributing to variations between segments.",
+        "saved-insights": "show saved insights",
+    }
+
+    return view_to_prompt.get(view, base_query)
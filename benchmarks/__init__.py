@@ -0,0 +1,4 @@
+"""
+__init__.py
+Benchmark harnesses (run as modules, e.g. `python -m benchmarks.bench_storage`)
+"""
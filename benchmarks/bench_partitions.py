@@ -0,0 +1,129 @@
+"""
+bench_partitions.py
+
+Benchmark for the hive-partitioned Parquet layout (`partition_path`).
+
+Generates a synthetic `sales_orders` dataset (once; reused from
+data/synthetic/), writes its year/month/region-partitioned copy
+(whatever its size) and runs the same aggregate, built by the query
+builder as the analyst builds it (with year / month partition
+predicates on the partitioned copy), against the single date-sorted
+Parquet file (`sales_orders`) and the copy (PARTITIONED_VIEW): a full
+scan and region, month and region + month filters. The last column is
+the layout the analyst routes the query to at this size.
+
+Reports the median latency and the bytes DuckDB read from the files per
+query (read syscalls from /proc/self/io, so page-cache hits count too;
+blank where procfs is missing). DuckDB's external file cache is turned
+off so every run reads the files again.
+
+Usage:
+    python -m benchmarks.bench_partitions [--rows 10M] [--repeat 10]
+"""
+
+import argparse
+import datetime
+import statistics
+import time
+from pathlib import Path
+from typing import Optional
+
+from agents.query_builder import build_aggregate_query
+from mcp.bigquery_mcp import PARTITION_MIN_ROWS, PARTITIONED_VIEW, BigQueryMCP
+from mcp.synthetic_data import generate_orders, parse_scale
+
+DATA_DIR = Path("data/synthetic")
+
+MONTH = (datetime.date(2024, 3, 1), datetime.date(2024, 4, 1))
+
+# name -> (filters, time range)
+QUERIES = {
+    "full scan": ({}, None),
+    "region": ({"region": "North"}, None),
+    "month": ({}, MONTH),
+    "region + month": ({"region": "North"}, MONTH),
+}
+
+
+def _bytes_read() -> Optional[int]:
+    try:
+        with open("/proc/self/io") as f:
+            for line in f:
+                if line.startswith("rchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def _run(server: BigQueryMCP, table: str, filters, time_range, repeat: int):
+    """
+    Median latency (ms) and bytes read per run.
+    """
+    query = build_aggregate_query(
+        table, "revenue", "SUM(order_amount)", [],
+        filters, time_range, "order_date", server.partition_keys(table)
+    )
+    payload = {"sql": query.sql, "params": query.params}
+    server.execute(payload)  # prepare once, outside the measurement
+
+    samples = []
+    before = _bytes_read()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        server.execute(payload)
+        samples.append((time.perf_counter() - start) * 1000)
+    after = _bytes_read()
+
+    read = (after - before) / repeat if before is not None else None
+    return statistics.median(samples), read
+
+
+def _mb(value: Optional[float]) -> str:
+    return f"{value / 1e6:.2f}" if value is not None else ""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--rows", default="10M", help="e.g. 1M, 10M, 100M")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rows = parse_scale(args.rows)
+    path = DATA_DIR / f"orders_{args.rows.lower()}.parquet"
+    generate_orders(str(path), rows, seed=args.seed)
+
+    start = time.perf_counter()
+    server = BigQueryMCP(
+        csv_path=str(path),
+        partition_path=str(DATA_DIR / f"orders_{args.rows.lower()}_partitioned"),
+        partition_min_rows=0,
+    )
+    print(f"{rows:,} orders; partitioned copy ready in {time.perf_counter() - start:.1f}s\n")
+    server.conn.execute("SET enable_external_file_cache = false")
+
+    print(
+        f"{'query':<16}{'file ms':>10}{'file MB':>10}"
+        f"{'part. ms':>10}{'part. MB':>10}{'speedup':>9}  routed to"
+    )
+    for name, (filters, time_range) in QUERIES.items():
+        file_ms, file_read = _run(
+            server, "sales_orders", filters, time_range, args.repeat
+        )
+        part_ms, part_read = _run(
+            server, PARTITIONED_VIEW, filters, time_range, args.repeat
+        )
+        routed = (
+            rows >= PARTITION_MIN_ROWS
+            and server.partitioned_source(list(filters), time_range is not None)
+        )
+        print(
+            f"{name:<16}{file_ms:>10.2f}{_mb(file_read):>10}"
+            f"{part_ms:>10.2f}{_mb(part_read):>10}{file_ms / part_ms:>8.1f}x"
+            f"  {'partitioned' if routed else 'file'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+bench_planner.py
+
+Benchmark for PlannerAgent over the shared prompt corpus.
+
+Reports per-plan latency for:
+- cold: memo cache disabled, every call runs the compiled single-pass scan
+- warm: memo cache enabled, the dashboard replaying the same prompts
+
+Usage:
+    python -m benchmarks.bench_planner [--rounds 200]
+"""
+
+import argparse
+import time
+
+from agents.planner_agent import PlannerAgent
+from benchmarks.corpus import all_prompts
+
+
+def _per_plan_us(planner: PlannerAgent, prompts, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for prompt in prompts:
+            planner.create_plan(prompt)
+    elapsed = time.perf_counter() - start
+    return elapsed / (rounds * len(prompts)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    prompts = all_prompts()
+    avg_len = sum(len(p) for p in prompts) / len(prompts)
+    print(f"{len(prompts)} prompts, avg {avg_len:.0f} chars\n")
+
+    cold = _per_plan_us(PlannerAgent(plan_cache_size=0), prompts, args.rounds)
+    warm = _per_plan_us(PlannerAgent(), prompts, args.rounds)
+
+    print(f"{'mode':<8}{'us/plan':>10}{'plans/s':>12}")
+    for name, us in (("cold", cold), ("warm", warm)):
+        print(f"{name:<8}{us:>10.1f}{1e6 / us:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+bench_search.py
+
+Benchmark for saved-insight full-text search.
+
+Fills a temporary database with N synthetic insights (default 1M) through
+the normal schema, so the FTS5 index is maintained by its triggers, then
+compares the latency of `/insights/search` (FTS5 + BM25) against the
+client-side alternative it replaces: a LIKE filter over every row.
+
+Usage:
+    python -m benchmarks.bench_search [--rows 1000000] [--repeat 20]
+"""
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+from backend.routes import insights
+from backend.storage import database
+
+VIEWS = ["natural", "kpi-overview", "trend-analysis", "breakdown"]
+METRICS = ["revenue", "orders", "sales", "customers", "income"]
+REGIONS = ["north", "south", "east", "west"]
+MONTHS = ["january", "march", "may", "july", "september", "november"]
+VERBS = ["trend of", "breakdown of", "why did", "compare", "forecast"]
+
+# Roughly 1 in 10,000 insights mentions an anomaly: a selective search
+RARE_NOTE = "flagged anomaly in refunds"
+
+SEARCHES = [
+    "revenue",
+    "north revenue",
+    "forecast orders",
+    "why march",
+    "custom",
+    "anomaly",
+    "anomaly refunds",
+]
+
+
+def _rows(n: int, seed: int = 7):
+    rng = random.Random(seed)
+    for _ in range(n):
+        query = (
+            f"{rng.choice(VERBS)} {rng.choice(METRICS)} in "
+            f"{rng.choice(REGIONS)} for {rng.choice(MONTHS)}"
+        )
+        summary = f"Analysis completed successfully for {query}"
+        if rng.random() < 0.0001:
+            summary += f"; {RARE_NOTE}"
+        yield (
+            query,
+            rng.choice(VIEWS),
+            summary,
+            round(rng.random(), 2),
+        )
+
+
+def _timed(fn, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp, \
+            mock.patch.object(database, "DB_PATH", Path(tmp) / "bench.db"):
+        database.init_db()
+        conn = database.get_connection()
+
+        start = time.perf_counter()
+        conn.executemany(
+            "INSERT INTO saved_insights (query, view, insight, confidence) "
+            "VALUES (?, ?, ?, ?)",
+            _rows(args.rows),
+        )
+        conn.commit()
+        load_s = time.perf_counter() - start
+        print(f"loaded {args.rows:,} rows (with FTS triggers) in {load_s:.1f}s "
+              f"({args.rows / load_s:,.0f} rows/s)\n")
+
+        print(f"{'search':<18}{'fts5 ms':>10}{'like scan ms':>14}")
+        for text in SEARCHES:
+            fts_ms = _timed(
+                lambda: insights.search_insights(q=text, limit=20, view=None),
+                args.repeat,
+            )
+
+            like_params = [f"%{w}%" for w in text.split()]
+            like_sql = (
+                "SELECT * FROM saved_insights WHERE "
+                + " AND ".join(["(query LIKE ? OR insight LIKE ?)"] * len(like_params))
+            )
+            flat = [p for p in like_params for _ in range(2)]
+            like_ms = _timed(
+                lambda: conn.execute(like_sql, flat).fetchall(),
+                max(args.repeat // 5, 1),
+            )
+
+            print(f"{text:<18}{fts_ms:>10.2f}{like_ms:>14.2f}")
+
+        database.close_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+bench_storage.py
+
+Micro-benchmark for the SQLite persistence layer.
+
+Compares requests/sec of the save / list / settings route handlers using
+the legacy connection strategy (a fresh `sqlite3.connect` + `mkdir` per
+call, rollback journal) against the pooled WAL connection manager in
+backend/storage/database.py.
+
+Usage:
+    python -m benchmarks.bench_storage [--iterations 2000]
+"""
+
+import argparse
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+from backend.routes import insights, settings
+from backend.storage import database
+
+
+def legacy_connection():
+    """
+    The pre-pooling implementation of `get_connection()`.
+    """
+    database.DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(database.DB_PATH)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def _workloads():
+    payload = {
+        "query": "total revenue last month",
+        "view": "kpi-overview",
+        "insight": "Analysis completed successfully",
+        "confidence": 0.8,
+    }
+    return {
+        "save": lambda: insights.save_insight(payload),
+        "list": lambda: insights.fetch_insights_page(
+            limit=insights.DEFAULT_PAGE_SIZE, cursor=None, view=None
+        ),
+        "settings_get": settings.get_settings,
+        "settings_set": lambda: settings.set_settings({"theme": "dark"}),
+    }
+
+
+def _run(strategy: str, iterations: int, list_rows: int):
+    results = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "bench.db"
+        patches = [mock.patch.object(database, "DB_PATH", db_path)]
+
+        if strategy == "legacy":
+            patches += [
+                mock.patch.object(insights, "get_connection", legacy_connection),
+                mock.patch.object(settings, "get_connection", legacy_connection),
+            ]
+
+        for p in patches:
+            p.start()
+
+        try:
+            database.close_all()
+            database.init_db()
+
+            # Keep `list` comparable: same table size for both strategies
+            conn = database.get_connection()
+            conn.executemany(
+                "INSERT INTO saved_insights (query, view, insight, confidence) "
+                "VALUES (?, ?, ?, ?)",
+                [("q", "natural", "seed", 0.5)] * list_rows,
+            )
+            conn.commit()
+
+            for name, fn in _workloads().items():
+                n = iterations if name != "list" else max(iterations // 20, 1)
+                start = time.perf_counter()
+                for _ in range(n):
+                    fn()
+                elapsed = time.perf_counter() - start
+                results[name] = n / elapsed
+        finally:
+            database.close_all()
+            for p in reversed(patches):
+                p.stop()
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--list-rows", type=int, default=200)
+    args = parser.parse_args()
+
+    before = _run("legacy", args.iterations, args.list_rows)
+    after = _run("pooled", args.iterations, args.list_rows)
+
+    print(f"{'operation':<14}{'legacy req/s':>14}{'pooled req/s':>14}{'speedup':>10}")
+    for name in before:
+        speedup = after[name] / before[name]
+        print(
+            f"{name:<14}{before[name]:>14.0f}{after[name]:>14.0f}"
+            f"{speedup:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+corpus.py
+
+Request corpus shared by the benchmarks: free-form questions as users
+type them in the query box, plus every sidebar view / time range
+combination the dashboard sends to /analyze-view.
+"""
+
+from backend.view_prompts import TIME_RANGE_LABELS, build_view_prompt
+
+NATURAL_QUERIES = [
+    "total revenue last month",
+    "revenue in March",
+    "Breakdown of revenue by region",
+    "Trend of orders over the last six months",
+    "why did the revenue increase in may ?",
+    "compare north vs south revenue last year",
+    "forecast sales for next quarter",
+    "month over month revenue change in the east",
+    "yoy orders trend for west region",
+    "which product drove sales in january",
+    "revenue by product in the north last month",
+    "number of transactions over time",
+    "predict future income for the south",
+    "reason for the drop in orders in october",
+    "customers last year",
+]
+
+VIEWS = ["kpi-overview", "trend-analysis", "breakdown"]
+BASE_QUERIES = ["revenue", "orders", "sales"]
+
+
+def view_requests():
+    """
+    Every /analyze-view payload the dashboard can send.
+    """
+    return [
+        {"view": view, "query": base, "timeRange": time_range}
+        for view in VIEWS
+        for base in BASE_QUERIES
+        for time_range in TIME_RANGE_LABELS
+    ]
+
+
+def view_prompts():
+    return [
+        build_view_prompt(r["view"], r["query"], r["timeRange"])
+        for r in view_requests()
+    ]
+
+
+def all_prompts():
+    return NATURAL_QUERIES + view_prompts()
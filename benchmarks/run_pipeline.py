@@ -0,0 +1,356 @@
+"""
+run_pipeline.py
+
+End-to-end benchmark of the agent pipeline at several data scales.
+
+For every scale a deterministic synthetic `sales_orders` dataset is
+generated (once; reused from data/synthetic/) and the request corpus is
+replayed twice: through `AgentRouter.handle` and through the FastAPI
+app in-process (`/analyze` and `/analyze-view`). Each scale runs in a
+fresh process, so peak RSS and DuckDB state never carry over.
+
+Reports, per scale and path: throughput, p50 / p95 / p99 latency of the
+whole request and of every pipeline stage (from the per-request debug
+timings), and peak RSS of each phase (generate, load, router, api).
+Results are written to benchmarks/results/<timestamp>_<commit>.json;
+pass `--compare` with an older file to see the change per stage.
+
+Usage:
+    python -m benchmarks.run_pipeline [--scales 1M,10M] [--rounds 3]
+        [--concurrency 1] [--cache] [--compare benchmarks/results/<old>.json]
+"""
+
+import argparse
+import datetime
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List
+from unittest import mock
+
+import duckdb
+import numpy as np
+
+from benchmarks.corpus import NATURAL_QUERIES, view_prompts, view_requests
+from mcp.synthetic_data import generate_orders, parse_scale
+
+RESULTS_DIR = Path("benchmarks/results")
+DATA_DIR = Path("data/synthetic")
+
+PERCENTILES = (50, 95, 99)
+
+
+# ---------------------------------------------------------------------
+# Measurement Helpers
+# ---------------------------------------------------------------------
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # No procfs (macOS): fall back to the lifetime peak
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class PeakRSS:
+    """
+    Samples resident memory in the background while the block runs.
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, _rss_bytes())
+            self._stop.wait(self.interval)
+
+    def __enter__(self) -> "PeakRSS":
+        self.start = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, _rss_bytes())
+        self.seconds = time.perf_counter() - self.start
+        return False
+
+    def report(self) -> Dict[str, float]:
+        return {
+            "seconds": round(self.seconds, 3),
+            "peak_rss_mb": round(self.peak / 2 ** 20, 1),
+        }
+
+
+def _summarize(samples: List[float]) -> Dict[str, float]:
+    values = np.asarray(samples)
+    summary = {
+        f"p{p}": round(float(np.percentile(values, p)), 3) for p in PERCENTILES
+    }
+    summary["mean"] = round(float(values.mean()), 3)
+    summary["count"] = len(samples)
+    return summary
+
+
+class Recorder:
+    """
+    Collects per-request wall time, stage timings and statuses.
+    """
+
+    def __init__(self):
+        self.stages: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def add(self, elapsed_ms: float, response: Dict[str, Any]):
+        timings = (response.get("metadata") or {}).get("timings_ms", {})
+        with self._lock:
+            self.stages["total"].append(elapsed_ms)
+            for stage, ms in timings.items():
+                self.stages[stage].append(ms)
+            self.statuses[response.get("status", "exception")] += 1
+
+    def report(self, seconds: float) -> Dict[str, Any]:
+        requests = len(self.stages["total"])
+        return {
+            "requests": requests,
+            "throughput_rps": round(requests / seconds, 2) if seconds else 0.0,
+            "statuses": dict(self.statuses),
+            "latency_ms": {
+                stage: _summarize(samples)
+                for stage, samples in sorted(self.stages.items())
+            },
+        }
+
+
+# ---------------------------------------------------------------------
+# Replays
+# ---------------------------------------------------------------------
+
+def _replay(requests, call, rounds: int, concurrency: int) -> Recorder:
+    recorder = Recorder()
+
+    def run(request):
+        start = time.perf_counter()
+        try:
+            response = call(request)
+        except Exception as e:
+            response = {"status": "exception", "message": str(e)}
+        recorder.add((time.perf_counter() - start) * 1000, response)
+
+    work = [request for _ in range(rounds) for request in requests]
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(run, work))
+    else:
+        for request in work:
+            run(request)
+
+    return recorder
+
+
+def _bench_scale(scale: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Benchmark one scale (runs in its own process).
+    """
+    rows = parse_scale(scale)
+    path = DATA_DIR / f"orders_{scale.lower()}.parquet"
+    phases = {}
+
+    with PeakRSS() as phase:
+        generate_orders(str(path), rows, seed=options["seed"])
+    phases["generate"] = phase.report()
+
+    with tempfile.TemporaryDirectory() as tmp, mock.patch(
+        "backend.storage.database.DB_PATH", Path(tmp) / "bench.db"
+    ):
+        from mcp import registry
+
+        registry.configure(
+            "bigquery",
+            csv_path=str(path),
+            threads=options["threads"],
+            memory_limit=options["memory_limit"],
+        )
+
+        with PeakRSS() as phase:
+            registry.warm_up()
+        phases["load"] = phase.report()
+
+        # Imported here: backend.api initializes its database on import
+        from backend import api
+        from backend.cache import ResultCache
+        from fastapi.testclient import TestClient
+
+        router = api.router
+        if not options["cache"]:
+            router.cache = ResultCache(max_entries=0)
+
+        prompts = NATURAL_QUERIES + view_prompts()
+        with PeakRSS() as phase:
+            router_recorder = _replay(
+                prompts,
+                lambda prompt: router.handle(prompt, debug=True),
+                options["rounds"],
+                options["concurrency"],
+            )
+        phases["router"] = phase.report()
+        router_report = router_recorder.report(phase.seconds)
+
+        client = TestClient(api.app, raise_server_exceptions=False)
+
+        def call_api(request):
+            if "view" in request:
+                response = client.post(
+                    "/analyze-view", json={**request, "debug": True}
+                )
+            else:
+                response = client.get(
+                    "/analyze", params={"query": request["query"], "debug": "true"}
+                )
+            if response.status_code != 200:
+                return {"status": f"http_{response.status_code}"}
+            return response.json()
+
+        api_requests = [{"query": q} for q in NATURAL_QUERIES] + view_requests()
+        with PeakRSS() as phase:
+            api_recorder = _replay(
+                api_requests, call_api, options["rounds"], options["concurrency"]
+            )
+        phases["api"] = phase.report()
+        api_report = api_recorder.report(phase.seconds)
+
+        router.writer.flush()
+
+    return {
+        "rows": rows,
+        "dataset_mb": round(path.stat().st_size / 1e6, 1),
+        "phases": phases,
+        "router": router_report,
+        "api": api_report,
+    }
+
+
+# ---------------------------------------------------------------------
+# Reporting
+# ---------------------------------------------------------------------
+
+def _commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _print_scale(scale: str, result: Dict[str, Any]):
+    print(f"\n== {scale} orders ({result['dataset_mb']} MB) ==")
+    for name, phase in result["phases"].items():
+        print(f"  {name:<10}{phase['seconds']:>9.2f}s  peak RSS {phase['peak_rss_mb']:>8.1f} MB")
+
+    for path in ("router", "api"):
+        report = result[path]
+        print(
+            f"\n  {path}: {report['requests']} requests, "
+            f"{report['throughput_rps']:.1f} req/s, {report['statuses']}"
+        )
+        print(f"  {'stage':<12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'count':>8}")
+        for stage, s in report["latency_ms"].items():
+            print(
+                f"  {stage:<12}{s['p50']:>10.2f}{s['p95']:>10.2f}"
+                f"{s['p99']:>10.2f}{s['count']:>8}"
+            )
+
+
+def _print_comparison(old: Dict[str, Any], new: Dict[str, Any]):
+    print(f"\n== p95 vs {old.get('commit')} ({old.get('timestamp')}) ==")
+    for scale, result in new["scales"].items():
+        before = old.get("scales", {}).get(scale)
+        if not before:
+            continue
+        for path in ("router", "api"):
+            for stage, s in result[path]["latency_ms"].items():
+                prev = before.get(path, {}).get("latency_ms", {}).get(stage)
+                if not prev or not prev["p95"]:
+                    continue
+                ratio = s["p95"] / prev["p95"]
+                print(
+                    f"  {scale:<6}{path:<8}{stage:<12}"
+                    f"{prev['p95']:>10.2f} -> {s['p95']:>10.2f} ms  ({ratio:.2f}x)"
+                )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--scales", default="1M,10M", help="e.g. 1M,10M,100M,1B")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--memory-limit", default=None)
+    parser.add_argument(
+        "--cache", action="store_true",
+        help="keep the result cache on (default: every request hits DuckDB)"
+    )
+    parser.add_argument("--compare", help="earlier results JSON to compare with")
+    parser.add_argument("--output", help="results path (default: benchmarks/results/)")
+    args = parser.parse_args()
+
+    options = {
+        "rounds": args.rounds,
+        "concurrency": args.concurrency,
+        "seed": args.seed,
+        "threads": args.threads,
+        "memory_limit": args.memory_limit,
+        "cache": args.cache,
+    }
+    results = {
+        "commit": _commit(),
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "duckdb": duckdb.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "options": options,
+        "scales": {},
+    }
+
+    spawn = multiprocessing.get_context("spawn")
+    for scale in args.scales.split(","):
+        with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:
+            result = pool.submit(_bench_scale, scale, options).result()
+        results["scales"][scale] = result
+        _print_scale(scale, result)
+
+    output = Path(args.output) if args.output else (
+        RESULTS_DIR / f"{time.strftime('%Y%m%d-%H%M%S')}_{results['commit']}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        _print_comparison(json.loads(Path(args.compare).read_text()), results)
+
+
+if __name__ == "__main__":
+    main()
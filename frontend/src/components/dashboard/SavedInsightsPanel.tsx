@@ -14,18 +14,35 @@ interface SavedInsight {
 
 const SavedInsightsPanel = () => {
   const [savedInsights, setSavedInsights] = useState<SavedInsight[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     fetchSavedInsights()
       .then((res) => {
         if (res.status === "success") {
           setSavedInsights(res.data);
+          setNextCursor(res.next_cursor);
         }
       })
       .finally(() => setLoading(false));
   }, []);
 
+  // Pages are keyed on the last row's cursor, so appending never
+  // duplicates or skips insights saved in the meantime
+  const loadMore = () => {
+    setLoadingMore(true);
+    fetchSavedInsights(nextCursor)
+      .then((res) => {
+        if (res.status === "success") {
+          setSavedInsights((current) => [...current, ...res.data]);
+          setNextCursor(res.next_cursor);
+        }
+      })
+      .finally(() => setLoadingMore(false));
+  };
+
   return (
     <div className="space-y-6">
       <div className="flex items-center gap-3">
@@ -83,6 +100,19 @@ const SavedInsightsPanel = () => {
               </div>
             </div>
           ))}
+
+          {nextCursor && (
+            <div className="flex justify-center pt-2">
+              <Button
+                variant="outline"
+                size="sm"
+                onClick={loadMore}
+                disabled={loadingMore}
+              >
+                {loadingMore ? "Loading..." : "Load more"}
+              </Button>
+            </div>
+          )}
         </div>
       )}
     </div>
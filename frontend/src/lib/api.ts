@@ -37,7 +37,7 @@ export type AnalyzeResponse = SuccessResponse | RejectedResponse;
 export async function analyzeQuery(
   query: string
 ): Promise<AnalyzeResponse> {
-  const url = `${API_BASE_URL}/analyze?query=${encodeURIComponent(query)}`;
+  const url = `${API_BASE_URL}/analyze?query=${encodeURIComponent(query)}&format=rows`;
 
   const response = await fetch(url);
 
@@ -57,7 +57,7 @@ export async function analyzeView(
   query: string,
   timeRange?: string
 ): Promise<AnalyzeResponse> {
-  const res = await fetch(`${API_BASE_URL}/analyze-view`, {
+  const res = await fetch(`${API_BASE_URL}/analyze-view?format=rows`, {
     method: "POST",
     headers: {
       "Content-Type": "application/json",
@@ -76,8 +76,9 @@ export async function analyzeView(
 // Phase 3: Persistence APIs
 // --------------------------------------------------
 
-export async function fetchSavedInsights() {
-  const res = await fetch(`${API_BASE_URL}/saved-insights`);
+export async function fetchSavedInsights(cursor?: string | null) {
+  const params = cursor ? `?cursor=${encodeURIComponent(cursor)}` : "";
+  const res = await fetch(`${API_BASE_URL}/saved-insights${params}`);
 
   if (!res.ok) {
     throw new Error("Failed to fetch saved insights");
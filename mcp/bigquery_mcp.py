@@ -8,21 +8,631 @@ Acts as:
 - Deterministic analytics engine
 """
 
+import datetime
+import glob
+import hashlib
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from contextlib import ExitStack
 import duckdb
-import pandas as pd
-from typing import Dict, Any
+import pyarrow as pa
+import pyarrow.compute as pc
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+from mcp import metrics
 from mcp.base_mcp import MCPServer, MCPExecutionError, MCPValidationError
+from mcp.rollups import RollupManager
+from mcp.sampling import SampleManager
+from mcp.sketches import SketchManager, sketch_table_name
+from mcp.watchdog import QueryWatchdog
+
+
+# Physical sort order of stored orders. DuckDB keeps min/max zone maps per
+# row group, so date-sorted data lets range predicates and time-series
+# windows skip every row group outside the requested period.
+SORT_KEY = "order_date, order_id"
+
+# Hive partitioning of Parquet copies written with `partition_path`:
+# <dir>/year=2024/month=3/region=North/data_0.parquet. year/month are
+# derived from order_date at write time; region is the stored column.
+# Filters on region prune whole directories. DuckDB cannot derive year /
+# month predicates from an order_date range, so queries add them (see
+# `partition_keys`); order_date then skips row groups within the files.
+PARTITION_COLUMNS = {
+    "year": "year(order_date)",
+    "month": "month(order_date)",
+    "region": "region",
+}
+
+# The partitioned copy is served as its own view, next to the single
+# sorted file. Listing its directory tree costs 5-15 ms per query, which
+# only pays off on large sources and only for queries that skip whole
+# directories without a time range (bench_partitions, 1 CPU: region
+# filters 1.6x faster at 1M orders, 3.9x at 10M; full scans and month
+# filters 0.4-0.8x at every size), so the analyst routes just those there
+# (see `partitioned_source`).
+PARTITIONED_VIEW = "sales_orders_partitioned"
+PARTITION_MIN_ROWS = 1_000_000
+
+# Column types applied when scanning raw CSV exports, so header-only or
+# sparse files do not fall back to VARCHAR for numeric/date columns.
+SALES_ORDERS_TYPES = {
+    "order_amount": "DOUBLE",
+    "order_date": "DATE",
+    "region": "VARCHAR",
+    "product": "VARCHAR",
+}
+
+
+def _quote(value: str) -> str:
+    """
+    Render a string as a SQL literal.
+    """
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _literal(value: Any) -> str:
+    """
+    Render a bound parameter as an SQL literal for EXECUTE.
+
+    DuckDB's EXECUTE only accepts constant arguments, so values are
+    escaped here; they are never spliced into the statement text itself.
+    """
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, int):
+        return repr(value)
+    if isinstance(value, float):
+        return f"CAST({_quote(repr(value))} AS DOUBLE)"
+    if isinstance(value, datetime.datetime):
+        return f"TIMESTAMP {_quote(value.isoformat(sep=' '))}"
+    if isinstance(value, datetime.date):
+        return f"DATE {_quote(value.isoformat())}"
+    return _quote(str(value))
 
 
 class BigQueryMCP(MCPServer):
-    def __init__(self, csv_path: str = "data/sales_sample.csv"):
+    """
+    DuckDB-backed execution MCP.
+
+    Two storage modes:
+    - In-memory (default): `sales_orders` is a view scanning the source
+      files directly.
+    - Persistent: `database` points at a DuckDB file holding a real
+      `sales_orders` table. One writer process appends new data through
+      `ingest()`; any number of workers can then open the same file with
+      `read_only=True` and share it without reloading anything. DuckDB
+      locks the file either for one writer or for readers, never both:
+      ingest while no worker has it open, and restart the workers to
+      pick up the new data (a read-only instance never sees later
+      writes).
+
+    With `partition_path`, sources of at least `partition_min_rows` rows
+    also get a hive-partitioned Parquet copy (see PARTITION_COLUMNS),
+    served as PARTITIONED_VIEW to the queries it speeds up.
+
+    With `rollups=True`, pre-aggregated rollup tables are built on first
+    use, kept up to date by `ingest()` and rebuilt whenever
+    `data_version` changes otherwise; see mcp/rollups.py.
+
+    Approximate queries read a stratified sample (mcp/sampling.py) and,
+    for distinct counts, per-stratum HyperLogLog registers
+    (mcp/sketches.py), built on first use (or at startup with
+    `sampling=True`, so read-only workers find them) and likewise
+    maintained by `ingest()`.
+
+    Resource controls: `threads` and `memory_limit` cap the DuckDB
+    instance (DuckDB only allows them database-wide, so they bound all
+    queries of this server together); `query_timeout` (seconds, or a
+    per-query `timeout` in the payload) cancels queries running longer.
+    """
+
+    # Prepared statements kept per cursor (one template per query shape)
+    PREPARED_STATEMENT_CACHE_SIZE = 256
+
+    def __init__(
+        self,
+        csv_path: str = "data/sales_sample.csv",
+        parquet_path: Optional[str] = None,
+        partition_path: Optional[str] = None,
+        partition_min_rows: int = PARTITION_MIN_ROWS,
+        database: str = ":memory:",
+        read_only: bool = False,
+        rollups: bool = False,
+        sampling: bool = False,
+        threads: Optional[int] = None,
+        memory_limit: Optional[str] = None,
+        query_timeout: Optional[float] = None
+    ):
         super().__init__(server_name="bigquery_mcp")
-        self.conn = duckdb.connect(database=":memory:")
-        self._load_data(csv_path)
+        self.database = database
+        self.read_only = read_only
+        self.rollups_enabled = rollups
+        self.sampling_enabled = sampling
+        self.query_timeout = query_timeout
+        self._source: Optional[str] = None
+        self._partitioned_version: Optional[str] = None
+        self._batch_version: Optional[str] = None
+        self.conn = duckdb.connect(database=database, read_only=read_only)
+        self.set_resource_limits(threads, memory_limit)
+        self.watchdog = QueryWatchdog()
+        self.rollups = RollupManager(self.conn)
+        self.samples = SampleManager(self.conn)
+        self.sketches = SketchManager(self.conn)
+        self._local = threading.local()
+
+        if not self.is_persistent:
+            self._load_data(
+                csv_path, parquet_path, partition_path, partition_min_rows
+            )
+        elif not read_only:
+            self._init_storage()
+            self.ingest(parquet_path if parquet_path else csv_path)
+
+    @property
+    def is_persistent(self) -> bool:
+        return self.database != ":memory:"
+
+    def partition_keys(
+        self,
+        table: str = "sales_orders"
+    ) -> Optional[Tuple[str, str]]:
+        """
+        (year, month) columns of `table` when it scans a hive-partitioned
+        copy, to be filtered alongside order_date so DuckDB prunes
+        directories; None for other layouts.
+        """
+        if table == PARTITIONED_VIEW or (
+            table == "sales_orders"
+            and self._source and os.path.isdir(self._source)
+        ):
+            return ("year", "month")
+        return None
+
+    def partitioned_source(
+        self,
+        filter_columns: List[str],
+        has_time_range: bool
+    ) -> Optional[str]:
+        """
+        PARTITIONED_VIEW for raw scans it answers faster than the single
+        file: filtered on a directory column (region) and not on a time
+        range. None otherwise, when no copy was built, or when the source
+        changed since (the copy is only rewritten at startup).
+        """
+        if self._partitioned_version is None or has_time_range:
+            return None
+        directory_columns = {
+            column for column, expression in PARTITION_COLUMNS.items()
+            if expression == column
+        }
+        if not directory_columns & set(filter_columns):
+            return None
+        if self._partitioned_version != self.data_version:
+            return None
+        return PARTITIONED_VIEW
+
+    def set_resource_limits(
+        self,
+        threads: Optional[int] = None,
+        memory_limit: Optional[str] = None
+    ) -> None:
+        """
+        Cap DuckDB worker threads and memory (e.g. "4GB"); queries that
+        would exceed the memory limit spill to disk or fail cleanly.
+        """
+        if threads is not None:
+            self.conn.execute(f"SET threads = {int(threads)}")
+        if memory_limit is not None:
+            self.conn.execute(f"SET memory_limit = {_quote(memory_limit)}")
+
+    # ------------------------------------------------------------------
+    # Data Loading
+    # ------------------------------------------------------------------
+
+    def _load_data(
+        self,
+        source: str,
+        parquet_path: Optional[str] = None,
+        partition_path: Optional[str] = None,
+        partition_min_rows: int = PARTITION_MIN_ROWS
+    ):
+        """
+        Expose `source` (CSV or Parquet file / glob, or a directory
+        written by `convert_to_partitioned`) as the `sales_orders` view.
+        DuckDB scans the files on demand, so nothing is parsed or held in
+        memory at startup.
+
+        When `parquet_path` is given, a CSV source is converted to Parquet
+        once (and again only when the CSV is newer) and the view reads the
+        Parquet copy instead. With `partition_path`, a source of at least
+        `partition_min_rows` rows is also rewritten (on the same terms)
+        into a hive-partitioned copy, exposed as PARTITIONED_VIEW.
+        """
+        if parquet_path and not self._is_parquet(source):
+            self.convert_to_parquet(source, parquet_path)
+            source = parquet_path
+
+        self._source = source
+        self.conn.execute(
+            "CREATE OR REPLACE VIEW sales_orders AS "
+            f"SELECT * FROM {self._scan_expression(source, partition_keys=True)}"
+        )
+
+        if not partition_path:
+            return
+        rows = self.conn.execute(
+            "SELECT COUNT(*) FROM sales_orders"
+        ).fetchone()[0]
+        if rows < partition_min_rows:
+            return
+
+        self.convert_to_partitioned(source, partition_path)
+        self.conn.execute(
+            f"CREATE OR REPLACE VIEW {PARTITIONED_VIEW} AS SELECT * FROM "
+            f"{self._scan_expression(partition_path, partition_keys=True)}"
+        )
+        self._partitioned_version = self.data_version
+
+    def convert_to_parquet(self, csv_path: str, parquet_path: str) -> bool:
+        """
+        One-time CSV -> Parquet conversion, streamed inside DuckDB and
+        sorted by date (see SORT_KEY).
+
+        Returns True if a conversion ran, False if the Parquet copy was
+        already up to date.
+        """
+        target = Path(parquet_path)
+        sources = glob.glob(csv_path) or [csv_path]
+        newest_source = max(os.path.getmtime(p) for p in sources)
+
+        if target.exists() and target.stat().st_mtime >= newest_source:
+            return False
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = target.with_name(target.name + ".tmp")
+
+        self.conn.execute(
+            f"COPY (SELECT * FROM {self._scan_expression(csv_path)} "
+            f"ORDER BY {SORT_KEY}) TO {_quote(str(tmp_path))} (FORMAT PARQUET)"
+        )
+        os.replace(tmp_path, target)
+        return True
+
+    def convert_to_partitioned(self, source: str, directory: str) -> bool:
+        """
+        One-time rewrite of `source` into hive-partitioned Parquet under
+        `directory` (one directory level per PARTITION_COLUMNS entry),
+        sorted by SORT_KEY within every file so row-group zone maps stay
+        tight.
+
+        The new layout is written next to `directory` and swapped in once
+        complete. Returns True if a rewrite ran, False if the copy was
+        already up to date.
+        """
+        target = Path(directory)
+        sources = glob.glob(source) or [source]
+        newest_source = max(os.path.getmtime(p) for p in sources)
+
+        if target.is_dir() and target.stat().st_mtime >= newest_source:
+            return False
+
+        tmp_dir = target.with_name(target.name + ".tmp")
+        old_dir = target.with_name(target.name + ".old")
+        for stale in (tmp_dir, old_dir):
+            shutil.rmtree(stale, ignore_errors=True)
+        target.parent.mkdir(parents=True, exist_ok=True)
+
+        derived = ", ".join(
+            f"{expression} AS {column}"
+            for column, expression in PARTITION_COLUMNS.items()
+            if expression != column
+        )
+        self.conn.execute(
+            f"COPY (SELECT *, {derived} FROM {self._scan_expression(source)} "
+            f"ORDER BY {SORT_KEY}) TO {_quote(str(tmp_dir))} "
+            f"(FORMAT PARQUET, PARTITION_BY ({', '.join(PARTITION_COLUMNS)}))"
+        )
+
+        if target.exists():
+            os.replace(target, old_dir)
+        os.replace(tmp_dir, target)
+        shutil.rmtree(old_dir, ignore_errors=True)
+        return True
+
+    def _cursor(self) -> duckdb.DuckDBPyConnection:
+        """
+        Per-thread DuckDB cursor on the shared database.
+
+        A DuckDB connection must not be used from several threads at
+        once; each executor thread gets its own cursor so concurrent
+        requests run in parallel without copying any data.
+        """
+        cursor = getattr(self._local, "cursor", None)
+        if cursor is None:
+            cursor = self.conn.cursor()
+            self._local.cursor = cursor
+            self._local.prepared = OrderedDict()
+        return cursor
+
+    @property
+    def data_version(self) -> str:
+        """
+        Short identifier that changes whenever `sales_orders` content
+        changes (cache keys, rollup and sample versions).
+
+        - Persistent mode: the latest ingest batch id, read once and again
+          after every ingest (a read-only instance never sees later
+          writes, see the class docstring).
+        - In-memory mode: a digest of the mtime/size of the scanned
+          files. A partitioned copy is only ever swapped in whole, so its
+          directory is stat'ed instead of every file in it.
+        """
+        if self.is_persistent:
+            if self._batch_version is None:
+                batch_id = self._cursor().execute(
+                    "SELECT COALESCE(MAX(batch_id), 0) FROM _ingest_log"
+                ).fetchone()[0]
+                self._batch_version = f"batch:{batch_id}"
+            return self._batch_version
+
+        signature = []
+        for path in self._version_paths(self._source):
+            stat = os.stat(path)
+            signature.append(
+                f"{path}:{stat.st_ino}:{stat.st_mtime_ns}:{stat.st_size}"
+            )
+        digest = hashlib.sha1(",".join(signature).encode()).hexdigest()[:16]
+        return f"files:{digest}"
+
+    # ------------------------------------------------------------------
+    # Persistent Storage & Incremental Ingest
+    # ------------------------------------------------------------------
+
+    def _init_storage(self):
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS _ingest_log (
+            batch_id BIGINT,
+            source VARCHAR,
+            mtime DOUBLE,
+            size BIGINT,
+            rows_appended BIGINT,
+            ingested_at TIMESTAMP DEFAULT current_timestamp
+        )
+        """)
+
+    def ingest(self, source: str) -> Dict[str, Any]:
+        """
+        Append new data from `source` (file or glob) to the persistent
+        `sales_orders` table.
+
+        - Files already ingested with the same mtime/size are skipped.
+        - New or modified files only contribute rows past the current
+          (order_date, order_id) watermark, so full history is never
+          re-inserted.
+        - Existing rollup tables are updated from the appended rows only.
+        - Appended rows are sorted by date; since they lie past the
+          watermark, the table as a whole stays date-ordered.
+        """
+        if not self.is_persistent or self.read_only:
+            raise MCPExecutionError(
+                "Incremental ingest requires a writable persistent database."
+            )
+
+        files = sorted(glob.glob(source)) or [source]
+        appended = 0
+        skipped = 0
+
+        self.conn.execute("BEGIN TRANSACTION")
+        try:
+            batch_id = self.conn.execute(
+                "SELECT COALESCE(MAX(batch_id), 0) + 1 FROM _ingest_log"
+            ).fetchone()[0]
+
+            for path in files:
+                stat = os.stat(path)
+                seen = self.conn.execute(
+                    "SELECT 1 FROM _ingest_log "
+                    "WHERE source = ? AND mtime = ? AND size = ?",
+                    [path, stat.st_mtime, stat.st_size]
+                ).fetchone()
+
+                if seen:
+                    skipped += 1
+                    continue
 
-    def _load_data(self, csv_path: str):
-        df = pd.read_csv(csv_path)
-        self.conn.register("sales_orders", df)
+                rows = self._append_file(path)
+                appended += rows
+
+                self.conn.execute(
+                    "INSERT INTO _ingest_log "
+                    "(batch_id, source, mtime, size, rows_appended) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [batch_id, path, stat.st_mtime, stat.st_size, rows]
+                )
+
+            if self.rollups and skipped < len(files):
+                self.rollups.mark_current(f"batch:{batch_id}")
+
+            if self.samples and skipped < len(files):
+                self.samples.mark_current(f"batch:{batch_id}")
+
+            if self.sketches and skipped < len(files):
+                self.sketches.mark_current(f"batch:{batch_id}")
+
+            self.conn.execute("COMMIT")
+        except Exception as e:
+            self.conn.execute("ROLLBACK")
+            raise MCPExecutionError(f"Ingest failed: {e}")
+        finally:
+            self._batch_version = None
+
+        return {
+            "files": len(files),
+            "skipped": skipped,
+            "rows_appended": appended
+        }
+
+    def _append_file(self, path: str) -> int:
+        scan = self._scan_expression(path)
+
+        self.conn.execute(
+            f"CREATE TABLE IF NOT EXISTS sales_orders AS "
+            f"SELECT * FROM {scan} LIMIT 0"
+        )
+
+        watermark = self._watermark()
+        where_clause = ""
+        params: List[Any] = []
+
+        if watermark is not None:
+            where_clause = (
+                "WHERE order_date > ? "
+                "OR (order_date = ? AND order_id > ?)"
+            )
+            params = [watermark[0], watermark[0], watermark[1]]
+
+        self.conn.execute(
+            f"CREATE OR REPLACE TEMP TABLE _ingest_delta AS "
+            f"SELECT * FROM {scan} {where_clause} ORDER BY {SORT_KEY}",
+            params
+        )
+        rows = self.conn.execute(
+            "INSERT INTO sales_orders BY NAME SELECT * FROM _ingest_delta"
+        ).fetchone()[0]
+
+        if rows and self.rollups:
+            self.rollups.apply_delta("_ingest_delta")
+
+        if rows and self.samples:
+            self.samples.apply_delta("_ingest_delta")
+
+        if rows and self.sketches:
+            self.sketches.apply_delta("_ingest_delta")
+
+        self.conn.execute("DROP TABLE _ingest_delta")
+        return rows
+
+    def current_rollups(self, spec: Dict[str, Any]) -> Optional[RollupManager]:
+        """
+        Rollups current with `data_version` (see LookerMCP.rollup_spec
+        for `spec`), or None to scan `sales_orders`.
+
+        Rebuilt when stale on writable connections; None when rollups
+        are off, or when a read-only worker finds them stale.
+        """
+        if not (self.rollups_enabled or self.rollups):
+            return None
+        if not self.rollups.ensure(
+            spec, self.data_version, read_only=self.read_only
+        ):
+            return None
+        return self.rollups
+
+    def sample_table(self, dimensions: List[str]) -> Optional[str]:
+        """
+        Stratified sample of `sales_orders` current with `data_version`,
+        stratified by `dimensions` (those present) and order month.
+
+        Rebuilt when stale on writable connections; None when a read-only
+        worker finds no current sample.
+        """
+        return self.samples.ensure(
+            dimensions, self.data_version, read_only=self.read_only
+        )
+
+    def sketch_table(self, metric: str, spec: Dict[str, Any]) -> Optional[str]:
+        """
+        HLL register table of the distinct-count `metric`, current with
+        `data_version` (see LookerMCP.sketch_spec for `spec`).
+
+        Rebuilt when stale on writable connections; None when a read-only
+        worker finds no current sketch.
+        """
+        if metric not in spec["values"]:
+            return None
+        if not self.sketches.ensure(
+            spec, self.data_version, read_only=self.read_only
+        ):
+            return None
+        if metric not in self.sketches.values:
+            return None
+        return sketch_table_name(metric)
+
+    def _watermark(self):
+        """
+        Highest (order_date, order_id) already stored, or None if empty.
+        """
+        return self.conn.execute("""
+        SELECT order_date, MAX(order_id)
+        FROM sales_orders
+        WHERE order_date = (SELECT MAX(order_date) FROM sales_orders)
+        GROUP BY order_date
+        """).fetchone()
+
+    @staticmethod
+    def _is_parquet(source: str) -> bool:
+        return source.lower().endswith(".parquet")
+
+    @staticmethod
+    def _partition_glob(directory: str) -> str:
+        return os.path.join(directory, "**", "*.parquet")
+
+    @staticmethod
+    def _version_paths(source: str) -> List[str]:
+        if os.path.isdir(source):
+            return [source]
+        return sorted(glob.glob(source))
+
+    def _scan_expression(self, source: str, partition_keys: bool = False) -> str:
+        """
+        Build the DuckDB table function that scans `source` directly.
+
+        For a partitioned directory, region always comes back from the
+        path; the derived year / month keys are kept only with
+        `partition_keys` (the view filters on them, ingest drops them).
+        """
+        if os.path.isdir(source):
+            scan = (
+                f"read_parquet({_quote(self._partition_glob(source))}, "
+                "hive_partitioning = true, hive_types = {'region': 'VARCHAR'})"
+            )
+            if partition_keys:
+                return scan
+            derived = ", ".join(
+                column for column, expression in PARTITION_COLUMNS.items()
+                if expression != column
+            )
+            return f"(SELECT * EXCLUDE ({derived}) FROM {scan})"
+
+        if self._is_parquet(source):
+            return f"read_parquet({_quote(source)})"
+
+        # Only pin types for columns the file actually has; DuckDB rejects
+        # type hints for unknown columns.
+        sniffed = self.conn.execute(
+            f"DESCRIBE SELECT * FROM read_csv_auto({_quote(source)}, header = true)"
+        ).fetchall()
+        present = {row[0] for row in sniffed}
+        types = ", ".join(
+            f"{_quote(col)}: {_quote(dtype)}"
+            for col, dtype in SALES_ORDERS_TYPES.items()
+            if col in present
+        )
+
+        return (
+            f"read_csv_auto({_quote(source)}, header = true, "
+            f"types = {{{types}}})"
+        )
+
+    # ------------------------------------------------------------------
+    # MCP Interface Implementation
+    # ------------------------------------------------------------------
 
     def list_resources(self):
         return ["sales_orders"]
@@ -30,7 +640,7 @@ class BigQueryMCP(MCPServer):
     def get_schema(self, resource_name: str):
         if resource_name != "sales_orders":
             raise MCPValidationError("Unknown table.")
-        return self.conn.execute("DESCRIBE sales_orders").fetchdf().to_dict()
+        return self._cursor().execute("DESCRIBE sales_orders").fetchdf().to_dict()
 
     def validate(self, payload: Dict[str, Any]) -> None:
         if "sql" not in payload:
@@ -40,31 +650,138 @@ class BigQueryMCP(MCPServer):
         if "drop" in sql or "delete" in sql:
             raise MCPValidationError("Destructive queries are not allowed.")
 
-    def execute(self, payload: Dict[str, Any]):
+        timeout = payload.get("timeout")
+        if timeout is not None and (
+            isinstance(timeout, bool)
+            or not isinstance(timeout, (int, float))
+            or timeout <= 0
+        ):
+            raise MCPValidationError("Query timeout must be a positive number of seconds.")
+
+    def execute(self, payload: Dict[str, Any]) -> pa.Table:
+        """
+        Run the query and return the result as a columnar Arrow table.
+
+        Payloads carrying `params` are treated as parameterized templates
+        (`$1`, `$2`, ...) and run as prepared statements. Queries still
+        running after `timeout` (payload) or `query_timeout` seconds are
+        interrupted.
+        """
+        timeout = payload.get("timeout", self.query_timeout)
+
         try:
-            result = self.conn.execute(payload["sql"]).fetchdf()
-            return result.to_dict(orient="records")
+            with metrics.stage("execute"):
+                with self.watchdog.watch(self._cursor(), timeout):
+                    if "params" in payload:
+                        result = self._execute_prepared(payload["sql"], payload["params"])
+                    else:
+                        result = self._cursor().execute(payload["sql"])
+                    table = result.fetch_arrow_table()
+            with metrics.stage("sanitize"):
+                return self._nan_to_null(table)
+        except duckdb.InterruptException:
+            raise MCPExecutionError(
+                f"Query cancelled after exceeding the {timeout:g}s timeout."
+            )
         except Exception as e:
             raise MCPExecutionError(str(e))
 
-    def safe_execute(self, payload: dict):
-        sql = payload.get("sql", "").lower()
-
-        # Simulated breakdown response
-        if "group by region" in sql or "region" in sql:
-            return {
-                "status": "success",
-                "data": [
-                    {"region": "North", "revenue": 54000},
-                    {"region": "South", "revenue": 47000},
-                    {"region": "East", "revenue": 62000},
-                    {"region": "West", "revenue": 39000},
-                ],
-            }
-
-        # Default aggregate
-        return {
-            "status": "success",
-            "data": [{"revenue": 202000}],
-        }
-    
+    def _execute_prepared(self, sql: str, params):
+        """
+        PREPARE each distinct template once per cursor, then EXECUTE it.
+
+        Templates are keyed by their SQL text, which the query builder
+        derives from the query shape only; at most
+        PREPARED_STATEMENT_CACHE_SIZE are kept per cursor (LRU).
+        """
+        cursor = self._cursor()
+        prepared = self._local.prepared
+
+        name = prepared.get(sql)
+        if name is None:
+            name = "q_" + hashlib.sha1(sql.encode()).hexdigest()[:16]
+            cursor.execute(f"PREPARE {name} AS {sql}")
+            prepared[sql] = name
+
+            if len(prepared) > self.PREPARED_STATEMENT_CACHE_SIZE:
+                _, evicted = prepared.popitem(last=False)
+                cursor.execute(f"DEALLOCATE {evicted}")
+        else:
+            prepared.move_to_end(sql)
+
+        args = ", ".join(_literal(p) for p in params)
+        return cursor.execute(f"EXECUTE {name}({args})" if args else f"EXECUTE {name}")
+
+    def stream(
+        self,
+        payload: Dict[str, Any],
+        batch_size: int = 65_536
+    ) -> pa.RecordBatchReader:
+        """
+        Validate and execute a query, returning a lazy stream of Arrow
+        record batches; server memory stays bounded by `batch_size`
+        regardless of result size.
+
+        The stream owns a dedicated cursor (closed once exhausted), since
+        a streaming response may be consumed from any worker thread. The
+        cursor is watched like `execute`'s, except that the timeout bounds
+        stalls rather than the whole export: it runs until the first batch
+        and restarts with every batch, so a long export keeps going as
+        long as batches keep flowing. A stream that produces or consumes
+        no batch for that long (a runaway query, an abandoned export) is
+        interrupted and its cursor closed.
+        """
+        self.validate(payload)
+        timeout = payload.get("timeout", self.query_timeout)
+        last_batch = time.monotonic()
+        cursor = self.conn.cursor()
+
+        # Unwound in reverse: stop watching, then close the cursor
+        stack = ExitStack()
+        stack.callback(cursor.close)
+        renew = stack.enter_context(self.watchdog.watch(cursor, timeout))
+
+        try:
+            result = cursor.execute(payload["sql"], payload.get("params") or None)
+            to_reader = getattr(result, "to_arrow_reader", None) or result.fetch_record_batch
+            reader = to_reader(batch_size)
+        except duckdb.InterruptException:
+            stack.close()
+            raise MCPExecutionError(
+                f"Query cancelled after exceeding the {timeout:g}s timeout."
+            )
+        except Exception as e:
+            stack.close()
+            raise MCPExecutionError(str(e))
+
+        def batches():
+            nonlocal last_batch
+            with stack:
+                try:
+                    for batch in reader:
+                        renew()
+                        last_batch = time.monotonic()
+                        yield self._nan_to_null(batch)
+                except Exception as e:
+                    # Arrow re-raises the interrupt as a generic error
+                    if timeout and time.monotonic() - last_batch >= timeout:
+                        raise MCPExecutionError(
+                            f"Export cancelled after {timeout:g}s without a new batch."
+                        )
+                    raise MCPExecutionError(str(e))
+
+        return pa.RecordBatchReader.from_batches(reader.schema, batches())
+
+    @staticmethod
+    def _nan_to_null(data):
+        """
+        Replace NaN with null in floating point columns (JSON-safe),
+        using Arrow compute kernels instead of a per-cell Python loop.
+        Works on both tables and record batches.
+        """
+        columns = [
+            pc.if_else(pc.is_nan(column), None, column)
+            if pa.types.is_floating(column.type) else column
+            for column in data.columns
+        ]
+        return type(data).from_arrays(columns, schema=data.schema)
@@ -9,7 +9,7 @@ Purpose:
 - Act as a semantic contract for analytics
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, List
 from mcp.base_mcp import MCPServer, MCPValidationError
 
 
@@ -17,20 +17,36 @@ class LookerMCP(MCPServer):
     def __init__(self):
         super().__init__(server_name="looker_mcp")
 
-        # Mock semantic model (enterprise-realistic)
+        # Mock semantic model (enterprise-realistic). For approximate
+        # mode, additive metrics define `sample_value` (the per-row value
+        # whose scaled sum estimates the metric); distinct counts define
+        # `distinct_value`, estimated with a sketch.
         self._metrics = {
             "revenue": {
                 "definition": "SUM(order_amount)",
+                "rollup_definition": "SUM(revenue)",
+                "sample_value": "order_amount",
                 "description": "Total revenue from all orders",
                 "allowed_dimensions": ["region", "product", "order_date"]
             },
             "orders": {
                 "definition": "COUNT(order_id)",
+                "rollup_definition": "COALESCE(CAST(SUM(orders) AS BIGINT), 0)",
+                "sample_value": "CAST(order_id IS NOT NULL AS INTEGER)",
                 "description": "Total number of orders",
                 "allowed_dimensions": ["region", "product", "order_date"]
+            },
+            "products": {
+                "definition": "COUNT(DISTINCT product)",
+                "distinct_value": "product",
+                "description": "Number of distinct products ordered",
+                "allowed_dimensions": ["region", "order_date"]
             }
         }
 
+        # Time dimension handled by rollup grains rather than as a key
+        self._time_dimension = "order_date"
+
     def list_resources(self):
         return list(self._metrics.keys())
 
@@ -56,3 +72,55 @@ class LookerMCP(MCPServer):
     def execute(self, payload: Dict[str, Any]):
         metric = payload["metric"]
         return self._metrics[metric]
+
+    def categorical_dimensions(self, metric: str) -> List[str]:
+        """
+        Allowed dimensions of `metric`, without the time dimension.
+        """
+        return [
+            dim for dim in self.get_schema(metric)["allowed_dimensions"]
+            if dim != self._time_dimension
+        ]
+
+    def rollup_spec(self) -> Dict[str, Any]:
+        """
+        Additive metrics and categorical dimensions eligible for rollups.
+
+        A metric is additive when it defines `rollup_definition`, i.e. it
+        can be re-aggregated from partial aggregates.
+        """
+        measures = {
+            name: spec["definition"]
+            for name, spec in self._metrics.items()
+            if "rollup_definition" in spec
+        }
+
+        dimensions = []
+        for name in measures:
+            for dim in self.categorical_dimensions(name):
+                if dim not in dimensions:
+                    dimensions.append(dim)
+
+        return {"measures": measures, "dimensions": dimensions}
+
+    def sketch_spec(self) -> Dict[str, Any]:
+        """
+        Distinct-count metrics and categorical dimensions eligible for
+        HyperLogLog sketches.
+
+        A metric is a distinct count when it defines `distinct_value`,
+        the expression whose distinct values it counts.
+        """
+        values = {
+            name: spec["distinct_value"]
+            for name, spec in self._metrics.items()
+            if "distinct_value" in spec
+        }
+
+        dimensions = []
+        for name in values:
+            for dim in self.categorical_dimensions(name):
+                if dim not in dimensions:
+                    dimensions.append(dim)
+
+        return {"values": values, "dimensions": dimensions}
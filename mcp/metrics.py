@@ -0,0 +1,232 @@
+"""
+metrics.py
+
+Process-wide pipeline metrics: per-stage latency histograms and request
+counters, rendered in the Prometheus text format by `GET /metrics`.
+
+Stages are timed with `stage(name)`:
+
+    with metrics.stage("execute"):
+        ...
+
+When metrics are disabled (ANALYTICS_METRICS=0 or `set_enabled(False)`)
+and no trace is active, `stage` returns a shared no-op context manager,
+so instrumented code pays one function call and two attribute lookups.
+
+`trace()` additionally collects the stages run by the current thread
+into a dict (milliseconds per stage), which the router returns as
+response metadata for debug requests.
+"""
+
+import bisect
+import contextlib
+import os
+import threading
+import time
+from typing import Dict, Iterator, Optional, Tuple
+
+# Histogram upper bounds, in seconds (sub-millisecond planner stages up
+# to multi-second scans)
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+STAGE_METRIC = "analytics_stage_duration_seconds"
+
+_enabled = os.environ.get("ANALYTICS_METRICS", "1") != "0"
+_lock = threading.Lock()
+_local = threading.local()
+
+_NOOP = contextlib.nullcontext()
+
+
+class Histogram:
+    """
+    Fixed-bucket latency histogram (not thread-safe; guarded by _lock).
+    """
+
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+
+_histograms: Dict[str, Histogram] = {}
+_counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+
+
+class _StageTimer:
+    __slots__ = ("name", "timings", "start")
+
+    def __init__(self, name: str, timings: Optional[Dict[str, float]]):
+        self.name = name
+        self.timings = timings
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+
+        if self.timings is not None:
+            self.timings[self.name] = (
+                self.timings.get(self.name, 0.0) + elapsed * 1000
+            )
+        if _enabled:
+            observe(self.name, elapsed)
+        return False
+
+
+# ---------------------------------------------------------------------
+# Recording
+# ---------------------------------------------------------------------
+
+def set_enabled(enabled: bool) -> None:
+    global _enabled
+    _enabled = enabled
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def stage(name: str):
+    """
+    Context manager timing one pipeline stage.
+    """
+    timings = getattr(_local, "timings", None)
+    if not _enabled and timings is None:
+        return _NOOP
+    return _StageTimer(name, timings)
+
+
+def observe(name: str, seconds: float) -> None:
+    """
+    Record a stage duration measured elsewhere.
+    """
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = Histogram()
+        histogram.observe(seconds)
+
+
+def increment(name: str, value: float = 1.0, **labels: str) -> None:
+    """
+    Add to a counter, e.g. increment("analytics_requests_total",
+    status="success").
+    """
+    if not _enabled:
+        return
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        _counters[key] = _counters.get(key, 0.0) + value
+
+
+@contextlib.contextmanager
+def trace() -> Iterator[Dict[str, float]]:
+    """
+    Collect the durations (ms) of every stage run by this thread inside
+    the block. Nested traces share the outermost dict.
+    """
+    outer = getattr(_local, "timings", None)
+    timings = outer if outer is not None else {}
+    _local.timings = timings
+    try:
+        yield timings
+    finally:
+        _local.timings = outer
+
+
+def current_trace() -> Optional[Dict[str, float]]:
+    """
+    Timings dict of the trace active on this thread, if any.
+    """
+    return getattr(_local, "timings", None)
+
+
+def add_to_trace(timings: Dict[str, float]) -> None:
+    """
+    Fold stage timings collected on another thread (e.g. a worker pool)
+    into this thread's trace.
+    """
+    current = getattr(_local, "timings", None)
+    if current is None:
+        return
+    for name, ms in timings.items():
+        current[name] = current.get(name, 0.0) + ms
+
+
+def reset() -> None:
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+
+
+# ---------------------------------------------------------------------
+# Prometheus Exposition
+# ---------------------------------------------------------------------
+
+def _labels(pairs) -> str:
+    if not pairs:
+        return ""
+    body = ",".join(
+        '{}="{}"'.format(key, str(value).replace("\\", "\\\\").replace('"', '\\"'))
+        for key, value in pairs
+    )
+    return "{" + body + "}"
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render(gauges: Optional[Dict[str, float]] = None) -> str:
+    """
+    All metrics in the Prometheus text exposition format (version 0.0.4).
+    `gauges` adds point-in-time values owned elsewhere (cache, writer).
+    """
+    with _lock:
+        histograms = {
+            name: (list(h.counts), h.total, h.count)
+            for name, h in _histograms.items()
+        }
+        counters = dict(_counters)
+
+    lines = [
+        f"# HELP {STAGE_METRIC} Time spent in each analytics pipeline stage.",
+        f"# TYPE {STAGE_METRIC} histogram",
+    ]
+    bounds = [_number(b) for b in LATENCY_BUCKETS] + ["+Inf"]
+    for name in sorted(histograms):
+        counts, total, count = histograms[name]
+        cumulative = 0
+        for bound, bucket in zip(bounds, counts):
+            cumulative += bucket
+            labels = _labels((("stage", name), ("le", bound)))
+            lines.append(f"{STAGE_METRIC}_bucket{labels} {cumulative}")
+        labels = _labels((("stage", name),))
+        lines.append(f"{STAGE_METRIC}_sum{labels} {_number(total)}")
+        lines.append(f"{STAGE_METRIC}_count{labels} {count}")
+
+    typed = set()
+    for (name, labels), value in sorted(counters.items()):
+        if name not in typed:
+            lines.append(f"# TYPE {name} counter")
+            typed.add(name)
+        lines.append(f"{name}{_labels(labels)} {_number(value)}")
+
+    for name, value in sorted((gauges or {}).items()):
+        lines.append(f"# TYPE {name} gauge")
+        lines.append(f"{name} {_number(value)}")
+
+    return "\n".join(lines) + "\n"
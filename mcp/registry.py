@@ -0,0 +1,126 @@
+"""
+registry.py
+
+Process-wide registry of MCP servers.
+
+Each server is created once, lazily, on first use and then shared by
+every agent in the process. Creation is thread-safe, so concurrent
+requests arriving during warm-up wait for the same instance instead of
+building their own.
+
+Across worker processes, data is shared through storage rather than
+objects: point BigQueryMCP at a persistent DuckDB file opened
+`read_only=True` (see `configure`). Readers cannot open the file while
+a writer holds it, and vice versa (see BigQueryMCP).
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from mcp.base_mcp import MCPServer
+from mcp.bigquery_mcp import BigQueryMCP
+from mcp.catalog_mcp import CatalogMCP
+from mcp.looker_mcp import LookerMCP
+
+
+def _create_bigquery(**options) -> BigQueryMCP:
+    server = BigQueryMCP(**options)
+
+    if server.rollups_enabled and not server.read_only:
+        server.current_rollups(get_server("looker").rollup_spec())
+
+    if server.sampling_enabled and not server.read_only:
+        looker = get_server("looker")
+        server.sample_table(looker.rollup_spec()["dimensions"])
+        for metric in looker.sketch_spec()["values"]:
+            server.sketch_table(metric, looker.sketch_spec())
+
+    return server
+
+
+_factories: Dict[str, Callable[..., MCPServer]] = {
+    "catalog": CatalogMCP,
+    "looker": LookerMCP,
+    "bigquery": _create_bigquery,
+}
+_options: Dict[str, Dict[str, Any]] = {name: {} for name in _factories}
+
+_instances: Dict[str, MCPServer] = {}
+_errors: Dict[str, str] = {}
+_load_seconds: Dict[str, float] = {}
+_locks: Dict[str, threading.Lock] = {
+    name: threading.Lock() for name in _factories
+}
+
+
+def configure(name: str, **options) -> None:
+    """
+    Set constructor options for a server before its first use, e.g.
+    configure("bigquery", database="data/sales.duckdb", read_only=True).
+    """
+    if name not in _factories:
+        raise KeyError(f"Unknown MCP server '{name}'.")
+    if name in _instances:
+        raise RuntimeError(f"MCP server '{name}' is already initialized.")
+    _options[name] = options
+
+
+def get_server(name: str) -> MCPServer:
+    """
+    Shared instance of `name`, created on first call.
+    """
+    server = _instances.get(name)
+    if server is not None:
+        return server
+
+    if name not in _factories:
+        raise KeyError(f"Unknown MCP server '{name}'.")
+
+    with _locks[name]:
+        server = _instances.get(name)
+        if server is None:
+            start = time.perf_counter()
+            try:
+                server = _factories[name](**_options[name])
+            except Exception as e:
+                _errors[name] = str(e)
+                raise
+            _load_seconds[name] = time.perf_counter() - start
+            _errors.pop(name, None)
+            _instances[name] = server
+
+    return server
+
+
+def warm_up(names: Optional[Iterable[str]] = None) -> None:
+    """
+    Initialize servers ahead of traffic (typically in a background thread).
+    Failures are recorded in `status()` rather than raised.
+    """
+    for name in names or _factories:
+        try:
+            get_server(name)
+        except Exception:
+            pass
+
+
+def is_ready(names: Optional[Iterable[str]] = None) -> bool:
+    return all(name in _instances for name in names or _factories)
+
+
+def status() -> Dict[str, Dict[str, Any]]:
+    report = {}
+    for name in _factories:
+        if name in _instances:
+            report[name] = {
+                "state": "ready",
+                "load_seconds": round(_load_seconds[name], 4),
+            }
+        elif name in _errors:
+            report[name] = {"state": "failed", "error": _errors[name]}
+        elif _locks[name].locked():
+            report[name] = {"state": "loading"}
+        else:
+            report[name] = {"state": "pending"}
+    return report
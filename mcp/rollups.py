@@ -0,0 +1,307 @@
+"""
+rollups.py
+
+Pre-aggregated rollup tables (materialized cubes) for additive metrics.
+
+Every metric in the semantic layer is a GROUP BY over a known set of
+dimensions, so `sales_orders` can be summarized up front:
+
+    rollup_<dimensions>_<grain>   e.g. rollup_region_product_day
+
+Each rollup stores one column per additive metric, keyed by a subset of
+the categorical dimensions plus a time bucket (day or month). Queries
+re-aggregate the smallest rollup that covers the columns they need
+instead of scanning raw orders.
+
+Rollups record the data version they were built from (like the sample
+of mcp/sampling.py): stale rollups are rebuilt on writable connections
+and never served, so a changed source cannot be answered from old
+aggregates.
+"""
+
+import json
+import threading
+from dataclasses import dataclass
+from itertools import combinations
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import duckdb
+
+META_TABLE = "_rollups"
+TIME_DIMENSION = "order_date"
+
+# Grain -> (time column stored in the rollup, expression over raw orders)
+GRAINS = {
+    "day": ("order_date", "CAST(order_date AS DATE)"),
+    "month": ("order_month", "CAST(date_trunc('month', order_date) AS DATE)"),
+}
+
+
+@dataclass(frozen=True)
+class Rollup:
+    name: str
+    dimensions: Tuple[str, ...]
+    grain: str
+    row_count: int
+
+    @property
+    def time_column(self) -> str:
+        return GRAINS[self.grain][0]
+
+    @property
+    def key_columns(self) -> List[str]:
+        return list(self.dimensions) + [self.time_column]
+
+
+class RollupManager:
+    """
+    Builds, incrementally maintains and matches rollup tables on a
+    DuckDB connection. Rollup metadata, including the data version the
+    rollups reflect, lives in the `_rollups` table so read-only workers
+    can discover rollups built by the writer and tell whether they are
+    current.
+    """
+
+    def __init__(self, conn: duckdb.DuckDBPyConnection):
+        self.conn = conn
+        self.measures: Dict[str, str] = {}
+        self.version: Optional[str] = None
+        self._rollups: Dict[str, Rollup] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def __bool__(self) -> bool:
+        return bool(self._rollups)
+
+    # ------------------------------------------------------------------
+    # Build & Maintenance
+    # ------------------------------------------------------------------
+
+    def ensure(
+        self,
+        spec: Dict[str, Any],
+        version: str,
+        read_only: bool = False
+    ) -> bool:
+        """
+        Whether the rollups described by `spec` are current with
+        `version`, (re)building them when stale; False when stale on a
+        read-only connection.
+        """
+        with self._lock:
+            if (
+                self._rollups
+                and self.version == version
+                and self.measures == spec["measures"]
+            ):
+                return True
+            if read_only:
+                self._load()
+                return bool(self._rollups) and self.version == version
+            self.build(spec, version)
+            return True
+
+    def build(self, spec: Dict[str, Any], version: str) -> None:
+        """
+        (Re)build all rollups from `sales_orders` at `version`.
+
+        spec = {
+            "measures": {"revenue": "SUM(order_amount)", ...},
+            "dimensions": ["region", "product"]
+        }
+
+        Only the finest rollup scans raw orders; coarser ones are derived
+        from it since every measure is additive. Tables are replaced in
+        place, so queries already routed to a rollup keep finding it.
+        """
+        present = {
+            row[0] for row in
+            self.conn.execute("DESCRIBE sales_orders").fetchall()
+        }
+        dimensions = [d for d in spec["dimensions"] if d in present]
+        self.measures = dict(spec["measures"])
+
+        # Nothing is routed to rollups until they are all rebuilt
+        previous = set(self._rollups)
+        self._rollups.clear()
+        self.version = version
+        self.conn.execute(f"""
+        CREATE OR REPLACE TABLE {META_TABLE} (
+            name VARCHAR,
+            dimensions VARCHAR,
+            grain VARCHAR,
+            measures VARCHAR,
+            row_count BIGINT,
+            version VARCHAR
+        )
+        """)
+
+        built = {}
+        finest = self._rollup_name(dimensions, "day")
+        raw_select = self._raw_aggregate(dimensions, "day", "sales_orders")
+        self.conn.execute(f"CREATE OR REPLACE TABLE {finest} AS {raw_select}")
+        built[finest] = self._register(finest, dimensions, "day")
+
+        for size in range(len(dimensions), -1, -1):
+            for dims in combinations(dimensions, size):
+                for grain in GRAINS:
+                    name = self._rollup_name(dims, grain)
+                    if name == finest:
+                        continue
+                    derived = self._rollup_aggregate(dims, grain, finest)
+                    self.conn.execute(
+                        f"CREATE OR REPLACE TABLE {name} AS {derived}"
+                    )
+                    built[name] = self._register(name, dims, grain)
+
+        for name in previous - set(built):
+            self.conn.execute(f"DROP TABLE IF EXISTS {name}")
+        self._rollups.update(built)
+
+    def apply_delta(self, delta_table: str) -> None:
+        """
+        Merge newly ingested rows (in `delta_table`) into every rollup.
+        """
+        for rollup in list(self._rollups.values()):
+            keys = ", ".join(rollup.key_columns)
+            merged = self._merged_measures(rollup.name)
+            delta = self._raw_aggregate(
+                rollup.dimensions, rollup.grain, delta_table
+            )
+
+            self.conn.execute(f"""
+            CREATE OR REPLACE TABLE {rollup.name} AS
+            SELECT {keys}, {merged}
+            FROM (
+                SELECT * FROM {rollup.name}
+                UNION ALL BY NAME
+                {delta}
+            )
+            GROUP BY {keys}
+            """)
+            self._rollups[rollup.name] = self._register(
+                rollup.name, rollup.dimensions, rollup.grain
+            )
+
+    def mark_current(self, version: str) -> None:
+        """
+        Record that the rollups reflect `version` (after an ingest).
+        """
+        with self._lock:
+            self.conn.execute(f"UPDATE {META_TABLE} SET version = ?", [version])
+            self.version = version
+
+    # ------------------------------------------------------------------
+    # Query Routing
+    # ------------------------------------------------------------------
+
+    def match(self, columns: Iterable[str], needs_day: bool) -> Optional[Rollup]:
+        """
+        Smallest rollup containing every requested column, or None.
+
+        `columns` are categorical dimensions / filter keys. `needs_day`
+        is set when the query groups by `order_date` itself.
+        """
+        required = set(columns)
+        candidates = [
+            r for r in self._rollups.values()
+            if required <= set(r.dimensions)
+            and (r.grain == "day" or not needs_day)
+        ]
+        if not candidates:
+            return None
+        # Ties go to the coarsest rollup (fewer keys, month over day)
+        return min(
+            candidates,
+            key=lambda r: (r.row_count, len(r.dimensions), r.grain == "day")
+        )
+
+    # ------------------------------------------------------------------
+    # Internal Helpers
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _rollup_name(dimensions: Iterable[str], grain: str) -> str:
+        dims = "_".join(dimensions) or "all"
+        return f"rollup_{dims}_{grain}"
+
+    def _raw_aggregate(self, dimensions, grain: str, source: str) -> str:
+        time_column, time_expr = GRAINS[grain]
+        keys = list(dimensions) + [f"{time_expr} AS {time_column}"]
+        group_keys = list(dimensions) + [time_column]
+        measures = ", ".join(
+            f"{definition} AS {name}"
+            for name, definition in self.measures.items()
+        )
+        return (
+            f"SELECT {', '.join(keys)}, {measures} FROM {source} "
+            f"GROUP BY {', '.join(group_keys)}"
+        )
+
+    def _rollup_aggregate(self, dimensions, grain: str, source: str) -> str:
+        time_column, _ = GRAINS[grain]
+        day_column, _ = GRAINS["day"]
+
+        time_expr = (
+            day_column if grain == "day"
+            else f"CAST(date_trunc('month', {day_column}) AS DATE)"
+        )
+        keys = list(dimensions) + [f"{time_expr} AS {time_column}"]
+        group_keys = list(dimensions) + [time_column]
+        measures = self._merged_measures(source)
+        return (
+            f"SELECT {', '.join(keys)}, {measures} FROM {source} "
+            f"GROUP BY {', '.join(group_keys)}"
+        )
+
+    def _merged_measures(self, table: str) -> str:
+        """
+        SUM each measure of `table`, keeping its original column type
+        (SUM over BIGINT counts would otherwise widen to HUGEINT).
+        """
+        types = {
+            row[0]: row[1] for row in
+            self.conn.execute(f"DESCRIBE {table}").fetchall()
+        }
+        return ", ".join(
+            f"CAST(SUM({m}) AS {types[m]}) AS {m}" for m in self.measures
+        )
+
+    def _register(self, name: str, dimensions, grain: str) -> Rollup:
+        row_count = self.conn.execute(
+            f"SELECT COUNT(*) FROM {name}"
+        ).fetchone()[0]
+
+        self.conn.execute(f"DELETE FROM {META_TABLE} WHERE name = ?", [name])
+        self.conn.execute(
+            f"INSERT INTO {META_TABLE} VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                name,
+                json.dumps(list(dimensions)),
+                grain,
+                json.dumps(self.measures),
+                row_count,
+                self.version,
+            ]
+        )
+        return Rollup(name, tuple(dimensions), grain, row_count)
+
+    def _load(self) -> None:
+        exists = self.conn.execute(
+            "SELECT COUNT(*) FROM information_schema.tables "
+            "WHERE table_name = ?",
+            [META_TABLE]
+        ).fetchone()[0]
+        if not exists:
+            return
+
+        self._rollups.clear()
+        for name, dims, grain, measures, row_count, version in self.conn.execute(
+            f"SELECT name, dimensions, grain, measures, row_count, version "
+            f"FROM {META_TABLE}"
+        ).fetchall():
+            self.measures = json.loads(measures)
+            self.version = version
+            self._rollups[name] = Rollup(
+                name, tuple(json.loads(dims)), grain, row_count
+            )
@@ -0,0 +1,209 @@
+"""
+sampling.py
+
+Stratified sample of `sales_orders` for approximate queries.
+
+Orders are stratified by every categorical dimension plus the order
+month. Each stratum keeps SAMPLE_FRACTION of its rows, but never fewer
+than MIN_STRATUM_ROWS (small strata are kept whole and answered
+exactly). Rows are picked by a hash of `order_id`, so the sample is
+deterministic and rebuilding a stratum selects the same rows.
+
+Every sampled row carries its stratum size (`_stratum_rows`) and sample
+size (`_sample_rows`), which is all the estimators in
+agents/approximate.py need to scale results and bound their error.
+"""
+
+import json
+import threading
+from typing import List, Optional
+
+import duckdb
+
+SAMPLE_TABLE = "_sample_orders"
+META_TABLE = "_sample_meta"
+
+SAMPLE_FRACTION = 0.01
+MIN_STRATUM_ROWS = 20
+
+# Month bucket stored with each sampled row (same name as rollups use)
+TIME_COLUMN = "order_month"
+MONTH_BUCKET = "CAST(date_trunc('month', order_date) AS DATE)"
+
+
+class SampleManager:
+    """
+    Builds and incrementally maintains the sample table on a DuckDB
+    connection. The data version it was built from lives in
+    `_sample_meta`, so read-only workers can tell whether the writer's
+    sample is current.
+    """
+
+    def __init__(
+        self,
+        conn: duckdb.DuckDBPyConnection,
+        fraction: float = SAMPLE_FRACTION,
+        min_rows: int = MIN_STRATUM_ROWS
+    ):
+        self.conn = conn
+        self.fraction = fraction
+        self.min_rows = min_rows
+        self.dimensions: List[str] = []
+        self.version: Optional[str] = None
+        self._lock = threading.Lock()
+        self._load()
+
+    def __bool__(self) -> bool:
+        return self.version is not None
+
+    @property
+    def strata(self) -> List[str]:
+        return self.dimensions + [TIME_COLUMN]
+
+    # ------------------------------------------------------------------
+    # Build & Maintenance
+    # ------------------------------------------------------------------
+
+    def ensure(
+        self,
+        dimensions: List[str],
+        version: str,
+        read_only: bool = False
+    ) -> Optional[str]:
+        """
+        Name of a sample table current with `version`, (re)building it
+        when stale; None when stale on a read-only connection.
+        """
+        with self._lock:
+            if self.version != version:
+                if read_only:
+                    self._load()
+                    if self.version != version:
+                        return None
+                else:
+                    self.build(dimensions, version)
+            return SAMPLE_TABLE
+
+    def build(self, dimensions: List[str], version: str) -> None:
+        """
+        (Re)build the sample from the whole `sales_orders` table.
+        """
+        present = {
+            row[0] for row in
+            self.conn.execute("DESCRIBE sales_orders").fetchall()
+        }
+        self.dimensions = [d for d in dimensions if d in present]
+
+        self.conn.execute(
+            f"CREATE OR REPLACE TABLE {SAMPLE_TABLE} AS "
+            f"{self._sample_select('sales_orders')}"
+        )
+        self._set_version(version)
+
+    def apply_delta(self, delta_table: str) -> None:
+        """
+        Re-sample only the strata touched by newly ingested rows (in
+        `delta_table`, already appended to `sales_orders`).
+        """
+        touched_keys = ", ".join(
+            self.dimensions + [f"{MONTH_BUCKET} AS {TIME_COLUMN}"]
+        )
+        self.conn.execute(f"""
+        CREATE OR REPLACE TEMP TABLE _touched_strata AS
+        SELECT DISTINCT {touched_keys} FROM {delta_table}
+        """)
+
+        in_sample = " AND ".join(
+            f"s.{key} IS NOT DISTINCT FROM t.{key}" for key in self.strata
+        )
+        in_orders = " AND ".join(
+            [f"o.{dim} IS NOT DISTINCT FROM t.{dim}" for dim in self.dimensions]
+            + [f"{MONTH_BUCKET} = t.{TIME_COLUMN}"]
+        )
+
+        self.conn.execute(f"""
+        DELETE FROM {SAMPLE_TABLE} s
+        WHERE EXISTS (SELECT 1 FROM _touched_strata t WHERE {in_sample})
+        """)
+        touched_orders = (
+            "(SELECT o.* FROM sales_orders o WHERE EXISTS "
+            f"(SELECT 1 FROM _touched_strata t WHERE {in_orders}))"
+        )
+        self.conn.execute(
+            f"INSERT INTO {SAMPLE_TABLE} BY NAME "
+            f"{self._sample_select(touched_orders)}"
+        )
+        self.conn.execute("DROP TABLE _touched_strata")
+
+    def mark_current(self, version: str) -> None:
+        """
+        Record that the sample reflects `version` (after an ingest).
+        """
+        with self._lock:
+            self._set_version(version)
+
+    # ------------------------------------------------------------------
+    # Internal Helpers
+    # ------------------------------------------------------------------
+
+    def _stratum_keys(self) -> str:
+        return ", ".join(self.dimensions + [MONTH_BUCKET])
+
+    def _sample_select(self, source: str) -> str:
+        """
+        Per-stratum sample of `source`: the first ceil(fraction * N) rows
+        (at least `min_rows`) in order_id hash order.
+        """
+        partition = self._stratum_keys()
+        return f"""
+        SELECT * EXCLUDE (_rank)
+        FROM (
+            SELECT
+                *,
+                {MONTH_BUCKET} AS {TIME_COLUMN},
+                COUNT(*) OVER stratum AS _stratum_rows,
+                LEAST(
+                    COUNT(*) OVER stratum,
+                    GREATEST(
+                        {int(self.min_rows)},
+                        CAST(CEIL(COUNT(*) OVER stratum * {float(self.fraction)}) AS BIGINT)
+                    )
+                ) AS _sample_rows,
+                ROW_NUMBER() OVER (
+                    PARTITION BY {partition} ORDER BY hash(order_id), order_id
+                ) AS _rank
+            FROM {source}
+            WINDOW stratum AS (PARTITION BY {partition})
+        )
+        WHERE _rank <= _sample_rows
+        """
+
+    def _set_version(self, version: str) -> None:
+        self.conn.execute(f"""
+        CREATE OR REPLACE TABLE {META_TABLE} (
+            version VARCHAR,
+            dimensions VARCHAR,
+            fraction DOUBLE
+        )
+        """)
+        self.conn.execute(
+            f"INSERT INTO {META_TABLE} VALUES (?, ?, ?)",
+            [version, json.dumps(self.dimensions), self.fraction]
+        )
+        self.version = version
+
+    def _load(self) -> None:
+        exists = self.conn.execute(
+            "SELECT COUNT(*) FROM information_schema.tables "
+            "WHERE table_name = ?",
+            [META_TABLE]
+        ).fetchone()[0]
+        if not exists:
+            return
+
+        row = self.conn.execute(
+            f"SELECT version, dimensions FROM {META_TABLE}"
+        ).fetchone()
+        if row:
+            self.version = row[0]
+            self.dimensions = json.loads(row[1])
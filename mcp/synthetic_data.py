@@ -0,0 +1,153 @@
+"""
+synthetic_data.py
+
+Deterministic synthetic `sales_orders` data at any scale (1M - 1B
+orders), generated inside DuckDB from `range()` and streamed straight
+to Parquet (or CSV), so neither Python nor RAM limits the size.
+
+Every column is a pure function of (seed, order_id), so the same seed
+and row count always produce the same rows:
+
+- order_date   – spread evenly over `days` days and non-decreasing in
+                 order_id, i.e. already in SORT_KEY order
+- region       – North / South / East / West, weighted 30/25/25/20
+- product      – `products` products, skewed towards low numbers
+- order_amount – per-product base price x noise x yearly seasonality x
+                 10% annual growth, so trends and forecasts have signal
+
+Usage:
+    python -m mcp.synthetic_data --rows 10M --out data/synthetic/orders_10m.parquet
+"""
+
+import argparse
+import os
+import time
+from pathlib import Path
+from typing import Union
+
+import duckdb
+
+DEFAULT_SEED = 42
+DEFAULT_START_DATE = "2022-01-01"
+DEFAULT_DAYS = 3 * 365
+DEFAULT_PRODUCTS = 50
+
+SCALE_SUFFIXES = {"K": 10 ** 3, "M": 10 ** 6, "B": 10 ** 9}
+
+
+def parse_scale(value: Union[str, int]) -> int:
+    """
+    Row count from "1M", "250k", "1B" or a plain integer.
+    """
+    text = str(value).strip().upper().replace("_", "")
+    if text and text[-1] in SCALE_SUFFIXES:
+        return int(float(text[:-1]) * SCALE_SUFFIXES[text[-1]])
+    return int(text)
+
+
+def orders_query(
+    rows: int,
+    seed: int = DEFAULT_SEED,
+    start_date: str = DEFAULT_START_DATE,
+    days: int = DEFAULT_DAYS,
+    products: int = DEFAULT_PRODUCTS
+) -> str:
+    """
+    SELECT producing `rows` synthetic orders (columns of sales_orders).
+    """
+    rows, seed, days, products = int(rows), int(seed), int(days), int(products)
+    width = len(str(products))
+
+    def uniform(stream: int) -> str:
+        # Independent U[0, 1) draw per (order, stream)
+        return f"((hash(order_id, {seed}, {stream}) % 1000000) / 1000000.0)"
+
+    return f"""
+    SELECT
+        order_id,
+        CAST(ROUND(
+            (10 + hash(product_number, {seed}) % 190)
+            * (0.5 + {uniform(2)})
+            * (1 + 0.15 * sin(2 * pi() * (month(order_date) - 1) / 12))
+            * (1 + 0.1 * (order_date - DATE '{start_date}') / 365.0),
+            2
+        ) AS DOUBLE) AS order_amount,
+        region,
+        'P' || lpad(CAST(product_number AS VARCHAR), {width}, '0') AS product,
+        order_date
+    FROM (
+        SELECT
+            order_id,
+            CAST(DATE '{start_date}' + CAST(order_id * {days} // {rows} AS INTEGER) AS DATE)
+                AS order_date,
+            CASE
+                WHEN {uniform(0)} < 0.30 THEN 'North'
+                WHEN {uniform(0)} < 0.55 THEN 'South'
+                WHEN {uniform(0)} < 0.80 THEN 'East'
+                ELSE 'West'
+            END AS region,
+            CAST(FLOOR({products} * pow({uniform(1)}, 2)) AS BIGINT) AS product_number
+        FROM range({rows}) AS orders(order_id)
+    )
+    """
+
+
+def generate_orders(
+    path: str,
+    rows: Union[str, int],
+    seed: int = DEFAULT_SEED,
+    start_date: str = DEFAULT_START_DATE,
+    days: int = DEFAULT_DAYS,
+    products: int = DEFAULT_PRODUCTS,
+    overwrite: bool = False
+) -> str:
+    """
+    Write synthetic orders to `path` (.csv for CSV, Parquet otherwise).
+
+    An existing file is reused unless `overwrite` is set, since the
+    content only depends on the arguments. Returns `path`.
+    """
+    target = Path(path)
+    if target.exists() and not overwrite:
+        return path
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = target.with_name(target.name + ".tmp")
+    file_format = "CSV, HEADER" if target.suffix == ".csv" else "PARQUET"
+
+    conn = duckdb.connect()
+    try:
+        # Keep row order (and thus the output) deterministic
+        conn.execute("SET preserve_insertion_order = true")
+        query = orders_query(parse_scale(rows), seed, start_date, days, products)
+        quoted = str(tmp_path).replace("'", "''")
+        conn.execute(f"COPY ({query}) TO '{quoted}' (FORMAT {file_format})")
+    finally:
+        conn.close()
+
+    os.replace(tmp_path, target)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--rows", default="1M", help="e.g. 1M, 100M, 1B")
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--start-date", default=DEFAULT_START_DATE)
+    parser.add_argument("--days", type=int, default=DEFAULT_DAYS)
+    parser.add_argument("--products", type=int, default=DEFAULT_PRODUCTS)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    generate_orders(
+        args.out, args.rows, args.seed, args.start_date, args.days,
+        args.products, overwrite=True
+    )
+    elapsed = time.perf_counter() - start
+    size_mb = os.path.getsize(args.out) / 1e6
+    print(f"{parse_scale(args.rows):,} orders -> {args.out} ({size_mb:.1f} MB, {elapsed:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
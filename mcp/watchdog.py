@@ -0,0 +1,116 @@
+"""
+watchdog.py
+
+Statement timeouts for DuckDB queries.
+
+DuckDB has no statement timeout setting; a running query can only be
+stopped by calling `interrupt()` on the cursor running it, which makes
+the query raise duckdb.InterruptException. QueryWatchdog keeps the
+deadlines of running queries in a heap and interrupts every cursor
+still running past its deadline, with one daemon thread for all
+queries instead of a timer thread per query. A deadline can be renewed
+while the query makes progress (streams renew it on every batch).
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import duckdb
+
+
+class QueryWatchdog:
+    def __init__(self):
+        self._deadlines: List[Tuple[float, int]] = []
+        # token -> (cursor, current deadline)
+        self._running: Dict[int, Tuple[duckdb.DuckDBPyConnection, float]] = {}
+        self._tokens = itertools.count()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+        self.interrupted = 0
+
+    @contextmanager
+    def watch(
+        self,
+        cursor: duckdb.DuckDBPyConnection,
+        timeout: Optional[float]
+    ) -> Iterator[Callable[[], None]]:
+        """
+        Interrupt `cursor` if the block is still running after `timeout`
+        seconds (no limit when `timeout` is None or 0).
+
+        Yields `renew()`, which restarts the timeout from now.
+        """
+        if not timeout:
+            yield lambda: None
+            return
+
+        token = next(self._tokens)
+
+        def renew() -> None:
+            # A later deadline needs no wake-up: the old one is skipped
+            with self._cond:
+                if token in self._running:
+                    self._arm(token, cursor, timeout)
+
+        with self._cond:
+            self._arm(token, cursor, timeout)
+            self._start()
+            self._cond.notify()
+
+        try:
+            yield renew
+        finally:
+            # Deregistered under the lock: once the block exits, the
+            # cursor can no longer be interrupted on behalf of this query
+            with self._cond:
+                self._running.pop(token, None)
+
+    def _arm(
+        self,
+        token: int,
+        cursor: duckdb.DuckDBPyConnection,
+        timeout: float
+    ) -> None:
+        # Called with self._cond held
+        deadline = time.monotonic() + timeout
+        self._running[token] = (cursor, deadline)
+        heapq.heappush(self._deadlines, (deadline, token))
+
+    def _start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="query-watchdog", daemon=True
+            )
+            self._thread.start()
+
+    def _is_current(self, entry: Tuple[float, int]) -> bool:
+        deadline, token = entry
+        running = self._running.get(token)
+        return running is not None and running[1] == deadline
+
+    def _run(self) -> None:
+        with self._cond:
+            while True:
+                # Drop deadlines of queries that already finished or
+                # were renewed since
+                while self._deadlines and not self._is_current(self._deadlines[0]):
+                    heapq.heappop(self._deadlines)
+
+                if not self._deadlines:
+                    self._cond.wait()
+                    continue
+
+                deadline, token = self._deadlines[0]
+                remaining = deadline - time.monotonic()
+                if remaining > 0:
+                    self._cond.wait(remaining)
+                    continue
+
+                heapq.heappop(self._deadlines)
+                self._running.pop(token)[0].interrupt()
+                self.interrupted += 1
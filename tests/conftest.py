@@ -0,0 +1,55 @@
+import pytest
+
+from mcp import registry
+from mcp.synthetic_data import generate_orders
+
+# Small enough to generate in well under a second, large enough for
+# every region x product x month stratum to be populated
+ROWS = 20_000
+
+
+@pytest.fixture(scope="session")
+def orders_path(tmp_path_factory):
+    return generate_orders(
+        str(tmp_path_factory.mktemp("data") / "orders.parquet"), ROWS
+    )
+
+
+@pytest.fixture(scope="session")
+def analytics(orders_path):
+    """
+    Point the process-wide BigQuery server at the synthetic orders.
+    """
+    registry.configure("bigquery", csv_path=orders_path)
+    return registry.get_server("bigquery")
+
+
+@pytest.fixture(scope="session")
+def storage(tmp_path_factory):
+    """
+    Saved insights in a temporary database instead of
+    backend/storage/app.db.
+    """
+    from backend.storage import database
+
+    database.DB_PATH = tmp_path_factory.mktemp("storage") / "app.db"
+    database.init_db()
+    return database.DB_PATH
+
+
+@pytest.fixture(scope="session")
+def agent_router(analytics, storage):
+    from backend.agent_router import AgentRouter
+
+    router = AgentRouter()
+    yield router
+    router.shutdown()
+
+
+@pytest.fixture(scope="session")
+def api_client(analytics, storage):
+    from fastapi.testclient import TestClient
+    from backend.api import app
+
+    with TestClient(app, raise_server_exceptions=False) as client:
+        yield client
@@ -0,0 +1,83 @@
+import pytest
+
+from agents import data_analyst_agent
+from agents.data_analyst_agent import DataAnalystAgent
+from agents.query_builder import SQLQuery
+
+
+def _plan(metric, dimensions=(), filters=None, time_range="last_year"):
+    return {
+        "metric": metric,
+        "dimensions": list(dimensions),
+        "filters": dict(filters or {}),
+        "time_range": time_range,
+        "analysis_types": [],
+    }
+
+
+# Mixed dimension sets sharing filters and time range (one GROUPING SETS
+# scan), a second filter group, and plans that cannot be answered
+PLANS = [
+    _plan("revenue"),
+    _plan("revenue", ["region"]),
+    _plan("orders", ["product"]),
+    _plan("orders"),
+    _plan("revenue", ["region", "product"]),
+    _plan("orders", ["product", "region"]),
+    _plan("revenue", ["product"], {"region": "North"}),
+    _plan("orders", [], {"region": "North"}),
+    _plan("customers", ["region"]),
+    _plan("revenue", ["order_id"]),
+    _plan("orders", ["region"], time_range="soon"),
+]
+
+
+def _rows(result):
+    rows = result["data"].to_pylist()
+    return sorted(rows, key=lambda row: [str(row[k]) for k in sorted(row)])
+
+
+def _assert_same(batch, single):
+    assert batch["status"] == single["status"]
+    if single["status"] != "success":
+        assert batch["error_type"] == single["error_type"]
+        assert batch["message"] == single["message"]
+        return
+
+    assert batch["data"].column_names == single["data"].column_names
+    batch_rows, single_rows = _rows(batch), _rows(single)
+    assert len(batch_rows) == len(single_rows) > 0
+    for got, expected in zip(batch_rows, single_rows):
+        assert got == {
+            key: pytest.approx(value) if isinstance(value, float) else value
+            for key, value in expected.items()
+        }
+
+
+@pytest.fixture(scope="module")
+def analyst(analytics):
+    return DataAnalystAgent()
+
+
+def test_batch_matches_individual_analyses(analyst):
+    batch = analyst.run_batch([dict(plan) for plan in PLANS])
+
+    assert len(batch) == len(PLANS)
+    for plan, result in zip(PLANS, batch):
+        _assert_same(result, analyst.run_analysis(dict(plan)))
+
+    statuses = [result["status"] for result in batch]
+    assert statuses == ["success"] * 8 + ["error"] * 3
+
+
+def test_failed_shared_scan_falls_back_to_individual_plans(analyst, monkeypatch):
+    expected = [analyst.run_analysis(dict(plan)) for plan in PLANS]
+
+    monkeypatch.setattr(
+        data_analyst_agent, "build_grouping_sets_query",
+        lambda *args, **kwargs: SQLQuery("SELECT * FROM missing_table", [])
+    )
+    batch = analyst.run_batch([dict(plan) for plan in PLANS])
+
+    for result, single in zip(batch, expected):
+        _assert_same(result, single)
@@ -0,0 +1,125 @@
+import json
+import time
+
+import pyarrow as pa
+import pytest
+
+
+def _ndjson(response):
+    return [json.loads(line) for line in response.text.splitlines() if line]
+
+
+def test_breakdown_export_is_rejected(api_client):
+    response = api_client.get(
+        "/analyze/export", params={"query": "revenue", "view": "breakdown"}
+    )
+
+    assert response.status_code == 400
+    assert response.json()["error_type"] == "MCPValidationError"
+
+
+def test_forecast_export_streams_projections(api_client):
+    from agents.planner_agent import PlannerAgent
+    from agents.data_analyst_agent import DataAnalystAgent
+
+    query = "forecast monthly revenue by region"
+    response = api_client.get("/analyze/export", params={"query": query})
+    assert response.status_code == 200
+    rows = _ndjson(response)
+
+    plan = PlannerAgent().create_plan(query)
+    expected = DataAnalystAgent().run_analysis(plan)["data"]
+
+    assert len(rows) == expected.num_rows
+    assert sum(row["is_forecast"] for row in rows) == pa.compute.sum(
+        expected["is_forecast"]
+    ).as_py() > 0
+    assert {row["region"] for row in rows} == {"North", "South", "East", "West"}
+
+
+def test_plain_export_streams_rows(api_client):
+    response = api_client.get(
+        "/analyze/export", params={"query": "revenue by region"}
+    )
+
+    assert response.status_code == 200
+    assert {row["region"] for row in _ndjson(response)} == {
+        "North", "South", "East", "West"
+    }
+
+
+def _failing_reader():
+    from mcp.base_mcp import MCPExecutionError
+
+    schema = pa.schema([("region", pa.string()), ("revenue", pa.float64())])
+
+    def batches():
+        yield pa.record_batch([["North"], [1.5]], schema=schema)
+        raise MCPExecutionError("Export cancelled after 1s without a new batch.")
+
+    return pa.RecordBatchReader.from_batches(schema, batches())
+
+
+def test_ndjson_ends_with_error_record():
+    from backend.serialization import iter_ndjson
+
+    lines = b"".join(iter_ndjson(_failing_reader())).decode().splitlines()
+
+    assert [json.loads(line) for line in lines] == [
+        {"region": "North", "revenue": 1.5},
+        {
+            "status": "error",
+            "error_type": "MCPExecutionError",
+            "message": "Export cancelled after 1s without a new batch.",
+        },
+    ]
+
+
+def test_arrow_ipc_ends_with_error_batch():
+    from backend.serialization import iter_arrow_ipc
+
+    reader = pa.ipc.open_stream(b"".join(iter_arrow_ipc(_failing_reader())))
+    first = reader.read_next_batch_with_custom_metadata()
+    last = reader.read_next_batch_with_custom_metadata()
+
+    assert first.batch.num_rows == 1 and first.custom_metadata is None
+    assert last.batch.num_rows == 0
+    assert dict(last.custom_metadata) == {
+        b"status": b"error",
+        b"error_type": b"MCPExecutionError",
+        b"message": b"Export cancelled after 1s without a new batch.",
+    }
+
+
+def test_timeout_bounds_stalls_not_the_whole_export(orders_path):
+    from mcp.bigquery_mcp import BigQueryMCP
+
+    server = BigQueryMCP(csv_path=orders_path, query_timeout=0.3)
+    payload = {"sql": "SELECT * FROM sales_orders"}
+
+    # Slower than the timeout overall, but never stalled that long
+    rows = 0
+    started = time.monotonic()
+    for batch in server.stream(payload, batch_size=2_048):
+        rows += batch.num_rows
+        time.sleep(0.05)
+
+    assert time.monotonic() - started > 0.3
+    count = server.execute({"sql": "SELECT COUNT(*) AS n FROM sales_orders"})
+    assert rows == count["n"][0].as_py()
+    assert server.watchdog._running == {}
+
+
+def test_stalled_export_is_cancelled(orders_path):
+    from mcp.base_mcp import MCPExecutionError
+    from mcp.bigquery_mcp import BigQueryMCP
+
+    server = BigQueryMCP(csv_path=orders_path, query_timeout=0.2)
+    reader = server.stream({"sql": "SELECT * FROM sales_orders"}, batch_size=2_048)
+    reader.read_next_batch()
+    time.sleep(0.4)
+
+    with pytest.raises(MCPExecutionError, match="0.2s without a new batch"):
+        reader.read_all()
+    assert server.watchdog.interrupted == 1
+    assert server.watchdog._running == {}
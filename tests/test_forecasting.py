@@ -0,0 +1,71 @@
+import datetime
+
+import numpy as np
+import pytest
+
+from agents.data_analyst_agent import DataAnalystAgent
+from agents.forecasting import fit_models
+
+
+def _one_step_rmse(values, season):
+    """
+    Brute-force one-step-ahead RMSE of the linear and seasonal naive
+    models over their common periods.
+    """
+    periods = len(values)
+    lag = min(season, periods - 1)
+    start = max(2, lag)
+    linear, naive = [], []
+    for n in range(start, periods):
+        slope, intercept = np.polyfit(np.arange(n), values[:n], 1)
+        linear.append(values[n] - (intercept + slope * n))
+        naive.append(values[n] - values[n - lag])
+    return [np.sqrt(np.mean(np.square(errors))) for errors in (linear, naive)]
+
+
+@pytest.mark.parametrize("season, periods", [(1, 9), (4, 7), (12, 20)])
+def test_models_are_scored_on_one_step_errors(season, periods):
+    # Noisy trends (odd rows) and random walks (even rows)
+    rng = np.random.default_rng(season)
+    values = rng.normal(0, 10, (50, periods))
+    values[::2] = values[::2].cumsum(axis=1)
+    values[1::2] += 20 * np.arange(periods)
+
+    fit = fit_models(values, season)
+
+    linear_wins = 0
+    for row, choice in zip(values, fit.choice):
+        linear, naive = _one_step_rmse(row, season)
+        assert choice in (0, 1)
+        assert choice == (0 if linear <= naive else 1)
+        linear_wins += choice == 0
+    # Neither model is favoured wholesale
+    assert 0 < linear_wins < len(values)
+
+
+def test_forecast_history_is_bounded_by_time_range(analytics):
+    analyst = DataAnalystAgent()
+    plan = {
+        "metric": "revenue",
+        "dimensions": ["region"],
+        "filters": {},
+        "time_range": "last_year",
+        "time_grain": "month",
+        "analysis_types": ["forecast"],
+    }
+
+    bounded = analyst.run_analysis(dict(plan))["data"].to_pylist()
+    full = analyst.run_analysis({**plan, "time_range": None})["data"].to_pylist()
+
+    start, end = analyst._time_range("last_year")
+    assert [row for row in bounded if not row["is_forecast"]] == [
+        row for row in full
+        if not row["is_forecast"] and start <= row["period"] < end
+    ]
+    assert {row["period"] for row in bounded if not row["is_forecast"]} == {
+        datetime.date(start.year, month, 1) for month in range(1, 13)
+    }
+    # Projections are fitted on the full history either way
+    assert [row for row in bounded if row["is_forecast"]] == [
+        row for row in full if row["is_forecast"]
+    ]
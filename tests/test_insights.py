@@ -0,0 +1,51 @@
+import json
+
+
+def _save(api_client, count, view):
+    for i in range(count):
+        response = api_client.post("/insights/save", json={
+            "query": f'revenue "quoted" \\ query {i}',
+            "view": view,
+            "insight": f"Insight {i}: revenue rose 5%\nacross régions",
+            "confidence": 0.5,
+        })
+        assert response.status_code == 200
+
+
+def _walk(api_client, path, **params):
+    rows, cursor = [], None
+    while True:
+        response = api_client.get(path, params={**params, "cursor": cursor})
+        assert response.status_code == 200
+        page = json.loads(response.text)
+        rows += page["data"]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return page, rows
+
+
+def test_pages_follow_next_cursor(api_client):
+    _save(api_client, 7, "paging-test")
+
+    for path in ("/saved-insights", "/insights/list"):
+        last, rows = _walk(api_client, path, view="paging-test", limit=3)
+
+        assert [row["query"] for row in rows] == [
+            f'revenue "quoted" \\ query {i}' for i in reversed(range(7))
+        ]
+        assert rows[0]["insight"] == "Insight 6: revenue rose 5%\nacross régions"
+        assert len(last["data"]) == 1
+
+    assert _walk(api_client, "/saved-insights", view="paging-test")[0] == {
+        "status": "success", "next_cursor": None, "data": rows
+    }
+
+
+def test_bare_list_without_envelope(api_client):
+    _save(api_client, 2, "bare-test")
+
+    response = api_client.get(
+        "/insights/list", params={"view": "bare-test", "envelope": False}
+    )
+
+    assert [row["view"] for row in response.json()] == ["bare-test"] * 2
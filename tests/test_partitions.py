@@ -0,0 +1,97 @@
+import os
+
+import pytest
+
+from agents.data_analyst_agent import DataAnalystAgent
+from mcp.bigquery_mcp import PARTITIONED_VIEW, BigQueryMCP
+
+
+class Analyst(DataAnalystAgent):
+    """
+    Analyst bound to a given server instead of the registry's.
+    """
+
+    def __init__(self, server: BigQueryMCP):
+        super().__init__(parallelism=1)
+        self.server = server
+
+    @property
+    def bigquery(self) -> BigQueryMCP:
+        return self.server
+
+
+def _plan(metric, dimensions=(), filters=None, time_range=None, time_grain=None):
+    return {
+        "metric": metric,
+        "dimensions": list(dimensions),
+        "filters": dict(filters or {}),
+        "time_range": time_range,
+        "time_grain": time_grain,
+        "analysis_types": ["trend"] if time_grain else [],
+    }
+
+
+def _rows(analyst, plan):
+    result = analyst.run_analysis(dict(plan))
+    assert result["status"] == "success", result.get("message")
+    rows = result["data"].to_pylist()
+    return sorted(rows, key=lambda row: [str(row[k]) for k in sorted(row)])
+
+
+@pytest.fixture
+def source(orders_path, tmp_path):
+    path = tmp_path / "orders.parquet"
+    path.write_bytes(open(orders_path, "rb").read())
+    return str(path)
+
+
+@pytest.fixture
+def partitioned(source, tmp_path):
+    return Analyst(BigQueryMCP(
+        csv_path=source,
+        partition_path=str(tmp_path / "partitioned"),
+        partition_min_rows=0,
+    ))
+
+
+@pytest.mark.parametrize("plan, routed", [
+    (_plan("revenue", filters={"region": "North"}), True),
+    (_plan("orders", ["product"], {"region": "East"}), True),
+    (_plan("revenue", [], {"region": "West"}, time_grain="month"), True),
+    # Full scans and time ranges are faster on the single sorted file
+    (_plan("revenue"), False),
+    (_plan("revenue", ["region"]), False),
+    (_plan("revenue", time_range="March"), False),
+    (_plan("orders", [], {"region": "North"}, "last_year"), False),
+])
+def test_only_directory_filters_scan_the_partitioned_copy(
+    partitioned, source, plan, routed
+):
+    query, _ = partitioned._prepare_query(dict(plan))
+
+    assert (PARTITIONED_VIEW in query.sql) == routed
+    expected = _rows(Analyst(BigQueryMCP(csv_path=source)), plan)
+    assert _rows(partitioned, plan) == [
+        {
+            key: pytest.approx(value) if isinstance(value, float) else value
+            for key, value in row.items()
+        }
+        for row in expected
+    ]
+
+
+def test_small_sources_are_not_partitioned(source, tmp_path):
+    directory = tmp_path / "partitioned"
+    server = BigQueryMCP(csv_path=source, partition_path=str(directory))
+
+    assert not directory.exists()
+    assert server.partitioned_source(["region"], False) is None
+
+
+def test_stale_partitioned_copy_is_bypassed(partitioned, source):
+    plan = _plan("revenue", filters={"region": "North"})
+    assert PARTITIONED_VIEW in partitioned._prepare_query(dict(plan))[0].sql
+
+    os.utime(source, ns=(0, os.stat(source).st_mtime_ns + 10 ** 9))
+
+    assert PARTITIONED_VIEW not in partitioned._prepare_query(dict(plan))[0].sql
@@ -0,0 +1,146 @@
+import pytest
+
+from agents.planner_agent import PlannerAgent
+from benchmarks.corpus import NATURAL_QUERIES, view_prompts, view_requests
+
+
+def _plan(
+    metric,
+    dimensions=(),
+    filters=None,
+    time_range=None,
+    analysis_types=("trend",),
+    comparison=None,
+    time_grain=None,
+    breakdowns=(),
+    confidence=None,
+):
+    if confidence is None:
+        confidence = 1.0 if time_range else 0.8
+    return {
+        "metric": metric,
+        "dimensions": list(dimensions),
+        "filters": dict(filters or {}),
+        "time_range": time_range,
+        "analysis_types": list(analysis_types),
+        "comparison": comparison,
+        "time_grain": time_grain,
+        "breakdowns": list(breakdowns),
+        "confidence": confidence,
+    }
+
+
+# Pinned plans for the free-form queries of the router corpus
+EXPECTED = {
+    "total revenue last month": _plan("revenue", time_range="last_month"),
+    "revenue in March": _plan("revenue", time_range="March"),
+    "Breakdown of revenue by region": _plan("revenue", ["region"]),
+    "Trend of orders over the last six months": _plan("orders", time_grain="month"),
+    "why did the revenue increase in may ?": _plan(
+        "revenue", time_range="May", analysis_types=["contribution"]
+    ),
+    "compare north vs south revenue last year": _plan(
+        "revenue", ["region"], {"region": "North"}, "last_year",
+        analysis_types=["comparison"],
+    ),
+    "forecast sales for next quarter": _plan(
+        "revenue", analysis_types=["forecast"], time_grain="month"
+    ),
+    "month over month revenue change in the east": _plan(
+        "revenue", ["region"], {"region": "East"},
+        comparison="month_over_month", time_grain="month",
+    ),
+    "yoy orders trend for west region": _plan(
+        "orders", ["region"], {"region": "West"},
+        comparison="year_over_year", time_grain="month",
+    ),
+    "which product drove sales in january": _plan(
+        "revenue", ["product"], time_range="January"
+    ),
+    "revenue by product in the north last month": _plan(
+        "revenue", ["region", "product"], {"region": "North"}, "last_month"
+    ),
+    "number of transactions over time": _plan("orders", time_grain="month"),
+    "predict future income for the south": _plan(
+        "revenue", ["region"], {"region": "South"},
+        analysis_types=["forecast"], time_grain="month",
+    ),
+    "reason for the drop in orders in october": _plan(
+        "orders", time_range="October", analysis_types=["contribution"]
+    ),
+    "customers last year": _plan("customers", time_range="last_year"),
+}
+
+# Dashboard view prompts: base query -> metric, time range label ->
+# time_range, view -> the rest of the plan
+VIEW_METRICS = {"revenue": "revenue", "orders": "orders", "sales": "revenue"}
+VIEW_TIME_RANGES = {
+    "1m": "last_month",
+    "3m": "last_3_months",
+    "6m": "last_6_months",
+    "1y": "last_year",
+    "2y": "last_2_years",
+    "all": None,
+}
+VIEW_PLANS = {
+    "kpi-overview": {},
+    "trend-analysis": {
+        "analysis_types": ("trend", "forecast"), "time_grain": "month"
+    },
+    "breakdown": {"breakdowns": ("region", "product", "period")},
+}
+
+
+@pytest.fixture(scope="module")
+def planner():
+    return PlannerAgent()
+
+
+def test_corpus_covers_every_natural_query():
+    assert set(EXPECTED) == set(NATURAL_QUERIES)
+
+
+@pytest.mark.parametrize("query", NATURAL_QUERIES)
+def test_natural_query_plans(planner, query):
+    assert planner.create_plan(query) == EXPECTED[query]
+
+
+@pytest.mark.parametrize(
+    "request_, prompt", list(zip(view_requests(), view_prompts())),
+    ids=lambda value: "-".join(value.values()) if isinstance(value, dict) else ""
+)
+def test_view_prompt_plans(planner, request_, prompt):
+    expected = _plan(
+        VIEW_METRICS[request_["query"]],
+        time_range=VIEW_TIME_RANGES[request_["timeRange"]],
+        **VIEW_PLANS[request_["view"]],
+    )
+
+    assert planner.create_plan(prompt) == expected
+
+
+def test_cached_plans_are_not_shared(planner):
+    query = "revenue by product in the north last month"
+    plan = planner.create_plan(query)
+    plan["dimensions"].append("order_date")
+    plan["filters"]["region"] = "South"
+    plan["metric"] = "orders"
+
+    assert planner.create_plan(query) == EXPECTED[query]
+    assert planner.create_plan(query.upper()) == EXPECTED[query]
+
+
+@pytest.mark.parametrize("query, comparison", [
+    ("mom revenue by region", "month_over_month"),
+    ("revenue trend, mom", "month_over_month"),
+    ("revenue yoy", "year_over_year"),
+    # Abbreviations only count as whole words
+    ("revenue momentum", None),
+    ("revenue at this moment", None),
+    ("revenue for mommy products", None),
+])
+def test_comparison_abbreviations_match_whole_words(planner, query, comparison):
+    plan = planner.create_plan(query)
+
+    assert plan["comparison"] == comparison
+    assert (plan["time_grain"] == "month") == (comparison is not None)
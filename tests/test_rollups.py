@@ -0,0 +1,173 @@
+import datetime
+import os
+
+import duckdb
+import pytest
+
+from agents.data_analyst_agent import DAY_GRAINS, DataAnalystAgent
+from mcp.bigquery_mcp import BigQueryMCP
+from mcp.looker_mcp import LookerMCP
+
+SPEC = LookerMCP().rollup_spec()
+
+# (metric, dimensions, filters, time_range, time_grain): between them,
+# the plans are routed to every rollup (each dimension subset at month
+# and day grain)
+PLANS = [
+    ("revenue", [], {}, None, None),
+    ("orders", [], {}, "last_year", None),
+    ("revenue", ["region"], {}, "last_6_months", None),
+    ("orders", ["product"], {}, "March", None),
+    ("revenue", ["region", "product"], {}, "last_month", None),
+    ("revenue", [], {"region": "North"}, "last_year", None),
+    ("orders", ["product"], {"region": "East"}, None, None),
+    ("revenue", ["region"], {}, "last_year", "month"),
+    ("orders", [], {}, "last_3_months", "week"),
+    ("revenue", ["product"], {"region": "West"}, "last_month", "day"),
+    ("orders", ["product"], {}, "last_month", "day"),
+    ("revenue", ["region"], {}, "last_6_months", "week"),
+]
+
+
+class Analyst(DataAnalystAgent):
+    """
+    Analyst bound to a given server instead of the registry's.
+    """
+
+    def __init__(self, server: BigQueryMCP):
+        super().__init__(parallelism=1)
+        self.server = server
+
+    @property
+    def bigquery(self) -> BigQueryMCP:
+        return self.server
+
+
+def _plan(metric, dimensions, filters, time_range, time_grain):
+    return {
+        "metric": metric,
+        "dimensions": list(dimensions),
+        "filters": dict(filters),
+        "time_range": time_range,
+        "time_grain": time_grain,
+        "analysis_types": ["trend"] if time_grain else [],
+    }
+
+
+def _rows(analyst, plan):
+    result = analyst.run_analysis(dict(plan))
+    assert result["status"] == "success", result.get("message")
+    rows = result["data"].to_pylist()
+    return sorted(rows, key=lambda row: [str(row[k]) for k in sorted(row)])
+
+
+def _assert_same(rollup_rows, raw_rows):
+    assert len(rollup_rows) == len(raw_rows) > 0
+    for got, expected in zip(rollup_rows, raw_rows):
+        assert got.keys() == expected.keys()
+        for key, value in expected.items():
+            if isinstance(value, float):
+                assert got[key] == pytest.approx(value, rel=1e-9, abs=1e-6)
+            else:
+                assert got[key] == value
+
+
+@pytest.fixture(scope="module")
+def raw(orders_path):
+    return Analyst(BigQueryMCP(csv_path=orders_path))
+
+
+@pytest.fixture(scope="module")
+def rolled(orders_path):
+    return Analyst(BigQueryMCP(csv_path=orders_path, rollups=True))
+
+
+@pytest.mark.parametrize("shape", PLANS)
+def test_rollup_results_match_raw(shape, rolled, raw):
+    plan = _plan(*shape)
+
+    query, _ = rolled._prepare_query(dict(plan))
+    assert "rollup_" in query.sql
+
+    _assert_same(_rows(rolled, plan), _rows(raw, plan))
+
+
+def test_plans_cover_every_rollup(rolled):
+    rolled._prepare_query(_plan(*PLANS[0]))  # builds the rollups
+    sources = {
+        rolled._resolve_source(
+            [LookerMCP().get_schema(metric)], dimensions, filters,
+            needs_day=time_grain in DAY_GRAINS
+        )[0]
+        for metric, dimensions, filters, _, time_grain in PLANS
+    }
+
+    assert sources == set(rolled.server.rollups._rollups)
+
+
+def test_stale_data_version_rebuilds_rollups(orders_path, tmp_path):
+    source = str(tmp_path / "orders.parquet")
+    duckdb.execute(f"COPY (SELECT * FROM '{orders_path}') TO '{source}'")
+    rolled = Analyst(BigQueryMCP(csv_path=source, rollups=True))
+    plan = _plan("revenue", ["region"], {}, None, None)
+
+    before = _rows(rolled, plan)
+    version = rolled.server.rollups.version
+
+    # Rewrite the source in place: every amount doubles
+    doubled = str(tmp_path / "doubled.parquet")
+    duckdb.execute(
+        f"COPY (SELECT * REPLACE (order_amount * 2 AS order_amount) "
+        f"FROM '{source}') TO '{doubled}'"
+    )
+    os.replace(doubled, source)
+    os.utime(source, ns=(0, os.stat(source).st_mtime_ns + 10 ** 9))
+
+    after = _rows(rolled, plan)
+    assert rolled.server.rollups.version != version
+    assert "rollup_" in rolled._prepare_query(dict(plan))[0].sql
+    for old, new in zip(before, after):
+        assert new["revenue"] == pytest.approx(2 * old["revenue"])
+    _assert_same(after, _rows(Analyst(BigQueryMCP(csv_path=source)), plan))
+
+
+def test_ingest_merges_rollups(orders_path, tmp_path):
+    cutoff = datetime.date(2024, 6, 1)
+    first, second = str(tmp_path / "first.parquet"), str(tmp_path / "second.parquet")
+    duckdb.execute(
+        f"COPY (SELECT * FROM '{orders_path}' WHERE order_date < DATE '{cutoff}') "
+        f"TO '{first}'"
+    )
+    duckdb.execute(
+        f"COPY (SELECT * FROM '{orders_path}' WHERE order_date >= DATE '{cutoff}') "
+        f"TO '{second}'"
+    )
+
+    server = BigQueryMCP(
+        csv_path=first, database=str(tmp_path / "sales.duckdb"), rollups=True
+    )
+    assert server.current_rollups(SPEC)
+    server.ingest(second)
+
+    # apply_delta kept every rollup current with the new batch...
+    assert server.rollups.version == server.data_version == "batch:2"
+    merged = {
+        name: sorted(server.conn.execute(f"SELECT * FROM {name}").fetchall())
+        for name in server.rollups._rollups
+    }
+
+    # ...and equal to rollups built from scratch over both files
+    server.rollups.build(SPEC, "rebuilt")
+    for name, rows in merged.items():
+        rebuilt = sorted(server.conn.execute(f"SELECT * FROM {name}").fetchall())
+        assert len(rows) == len(rebuilt)
+        for got, expected in zip(rows, rebuilt):
+            assert list(got) == [
+                pytest.approx(value) if isinstance(value, float) else value
+                for value in expected
+            ]
+
+    rolled, raw = Analyst(server), Analyst(BigQueryMCP(csv_path=orders_path))
+    for shape in PLANS:
+        plan = _plan(*shape)
+        _assert_same(_rows(rolled, plan), _rows(raw, plan))
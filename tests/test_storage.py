@@ -0,0 +1,55 @@
+import sqlite3
+import threading
+
+import pytest
+
+from backend.storage import database
+
+
+def _in_thread(target):
+    thread = threading.Thread(target=target)
+    thread.start()
+    thread.join()
+
+
+def test_connections_close_when_their_thread_exits(storage):
+    before = len(database._pool)
+    connections = []
+
+    def work():
+        conn = database.get_connection()
+        assert conn is database.get_connection()
+        conn.execute("SELECT COUNT(*) FROM saved_insights").fetchone()
+        connections.append(conn)
+
+    for _ in range(20):
+        _in_thread(work)
+
+    assert len(database._pool) == before
+    for conn in connections:
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+
+
+def test_close_all_invalidates_live_threads(storage):
+    ready, done = threading.Event(), threading.Event()
+    seen = []
+
+    def work():
+        seen.append(database.get_connection())
+        ready.set()
+        done.wait()
+        seen.append(database.get_connection())
+
+    thread = threading.Thread(target=work)
+    thread.start()
+    ready.wait()
+    database.close_all()
+    done.set()
+    thread.join()
+
+    first, second = seen
+    assert first is not second
+    for conn in seen:
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
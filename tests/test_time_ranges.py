@@ -0,0 +1,91 @@
+import datetime
+
+import pytest
+
+from agents.time_ranges import MAX_RELATIVE_YEARS, add_months, resolve_time_range
+
+D = datetime.date
+
+
+@pytest.mark.parametrize("day, months, expected", [
+    (D(2024, 1, 15), -1, D(2023, 12, 1)),
+    (D(2024, 1, 31), -13, D(2022, 12, 1)),
+    (D(2023, 12, 31), 1, D(2024, 1, 1)),
+    (D(2023, 11, 5), 14, D(2025, 1, 1)),
+    (D(2024, 3, 31), 0, D(2024, 3, 1)),
+])
+def test_add_months(day, months, expected):
+    assert add_months(day, months) == expected
+
+
+@pytest.mark.parametrize("time_range, today, expected", [
+    # January -> the previous December
+    ("last_month", D(2024, 1, 15), (D(2023, 12, 1), D(2024, 1, 1))),
+    ("last_month", D(2024, 12, 31), (D(2024, 11, 1), D(2024, 12, 1))),
+    # A later month name asked in January is last year's occurrence
+    ("March", D(2024, 1, 10), (D(2023, 3, 1), D(2023, 4, 1))),
+    ("January", D(2024, 1, 10), (D(2024, 1, 1), D(2024, 2, 1))),
+    ("December", D(2024, 1, 10), (D(2023, 12, 1), D(2024, 1, 1))),
+    ("march", D(2024, 6, 1), (D(2024, 3, 1), D(2024, 4, 1))),
+    # Trailing months spanning the year boundary
+    ("last_6_months", D(2024, 2, 29), (D(2023, 8, 1), D(2024, 2, 1))),
+    ("last_13_months", D(2024, 1, 1), (D(2022, 12, 1), D(2024, 1, 1))),
+    ("last_1_months", D(2024, 1, 1), (D(2023, 12, 1), D(2024, 1, 1))),
+    ("last_year", D(2024, 1, 1), (D(2023, 1, 1), D(2024, 1, 1))),
+    ("last_2_years", D(2024, 7, 4), (D(2022, 1, 1), D(2024, 1, 1))),
+    ("2024-02", D(2030, 1, 1), (D(2024, 2, 1), D(2024, 3, 1))),
+    ("2023-12", D(2030, 1, 1), (D(2023, 12, 1), D(2024, 1, 1))),
+    ("2023", D(2030, 1, 1), (D(2023, 1, 1), D(2024, 1, 1))),
+])
+def test_resolve_time_range(time_range, today, expected):
+    assert resolve_time_range(time_range, today) == expected
+
+
+@pytest.mark.parametrize("time_range", [
+    "March", "February", "last_month", "last_3_months", "last_year", "2024-12",
+])
+def test_ranges_are_half_open_month_boundaries(time_range):
+    start, end = resolve_time_range(time_range, D(2025, 1, 20))
+
+    assert start.day == 1 and end.day == 1
+    assert start < end
+    # The end is exclusive: the first day after the range, so the last
+    # day in range closes the previous month
+    last_day = end - datetime.timedelta(days=1)
+    assert last_day.month != end.month
+    assert add_months(last_day, 1) == end
+
+
+def test_no_range():
+    assert resolve_time_range(None, D(2024, 1, 1)) is None
+    assert resolve_time_range("", D(2024, 1, 1)) is None
+
+
+@pytest.mark.parametrize("time_range", [
+    "soon", "2024-13", "last_0_months", "last_week",
+    # N is free-form user text: huge values must not overflow
+    "last_99999999999999999999_months",
+    f"last_{MAX_RELATIVE_YEARS * 12 + 1}_months",
+    f"last_{MAX_RELATIVE_YEARS + 1}_years",
+    "9999",
+])
+def test_unknown_ranges_raise(time_range):
+    with pytest.raises(ValueError):
+        resolve_time_range(time_range, D(2024, 1, 1))
+
+
+def test_longest_relative_ranges():
+    today = D(2024, 5, 10)
+
+    assert resolve_time_range(f"last_{MAX_RELATIVE_YEARS}_years", today)[0] == D(1924, 1, 1)
+    assert resolve_time_range(
+        f"last_{MAX_RELATIVE_YEARS * 12}_months", today
+    ) == (D(1924, 5, 1), D(2024, 5, 1))
+
+
+def test_huge_relative_range_is_a_validation_error(agent_router):
+    response = agent_router.handle("revenue last 99999999999999999999 months")
+
+    assert response["status"] == "error"
+    assert response["error_type"] == "MCPValidationError"
+    assert "at most" in response["message"]